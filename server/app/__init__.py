@@ -4,3 +4,8 @@ from app.models.user import User
 from app.models.loan_application import LoanApplication
 from app.models.kyc import KYCResult
 from app.models.credit import CreditResult, EligibilityResult
+from app.models.status_counter import ApplicationStatusCounter
+from app.models.single_flight import SingleFlightResult
+from app.models.reevaluation import ReevaluationRun
+from app.models.job import Job
+from app.models.status_event import ApplicationStatusEvent
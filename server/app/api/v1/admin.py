@@ -1,23 +1,42 @@
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
+from datetime import date, datetime
+
+from fastapi import APIRouter, Depends, File, Query, Response, UploadFile, status as http_status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, func, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 
-from app.core.database import get_db
-from app.core.security import get_current_admin_user
+from app.core.database import get_async_db, get_read_db
+from app.core.security import get_current_admin_user, principal_cache
 from app.core.enums import ApplicationStatus
 from app.models.user import User
 from app.models.loan_application import LoanApplication
 from app.schemas.loan_application import LoanApplicationResponse
+from app.schemas.user import AdminUserUpdate, UserResponse, Principal
+from app.utils.pagination import encode_cursor, decode_cursor
+from app.services.status_counter_service import get_status_counts, reconcile_status_counters
+from app.services.export_service import apply_loan_filters, stream_export
+from app.services.import_service import ApplicationImporter, iter_lines, iter_csv_rows, iter_ndjson_rows
+from app.services.application_service import load_application_with_results, serialize_verification_results
+from app.services.reevaluation_service import launch_run, resume_run, run_snapshot, start_run
+from app.models.reevaluation import ReevaluationRun
+from app.models.job import Job
+from app.services.job_queue_service import DEAD, job_snapshot, requeue_job
+from app.services.status_event_service import analytics_window, status_history, throughput, time_in_state
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
 
 
 @router.get("/loans", response_model=List[LoanApplicationResponse])
-def get_all_loans(
+async def get_all_loans(
+    response: Response,
     status: Optional[ApplicationStatus] = Query(None, description="Filter by application status"),
-    skip: int = Query(0, ge=0, description="Number of records to skip"),
+    skip: int = Query(0, ge=0, description="Number of records to skip (ignored when cursor is set)"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of records to return"),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous X-Next-Cursor header"),
+    created_from: Optional[date] = Query(None, description="Created on or after this date (UTC)"),
+    created_to: Optional[date] = Query(None, description="Created on or before this date (UTC)"),
+    db: AsyncSession = Depends(get_read_db),
     # current_user: User = Depends(get_current_admin_user)  # Uncomment to require admin auth
 ):
     """
@@ -25,44 +44,87 @@ def get_all_loans(
     
     Admin endpoint to view all applications.
     
+    Supports two pagination modes:
+    - Offset: skip/limit (kept for compatibility; deep pages get slower)
+    - Keyset: pass the X-Next-Cursor response header back as `cursor`.
+      Every page is an index range scan on (created_at, id) and rows
+      don't shift when new applications arrive.
+    
+    X-Next-Cursor is absent on the last page.
+    
     Examples:
     - GET /admin/loans - Get all applications
     - GET /admin/loans?status=ELIGIBLE - Get eligible applications
     - GET /admin/loans?status=NOT_ELIGIBLE - Get rejected applications
     - GET /admin/loans?status=DRAFT - Get draft applications
+    - GET /admin/loans?cursor=<X-Next-Cursor> - Get the next page
+    - GET /admin/loans?created_from=2024-01-01&created_to=2024-01-31 - Created in January
     """
-    query = db.query(LoanApplication)
+    query = apply_loan_filters(select(LoanApplication), status, created_from, created_to)
     
-    if status:
-        query = query.filter(LoanApplication.status == status.value)
+    if cursor:
+        created_at, last_id = decode_cursor(cursor)
+        query = query.where(
+            tuple_(LoanApplication.created_at, LoanApplication.id) < tuple_(created_at, last_id)
+        )
+    else:
+        query = query.offset(skip)
     
-    # Order by created_at descending (newest first)
-    query = query.order_by(LoanApplication.created_at.desc())
+    # Order by created_at descending (newest first), id breaks ties
+    query = query.order_by(LoanApplication.created_at.desc(), LoanApplication.id.desc())
     
-    applications = query.offset(skip).limit(limit).all()
+    # Fetch one extra row to know whether another page exists
+    result = await db.execute(query.limit(limit + 1))
+    applications = result.scalars().all()
+    
+    if len(applications) > limit:
+        applications = applications[:limit]
+        last = applications[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(last.created_at, last.id)
     
     return applications
 
 
+@router.get("/loans/export")
+async def export_loans(
+    format: str = Query("csv", pattern="^(csv|ndjson)$", description="csv or ndjson"),
+    status: Optional[ApplicationStatus] = Query(None, description="Filter by application status"),
+    created_from: Optional[date] = Query(None, description="Created on or after this date (UTC)"),
+    created_to: Optional[date] = Query(None, description="Created on or before this date (UTC)"),
+    include_results: bool = Query(False, description="Add KYC, credit and eligibility result columns"),
+    gzip: bool = Query(False, description="Compress the file with gzip"),
+    current_user: Principal = Depends(get_current_admin_user)
+):
+    """
+    Stream every matching loan application as CSV or NDJSON (admin only).
+    
+    Rows are read through a server-side cursor and written as they arrive,
+    so the export has no row limit and memory stays flat.
+    """
+    filename = f"loan_applications.{format}" + (".gz" if gzip else "")
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    
+    return StreamingResponse(
+        stream_export(format, status, created_from, created_to, include_results, compress=gzip),
+        media_type="application/gzip" if gzip else media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
 @router.get("/loans/stats")
-def get_loan_stats(
-    db: Session = Depends(get_db),
+async def get_loan_stats(
+    db: AsyncSession = Depends(get_read_db),
     # current_user: User = Depends(get_current_admin_user)  # Uncomment to require admin auth
 ):
     """
     Get loan application statistics.
     
     Returns count of applications by status.
+    Counts come from the status counter table in a single query.
     """
-    stats = {}
+    stats = await get_status_counts(db)
     
-    for status in ApplicationStatus:
-        count = db.query(LoanApplication).filter(
-            LoanApplication.status == status.value
-        ).count()
-        stats[status.value] = count
-    
-    total = db.query(LoanApplication).count()
+    total = sum(stats.values())
     stats["TOTAL"] = total
     
     # Calculate some useful metrics
@@ -76,18 +138,151 @@ def get_loan_stats(
     return stats
 
 
+@router.post("/loans/stats/reconcile")
+async def reconcile_loan_stats(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_admin_user)
+):
+    """
+    Rebuild the status counters from loan_applications (GROUP BY) and report drift (admin only).
+    
+    Locks the counter table while it runs, so status changes wait for it.
+    """
+    report = await reconcile_status_counters(db)
+    await db.commit()
+    return report
+
+
+@router.post("/loans/import")
+async def import_loans(
+    file: UploadFile = File(..., description="CSV (with header row) or NDJSON file of applications"),
+    format: Optional[str] = Query(None, pattern="^(csv|ndjson)$", description="Defaults to the file extension"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_admin_user)
+):
+    """
+    Bulk import loan applications from a partner file (admin only).
+    
+    Columns / keys are the POST /loan/create fields (full_name, mobile, pan,
+    dob, employment_type, monthly_income, loan_amount, ...) plus an optional
+    email, used to link the application to a registered user. Rows are
+    validated with the same rules, checked for duplicate PANs and the
+    per-user limit in batches, and imported as DRAFT applications.
+    
+    The file is read incrementally; the response has row counts,
+    throughput and a per-row error report (line numbers).
+    """
+    if format is None:
+        filename = (file.filename or "").lower()
+        is_ndjson = filename.endswith((".ndjson", ".jsonl")) or file.content_type == "application/x-ndjson"
+        format = "ndjson" if is_ndjson else "csv"
+    
+    lines = iter_lines(file)
+    rows = iter_ndjson_rows(lines) if format == "ndjson" else iter_csv_rows(lines)
+    
+    report = await ApplicationImporter(db).run(rows)
+    report["format"] = format
+    return report
+
+
+@router.post("/reevaluations", status_code=http_status.HTTP_202_ACCEPTED)
+async def start_reevaluation(
+    dry_run: bool = Query(False, description="Report the changes without writing them"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_admin_user)
+):
+    """
+    Re-evaluate every ELIGIBLE / NOT_ELIGIBLE application against the current
+    rules and pricing grid (admin only).
+    
+    The job runs in the background in keyset-ordered chunks, scored across
+    a process pool and throttled to REEVALUATION_MAX_DB_DUTY; poll
+    GET /admin/reevaluations/{run_id} for progress and the diff report.
+    Returns 409 while another run is in progress.
+    """
+    run = await start_run(db, dry_run=dry_run)
+    launch_run(run.id)
+    return run_snapshot(run)
+
+
+@router.post("/reevaluations/{run_id}/resume", status_code=http_status.HTTP_202_ACCEPTED)
+async def resume_reevaluation(
+    run_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_admin_user)
+):
+    """
+    Continue a failed run, or a RUNNING one that stopped making progress
+    (e.g. the server restarted), from its last committed chunk (admin only).
+    """
+    run = await resume_run(db, run_id)
+    launch_run(run.id)
+    return run_snapshot(run)
+
+
+@router.get("/reevaluations/{run_id}")
+async def get_reevaluation(
+    run_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_admin_user)
+):
+    """
+    Progress of a re-evaluation run: checkpoint, counts, transitions per
+    status pair and the first REEVALUATION_MAX_DIFFS_REPORTED diffs.
+    """
+    run = await db.get(ReevaluationRun, run_id)
+    
+    if not run:
+        from app.utils.exceptions import raise_not_found
+        raise_not_found(f"Re-evaluation run {run_id} not found")
+    
+    return run_snapshot(run)
+
+
+@router.get("/jobs")
+async def list_jobs(
+    status: str = Query(DEAD, pattern="^(QUEUED|RUNNING|SUCCEEDED|DEAD)$", description="Job status (default: dead letters)"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of jobs to return"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_admin_user)
+):
+    """
+    Background jobs by status, newest first (admin only).
+    
+    DEAD jobs are the dead-letter queue: they failed JOB_MAX_ATTEMPTS times.
+    """
+    result = await db.execute(
+        select(Job).where(Job.status == status).order_by(Job.id.desc()).limit(limit)
+    )
+    return [job_snapshot(job) for job in result.scalars().all()]
+
+
+@router.post("/jobs/{job_id}/requeue", status_code=http_status.HTTP_202_ACCEPTED)
+async def requeue_dead_job(
+    job_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_admin_user)
+):
+    """
+    Put a DEAD job back on the queue with fresh attempts (admin only).
+    
+    Returns 409 if the application was moved on since (e.g. the step was
+    run again by the customer).
+    """
+    job = await requeue_job(db, job_id)
+    return job_snapshot(job)
+
+
 @router.get("/loans/{application_id}/history")
-def get_application_history(
+async def get_application_history(
     application_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     # current_user: User = Depends(get_current_admin_user)  # Uncomment to require admin auth
 ):
     """
     Get full history/details of a loan application including all verification results.
     """
-    application = db.query(LoanApplication).filter(
-        LoanApplication.id == application_id
-    ).first()
+    application = await load_application_with_results(db, application_id)
     
     if not application:
         from app.utils.exceptions import raise_not_found
@@ -107,38 +302,84 @@ def get_application_history(
             "created_at": application.created_at.isoformat() if application.created_at else None,
             "updated_at": application.updated_at.isoformat() if application.updated_at else None
         },
-        "kyc": None,
-        "credit": None,
-        "eligibility": None
+        **serialize_verification_results(application),
+        "status_events": await status_history(db, application_id)
     }
     
-    if application.kyc_result:
-        history["kyc"] = {
-            "name_match_score": application.kyc_result.name_match_score,
-            "status": application.kyc_result.status,
-            "pan_verified": application.kyc_result.pan_verified,
-            "address_verified": application.kyc_result.address_verified,
-            "created_at": application.kyc_result.created_at.isoformat() if application.kyc_result.created_at else None
-        }
-    
-    if application.credit_result:
-        history["credit"] = {
-            "credit_score": application.credit_result.credit_score,
-            "active_loans": application.credit_result.active_loans,
-            "is_approved": application.credit_result.is_approved,
-            "rejection_reason": application.credit_result.rejection_reason,
-            "created_at": application.credit_result.created_at.isoformat() if application.credit_result.created_at else None
-        }
-    
-    if application.eligibility_result:
-        history["eligibility"] = {
-            "max_emi": application.eligibility_result.max_emi,
-            "interest_rate": application.eligibility_result.interest_rate,
-            "tenure_months": application.eligibility_result.tenure_months,
-            "eligible_amount": application.eligibility_result.eligible_amount,
-            "is_eligible": application.eligibility_result.is_eligible,
-            "rejection_reasons": application.eligibility_result.rejection_reasons,
-            "created_at": application.eligibility_result.created_at.isoformat() if application.eligibility_result.created_at else None
-        }
-    
     return history
+
+
+@router.get("/analytics/time-in-state")
+async def get_time_in_state(
+    status: Optional[List[ApplicationStatus]] = Query(None, description="States to report (repeatable; default: all non-terminal)"),
+    since: Optional[datetime] = Query(None, description="Window start, inclusive (default: 24 hours before until)"),
+    until: Optional[datetime] = Query(None, description="Window end, exclusive (default: now)"),
+    db: AsyncSession = Depends(get_read_db),
+    # current_user: User = Depends(get_current_admin_user)  # Uncomment to require admin auth
+):
+    """
+    Time applications spent in each state, from the status transition log.
+    
+    Covers the applications that left the state within the window, with the
+    count, mean, p50 / p95 / p99 and max in seconds.
+    
+    Examples:
+    - GET /admin/analytics/time-in-state - Every waiting state, last 24 hours
+    - GET /admin/analytics/time-in-state?status=KYC_PENDING&status=CREDIT_CHECK_PENDING
+    - GET /admin/analytics/time-in-state?since=2024-01-01T00:00:00Z&until=2024-01-08T00:00:00Z
+    """
+    since, until = analytics_window(since, until)
+    return {
+        "since": since.isoformat(),
+        "until": until.isoformat(),
+        "states": await time_in_state(db, since, until, status)
+    }
+
+
+@router.get("/analytics/throughput")
+async def get_stage_throughput(
+    status: Optional[List[ApplicationStatus]] = Query(None, description="Target states to count (repeatable; default: all)"),
+    since: Optional[datetime] = Query(None, description="Window start, inclusive (default: 24 hours before until)"),
+    until: Optional[datetime] = Query(None, description="Window end, exclusive (default: now)"),
+    db: AsyncSession = Depends(get_read_db),
+    # current_user: User = Depends(get_current_admin_user)  # Uncomment to require admin auth
+):
+    """
+    Transitions into each state per hour (UTC), from the status transition log.
+    
+    Examples:
+    - GET /admin/analytics/throughput - All stages, last 24 hours
+    - GET /admin/analytics/throughput?status=KYC_COMPLETED&status=ELIGIBLE
+    """
+    since, until = analytics_window(since, until)
+    return await throughput(db, since, until, status)
+
+
+@router.patch("/users/{user_id}", response_model=UserResponse)
+async def update_user_access(
+    user_id: int,
+    update_data: AdminUserUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_admin_user)
+):
+    """
+    Activate/deactivate a user or grant/revoke admin rights.
+    
+    Cached tokens of the user are invalidated so the change applies immediately.
+    """
+    result = await db.execute(select(User).where(User.id == user_id))
+    user = result.scalars().first()
+    
+    if not user:
+        from app.utils.exceptions import raise_not_found
+        raise_not_found(f"User with ID {user_id} not found")
+    
+    for field, value in update_data.model_dump(exclude_unset=True).items():
+        if value is not None:
+            setattr(user, field, value)
+    
+    await db.commit()
+    await db.refresh(user)
+    principal_cache.invalidate_user(user.email)
+    
+    return user
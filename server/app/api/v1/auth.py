@@ -1,13 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
 
-from app.core.database import get_db
+from app.core.database import get_async_db
 from app.core.config import settings
+from app.core.hashing import password_hasher, needs_rehash
 from app.core.security import (
-    verify_password,
-    get_password_hash,
     create_access_token,
     get_current_active_user
 )
@@ -15,14 +15,15 @@ from app.models.user import User
 from app.schemas.user import (
     UserCreate,
     UserResponse,
-    Token
+    Token,
+    Principal
 )
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def register(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register(user_data: UserCreate, db: AsyncSession = Depends(get_async_db)):
     """
     Register a new user.
     
@@ -32,15 +33,19 @@ def register(user_data: UserCreate, db: Session = Depends(get_db)):
     - password: Password
     """
     # Check if email exists
-    existing_email = db.query(User).filter(User.email == user_data.email).first()
+    result = await db.execute(select(User).where(User.email == user_data.email))
+    existing_email = result.scalars().first()
     if existing_email:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
     
+    # Release the DB connection while bcrypt runs in the hashing pool
+    await db.commit()
+    
     # Create new user
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await password_hasher.hash(user_data.password)
     db_user = User(
         email=user_data.email,
         full_name=user_data.full_name,
@@ -48,22 +53,27 @@ def register(user_data: UserCreate, db: Session = Depends(get_db)):
     )
     
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     
     return db_user
 
 
 @router.post("/login", response_model=Token)
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
     """
     OAuth2 compatible token login.
     
     Use email as username in the form.
+    Hashes made with an outdated bcrypt cost are upgraded on successful login.
     """
-    user = db.query(User).filter(User.email == form_data.username).first()
+    result = await db.execute(select(User).where(User.email == form_data.username))
+    user = result.scalars().first()
+    
+    # Release the DB connection while bcrypt runs in the hashing pool
+    await db.commit()
     
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    if not user or not await password_hasher.verify(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -76,6 +86,14 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depend
             detail="Inactive user"
         )
     
+    if needs_rehash(user.hashed_password):
+        try:
+            user.hashed_password = await password_hasher.hash(form_data.password)
+            await db.commit()
+        except HTTPException:
+            # Hashing pool is saturated; upgrade on a later login instead
+            pass
+    
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
         data={"sub": user.email},
@@ -86,8 +104,12 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depend
 
 
 @router.get("/me", response_model=UserResponse)
-def get_current_user_info(current_user: User = Depends(get_current_active_user)):
+async def get_current_user_info(
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
     """
     Get current logged-in user information.
     """
-    return current_user
+    result = await db.execute(select(User).where(User.id == current_user.id))
+    return result.scalars().first()
@@ -1,46 +1,114 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from collections import Counter
 
-from app.core.database import get_db
+from fastapi import APIRouter, Depends, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import get_async_db, get_read_db, mark_recent_write
+from app.core.enums import ApplicationStatus
+from app.core.security import get_current_admin_user
 from app.models.loan_application import LoanApplication
 from app.models.credit import CreditResult, EligibilityResult
-from app.schemas.credit import CreditResultResponse, EligibilityResultResponse
-from app.utils.exceptions import raise_not_found
+from app.schemas.credit import (
+    CreditResultResponse,
+    EligibilityResultResponse,
+    CreditBatchRequest,
+    CreditBatchResponse
+)
+from app.schemas.user import Principal
+from app.utils.exceptions import raise_bad_request, raise_not_found
+from app.utils.http_cache import conditional_json_response
+from app.services.application_service import application_cache
+from app.services.credit_bureau_service import get_async_credit_bureau_service
+from app.services.credit_batch_service import run_credit_batch
 
 router = APIRouter(prefix="/credit", tags=["Credit"])
 
 
+@router.post("/batch", response_model=CreditBatchResponse)
+async def perform_credit_batch(
+    batch: CreditBatchRequest,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_admin_user)
+):
+    """
+    Perform credit check and eligibility for a list of KYC_COMPLETED applications (admin only).
+    
+    Bureau calls run concurrently (bounded by CREDIT_BATCH_CONCURRENCY),
+    eligibility is computed per chunk in one call, and CreditResult /
+    EligibilityResult rows are bulk inserted. Failures are isolated per
+    application: ELIGIBLE, NOT_ELIGIBLE, SKIPPED (not in KYC_COMPLETED),
+    NOT_FOUND, PROVIDER_ERROR or ERROR (both left in KYC_COMPLETED, can be
+    resubmitted).
+    """
+    if len(batch.application_ids) > settings.CREDIT_BATCH_MAX_SIZE:
+        raise_bad_request(f"A batch can contain at most {settings.CREDIT_BATCH_MAX_SIZE} applications")
+    
+    items = await run_credit_batch(
+        db,
+        get_async_credit_bureau_service(),
+        batch.application_ids,
+        force_refresh=bool(batch.force_recheck)
+    )
+    mark_recent_write(response)
+    
+    outcomes = Counter(item["outcome"] for item in items)
+    eligible = outcomes[ApplicationStatus.ELIGIBLE.value]
+    not_eligible = outcomes[ApplicationStatus.NOT_ELIGIBLE.value]
+    
+    return CreditBatchResponse(
+        total=len(items),
+        processed=eligible + not_eligible,
+        eligible=eligible,
+        not_eligible=not_eligible,
+        unprocessed=len(items) - eligible - not_eligible,
+        items=items
+    )
+
+
 @router.get("/{application_id}", response_model=CreditResultResponse)
-def get_credit_result(
+async def get_credit_result(
     application_id: int,
-    db: Session = Depends(get_db)
+    request: Request,
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get credit check result for a loan application.
+    Supports conditional GET via ETag / If-None-Match.
     """
-    credit_result = db.query(CreditResult).filter(
-        CreditResult.loan_application_id == application_id
-    ).first()
+    snapshot = await application_cache.get(db, application_id)
     
-    if not credit_result:
+    if not snapshot or not snapshot["resources"]["credit"]:
         raise_not_found(f"Credit result not found for application ID {application_id}")
     
-    return credit_result
+    return conditional_json_response(
+        request,
+        snapshot["resources"]["credit"],
+        snapshot["etags"]["credit"],
+        snapshot["cache_control"]
+    )
 
 
 @router.get("/{application_id}/eligibility", response_model=EligibilityResultResponse)
-def get_eligibility_result(
+async def get_eligibility_result(
     application_id: int,
-    db: Session = Depends(get_db)
+    request: Request,
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get eligibility result for a loan application.
+    Supports conditional GET via ETag / If-None-Match.
     """
-    eligibility_result = db.query(EligibilityResult).filter(
-        EligibilityResult.loan_application_id == application_id
-    ).first()
+    snapshot = await application_cache.get(db, application_id)
     
-    if not eligibility_result:
+    if not snapshot or not snapshot["resources"]["eligibility"]:
         raise_not_found(f"Eligibility result not found for application ID {application_id}")
     
-    return eligibility_result
+    return conditional_json_response(
+        request,
+        snapshot["resources"]["eligibility"],
+        snapshot["etags"]["eligibility"],
+        snapshot["cache_control"]
+    )
@@ -0,0 +1,30 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_async_db
+from app.models.job import Job
+from app.services.job_queue_service import job_snapshot
+from app.utils.exceptions import raise_not_found
+
+router = APIRouter(prefix="/jobs", tags=["Jobs"])
+
+
+@router.get("/{job_id}")
+async def get_job_status(
+    job_id: int,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Status of a queued KYC / credit check (from ?async=true).
+    
+    status is QUEUED (waiting or backing off until run_after), RUNNING,
+    SUCCEEDED (result holds the endpoint's response body) or DEAD (failed
+    max_attempts times; last_error says why and the application is back in
+    the status the step starts from).
+    """
+    job = await db.get(Job, job_id)
+    
+    if not job:
+        raise_not_found(f"Job with ID {job_id} not found")
+    
+    return job_snapshot(job)
@@ -1,53 +1,107 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
+from collections import Counter
 import json
 
-from app.core.database import get_db
+from app.core.database import get_async_db, get_read_db, mark_recent_write
 from app.core.enums import KYCStatus
 from app.models.loan_application import LoanApplication
 from app.models.kyc import KYCResult
-from app.schemas.kyc import KYCResultResponse, KYCPerformResponse
+from app.core.config import settings
+from app.core.security import get_current_admin_user
+from app.schemas.kyc import KYCResultResponse, KYCPerformResponse, KYCBatchRequest, KYCBatchResponse
+from app.schemas.user import Principal
 from app.utils.exceptions import raise_not_found, raise_bad_request
-from app.services.workflow_service import ensure_status
-from app.services.kyc_service import get_kyc_service
+from app.services.workflow_service import ensure_status, change_status, release_claim
+from app.services.kyc_service import get_async_kyc_service
+from app.services.kyc_batch_service import run_kyc_batch
+from app.services.application_service import application_cache
+from app.utils.http_cache import conditional_json_response
 from app.core.enums import ApplicationStatus
 
 router = APIRouter(prefix="/kyc", tags=["KYC"])
 
 
+@router.post("/batch", response_model=KYCBatchResponse)
+async def perform_kyc_batch(
+    batch: KYCBatchRequest,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_admin_user)
+):
+    """
+    Perform KYC for a list of DRAFT applications (admin only).
+    
+    All states are validated in one query, provider calls run concurrently
+    (bounded by KYC_BATCH_CONCURRENCY), and results are written in bulk per
+    chunk. Returns an outcome per application instead of failing the batch:
+    KYC_COMPLETED, NOT_ELIGIBLE, SKIPPED (not in DRAFT), NOT_FOUND, or
+    PROVIDER_ERROR (left in DRAFT, can be resubmitted).
+    """
+    if len(batch.application_ids) > settings.KYC_BATCH_MAX_SIZE:
+        raise_bad_request(f"A batch can contain at most {settings.KYC_BATCH_MAX_SIZE} applications")
+    
+    items = await run_kyc_batch(db, get_async_kyc_service(), batch.application_ids)
+    mark_recent_write(response)
+    
+    outcomes = Counter(item["outcome"] for item in items)
+    passed = outcomes[ApplicationStatus.KYC_COMPLETED.value]
+    failed = outcomes[ApplicationStatus.NOT_ELIGIBLE.value]
+    
+    return KYCBatchResponse(
+        total=len(items),
+        processed=passed + failed,
+        passed=passed,
+        failed=failed,
+        unprocessed=len(items) - passed - failed,
+        items=items
+    )
+
+
 @router.get("/{application_id}", response_model=KYCResultResponse)
-def get_kyc_result(
+async def get_kyc_result(
     application_id: int,
-    db: Session = Depends(get_db)
+    request: Request,
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get KYC result for a loan application.
+    Supports conditional GET via ETag / If-None-Match.
     """
-    kyc_result = db.query(KYCResult).filter(
-        KYCResult.loan_application_id == application_id
-    ).first()
+    snapshot = await application_cache.get(db, application_id)
     
-    if not kyc_result:
+    if not snapshot or not snapshot["resources"]["kyc"]:
         raise_not_found(f"KYC result not found for application ID {application_id}")
     
-    return kyc_result
+    return conditional_json_response(
+        request,
+        snapshot["resources"]["kyc"],
+        snapshot["etags"]["kyc"],
+        snapshot["cache_control"]
+    )
 
 
 @router.post("/{application_id}/retry", response_model=KYCPerformResponse)
-def retry_kyc(
+async def retry_kyc(
     application_id: int,
-    db: Session = Depends(get_db)
+    response: Response,
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Retry KYC verification (only if previous KYC failed).
     
     This creates a new application flow - the old application remains NOT_ELIGIBLE.
+    
+    The application is KYC_PENDING while the provider is called; a concurrent
+    retry of the same application gets 409.
     """
     # Get application
-    application = db.query(LoanApplication).filter(
-        LoanApplication.id == application_id
-    ).first()
+    result = await db.execute(
+        select(LoanApplication).where(LoanApplication.id == application_id)
+    )
+    application = result.scalars().first()
     
     if not application:
         raise_not_found(f"Loan application with ID {application_id} not found")
@@ -64,40 +118,56 @@ def retry_kyc(
         )
     
     # Check if KYC result exists and failed
-    existing_kyc = db.query(KYCResult).filter(
-        KYCResult.loan_application_id == application_id
-    ).first()
+    result = await db.execute(
+        select(KYCResult).where(KYCResult.loan_application_id == application_id)
+    )
+    existing_kyc = result.scalars().first()
     
     if not existing_kyc or existing_kyc.status != KYCStatus.FAILED.value:
         raise_bad_request("KYC retry is only allowed for KYC-failed applications")
     
-    # Perform KYC again
-    kyc_service = get_kyc_service()
-    kyc_result = kyc_service.perform_kyc(
-        name=application.full_name,
-        pan=application.pan
-    )
+    # Claim the retry (NOT_ELIGIBLE -> KYC_PENDING) before calling the provider:
+    # a concurrent retry loses the conditional update and gets 409
+    await change_status(db, application, ApplicationStatus.KYC_PENDING)
+    await db.commit()
+    application_cache.invalidate(application.id)
+    
+    kyc_service = get_async_kyc_service()
+    try:
+        # Perform KYC again
+        kyc_result = await kyc_service.perform_kyc(
+            name=application.full_name,
+            pan=application.pan
+        )
+        
+        # Determine KYC status
+        kyc_passed = kyc_service.is_passed(kyc_result)
+        kyc_status = KYCStatus.PASSED if kyc_passed else KYCStatus.FAILED
+        
+        # Update existing KYC result
+        existing_kyc.name_match_score = kyc_result["nameMatchScore"]
+        existing_kyc.status = kyc_status.value
+        existing_kyc.pan_verified = kyc_result.get("panVerified", "NO")
+        existing_kyc.address_verified = kyc_result.get("addressVerified", "NO")
+        existing_kyc.raw_response = json.dumps(kyc_result)
+        
+        # Update application status
+        if kyc_passed:
+            await change_status(db, application, ApplicationStatus.KYC_COMPLETED)
+            message = "KYC verification passed on retry. You can proceed to credit check."
+        else:
+            await change_status(db, application, ApplicationStatus.NOT_ELIGIBLE)
+            message = f"KYC verification failed again. Name match score: {kyc_result['nameMatchScore']}. Minimum required: 80."
+        
+        await db.commit()
+    except BaseException:
+        # Whatever failed, hand the application back so the retry can be requested again
+        await release_claim(db, application, ApplicationStatus.KYC_PENDING, ApplicationStatus.NOT_ELIGIBLE)
+        application_cache.invalidate(application_id)
+        raise
     
-    # Determine KYC status
-    kyc_passed = kyc_service.is_passed(kyc_result)
-    kyc_status = KYCStatus.PASSED if kyc_passed else KYCStatus.FAILED
-    
-    # Update existing KYC result
-    existing_kyc.name_match_score = kyc_result["nameMatchScore"]
-    existing_kyc.status = kyc_status.value
-    existing_kyc.pan_verified = kyc_result.get("panVerified", "NO")
-    existing_kyc.address_verified = kyc_result.get("addressVerified", "NO")
-    existing_kyc.raw_response = json.dumps(kyc_result)
-    
-    # Update application status
-    if kyc_passed:
-        application.status = ApplicationStatus.KYC_COMPLETED.value
-        message = "KYC verification passed on retry. You can proceed to credit check."
-    else:
-        application.status = ApplicationStatus.NOT_ELIGIBLE.value
-        message = f"KYC verification failed again. Name match score: {kyc_result['nameMatchScore']}. Minimum required: 80."
-    
-    db.commit()
+    application_cache.invalidate(application.id)
+    mark_recent_write(response)
     
     return KYCPerformResponse(
         application_id=application.id,
@@ -1,29 +1,48 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
-import json
 
-from app.core.database import get_db
-from app.core.enums import ApplicationStatus, KYCStatus
+from app.core.config import settings
+from app.core.database import get_async_db, get_read_db, mark_recent_write, read_session
+from app.core.enums import ApplicationStatus
 from app.core.security import get_current_active_user
-from app.models.user import User
+from app.schemas.user import Principal
 from app.models.loan_application import LoanApplication
-from app.models.kyc import KYCResult
-from app.models.credit import CreditResult, EligibilityResult
 from app.schemas.loan_application import (
     LoanApplicationCreate,
     LoanApplicationResponse,
     LoanApplicationDetailResponse,
-    LoanApplicationUpdate
+    LoanApplicationUpdate,
+    AmortizationScheduleResponse
 )
 from app.schemas.kyc import KYCPerformResponse
-from app.schemas.credit import CreditCheckResponse, EligibilityResponse
+from app.schemas.credit import (
+    CreditCheckRequest,
+    CreditCheckResponse,
+    EligibilityResponse,
+    OfferCalculatorRequest,
+    OfferGridRequest,
+    OfferGridResponse
+)
 from app.utils.validators import validate_application_data, calculate_age
 from app.utils.exceptions import raise_bad_request, raise_not_found
-from app.services.workflow_service import ensure_status, validate_transition
-from app.services.kyc_service import get_kyc_service
-from app.services.credit_bureau_service import get_credit_bureau_service
-from app.services.eligibility_service import calculate_eligibility
+from app.services.workflow_service import ensure_status, validate_transition, change_status, record_created, release_claim
+from app.services.status_counter_service import get_status_counts
+from app.services.application_service import application_cache
+from app.utils.http_cache import conditional_json_response
+from app.services.verification_service import complete_credit_check, complete_kyc
+from app.services.job_queue_service import CREDIT_CHECK, KYC, enqueue_job, job_accepted_response
+from app.services.pricing_service import get_pricing_grid
+from app.services.offer_service import get_offer_grid
+from app.services.event_hub import stream_application_events
+from app.services.schedule_service import (
+    DEFAULT_ANNUAL_RATE,
+    DEFAULT_TENURE_MONTHS,
+    get_schedule,
+    schedule_response
+)
 
 router = APIRouter(prefix="/loan", tags=["Loan Application"])
 
@@ -32,36 +51,79 @@ MAX_ACTIVE_LOANS_PER_USER = 5
 
 
 @router.get("/stats/total")
-def get_total_applications_count(
-    db: Session = Depends(get_db)
+async def get_total_applications_count(
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get total count of all loan applications (public endpoint for homepage stats).
+    
+    Read from the status counters, not a COUNT(*) over loan_applications.
+    """
+    counts = await get_status_counts(db)
+    return {"total": sum(counts.values())}
+
+
+@router.get("/schedule", response_model=AmortizationScheduleResponse)
+async def calculate_schedule(
+    principal: float = Query(..., gt=0, description="Loan principal amount"),
+    annual_rate: float = Query(DEFAULT_ANNUAL_RATE, ge=0, le=1, description="Annual interest rate, e.g. 0.12"),
+    tenure_months: int = Query(DEFAULT_TENURE_MONTHS, ge=1, le=settings.SCHEDULE_MAX_TENURE_MONTHS),
+    format: str = Query("json", pattern="^(json|csv)$", description="json or csv")
+):
+    """
+    Amortization schedule calculator (no application needed).
+    
+    Schedules are cached by (principal, rate, tenure); long schedules and
+    CSV output are streamed.
     """
-    total = db.query(LoanApplication).count()
-    return {"total": total}
+    schedule = get_schedule(principal, annual_rate, tenure_months)
+    return schedule_response(schedule, format)
+
+
+@router.post("/offers", response_model=OfferGridResponse)
+async def calculate_offers(offer_request: OfferCalculatorRequest):
+    """
+    Offer grid calculator (no application needed).
+    
+    Returns EMI, total interest and affordability for every amount × tenure,
+    priced for the credit-score band (base terms without a score). Grids
+    are cached per income, employment type and band.
+    """
+    body = get_offer_grid(
+        offer_request.monthly_income,
+        offer_request.employment_type,
+        offer_request.credit_score,
+        offer_request.tenures,
+        offer_request.amounts,
+        offer_request.amount_steps
+    )
+    return Response(content=body, media_type="application/json")
 
 
 @router.get("/my-loans", response_model=list[LoanApplicationResponse])
-def get_my_loans(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+async def get_my_loans(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """
     Get all loan applications for the current logged-in user.
     """
-    loans = db.query(LoanApplication).filter(
-        LoanApplication.user_id == current_user.id
-    ).order_by(LoanApplication.created_at.desc()).all()
+    result = await db.execute(
+        select(LoanApplication)
+        .where(LoanApplication.user_id == current_user.id)
+        .order_by(LoanApplication.created_at.desc())
+    )
+    loans = result.scalars().all()
     
     return loans
 
 
 @router.post("/create", response_model=LoanApplicationResponse, status_code=status.HTTP_201_CREATED)
-def create_loan_application(
+async def create_loan_application(
     application: LoanApplicationCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """
     Create a new loan application (Customer Onboarding).
@@ -76,9 +138,11 @@ def create_loan_application(
     - Max 5 active loans per user
     """
     # Count ALL applications for this user (regardless of status)
-    total_loans_count = db.query(LoanApplication).filter(
-        LoanApplication.user_id == current_user.id
-    ).count()
+    total_loans_count = await db.scalar(
+        select(func.count()).select_from(LoanApplication).where(
+            LoanApplication.user_id == current_user.id
+        )
+    )
 
     if total_loans_count >= MAX_ACTIVE_LOANS_PER_USER:
         raise HTTPException(
@@ -105,11 +169,14 @@ def create_loan_application(
         ApplicationStatus.CREDIT_CHECK_PENDING.value,
         ApplicationStatus.CREDIT_CHECK_COMPLETED.value
     ]
-    existing = db.query(LoanApplication).filter(
-        LoanApplication.user_id == current_user.id,
-        LoanApplication.pan == application.pan,
-        LoanApplication.status.in_(active_statuses)
-    ).first()
+    result = await db.execute(
+        select(LoanApplication).where(
+            LoanApplication.user_id == current_user.id,
+            LoanApplication.pan == application.pan,
+            LoanApplication.status.in_(active_statuses)
+        )
+    )
+    existing = result.scalars().first()
 
     if existing:
         raise HTTPException(
@@ -134,89 +201,144 @@ def create_loan_application(
     )
     
     db.add(db_application)
-    db.commit()
-    db.refresh(db_application)
+    await db.flush()
+    await record_created(db, [db_application.id])
+    await db.commit()
+    await db.refresh(db_application)
+    mark_recent_write(response)
     
     return db_application
 
 
 @router.get("/{application_id}", response_model=LoanApplicationDetailResponse)
-def get_loan_application(
+async def get_loan_application(
     application_id: int,
-    db: Session = Depends(get_db)
+    request: Request,
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get loan application details by ID (Track Status).
     
     Returns full application details including KYC, Credit, and Eligibility results.
+    Supports conditional GET: send the ETag back in If-None-Match to get 304.
     """
-    application = db.query(LoanApplication).filter(
-        LoanApplication.id == application_id
-    ).first()
+    snapshot = await application_cache.get(db, application_id)
     
-    if not application:
+    if not snapshot:
         raise_not_found(f"Loan application with ID {application_id} not found")
     
-    # Build response with related data
-    response = LoanApplicationDetailResponse(
-        id=application.id,
-        full_name=application.full_name,
-        mobile=application.mobile,
-        pan=application.pan,
-        dob=application.dob,
-        email=application.email,
-        address=application.address,
-        employment_type=application.employment_type,
-        monthly_income=application.monthly_income,
-        loan_amount=application.loan_amount,
-        loan_purpose=application.loan_purpose,
-        status=application.status,
-        created_at=application.created_at,
-        updated_at=application.updated_at,
-        kyc_result=None,
-        credit_result=None,
-        eligibility_result=None
+    return conditional_json_response(
+        request,
+        snapshot["resources"]["application"],
+        snapshot["etags"]["application"],
+        snapshot["cache_control"]
     )
+
+
+@router.get("/{application_id}/events")
+async def get_application_events(
+    application_id: int,
+    request: Request,
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID")
+):
+    """
+    Server-Sent Events stream of the application's status changes (Track Status without polling).
     
-    # Add KYC result if exists
-    if application.kyc_result:
-        response.kyc_result = {
-            "name_match_score": application.kyc_result.name_match_score,
-            "status": application.kyc_result.status,
-            "pan_verified": application.kyc_result.pan_verified,
-            "address_verified": application.kyc_result.address_verified,
-            "created_at": application.kyc_result.created_at.isoformat() if application.kyc_result.created_at else None
-        }
-    
-    # Add Credit result if exists
-    if application.credit_result:
-        response.credit_result = {
-            "credit_score": application.credit_result.credit_score,
-            "active_loans": application.credit_result.active_loans,
-            "is_approved": application.credit_result.is_approved,
-            "rejection_reason": application.credit_result.rejection_reason,
-            "created_at": application.credit_result.created_at.isoformat() if application.credit_result.created_at else None
-        }
-    
-    # Add Eligibility result if exists
-    if application.eligibility_result:
-        response.eligibility_result = {
-            "max_emi": application.eligibility_result.max_emi,
-            "interest_rate": application.eligibility_result.interest_rate,
-            "tenure_months": application.eligibility_result.tenure_months,
-            "eligible_amount": application.eligibility_result.eligible_amount,
-            "is_eligible": application.eligibility_result.is_eligible,
-            "rejection_reasons": application.eligibility_result.rejection_reasons,
-            "created_at": application.eligibility_result.created_at.isoformat() if application.eligibility_result.created_at else None
-        }
-    
-    return response
+    Events:
+    - snapshot: current status with the KYC / credit / eligibility results
+      (first event, unless resuming)
+    - status: one transition {id, application_id, from, to, at}; after
+      KYC_COMPLETED, ELIGIBLE and NOT_ELIGIBLE it also carries the results
+    
+    Reconnecting with Last-Event-ID replays the missed transitions when
+    they are still buffered, and sends a fresh snapshot otherwise.
+    """
+    # Not a dependency: the session must not stay checked out for the stream's lifetime.
+    # Only an existence check: the snapshot itself is read from the primary
+    # once the stream has subscribed, so no transition falls in between.
+    async with read_session(request) as db:
+        exists = await db.scalar(select(LoanApplication.id).where(LoanApplication.id == application_id))
+    
+    if exists is None:
+        raise_not_found(f"Loan application with ID {application_id} not found")
+    
+    return StreamingResponse(
+        stream_application_events(application_id, last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/{application_id}/schedule", response_model=AmortizationScheduleResponse)
+async def get_loan_schedule(
+    application_id: int,
+    format: str = Query("json", pattern="^(json|csv)$", description="json or csv"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Amortization schedule for a loan application.
+    
+    Uses the requested loan amount with the rate and tenure of the
+    eligibility result, or the pricing grid's base terms before the
+    eligibility has been calculated.
+    """
+    snapshot = await application_cache.get(db, application_id)
+    
+    if not snapshot:
+        raise_not_found(f"Loan application with ID {application_id} not found")
+    
+    application = snapshot["resources"]["application"]
+    eligibility = snapshot["resources"]["eligibility"]
+    
+    if eligibility:
+        annual_rate, tenure_months = eligibility["interest_rate"], eligibility["tenure_months"]
+    else:
+        base = get_pricing_grid().base
+        annual_rate, tenure_months = base["rate"], base["tenure_months"]
+    
+    schedule = get_schedule(application["loan_amount"], annual_rate, tenure_months)
+    return schedule_response(schedule, format, filename=f"loan_{application_id}_schedule.csv")
+
+
+@router.post("/{application_id}/offers", response_model=OfferGridResponse)
+async def get_loan_offers(
+    application_id: int,
+    offer_request: Optional[OfferGridRequest] = None,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Offer grid for a loan application.
+    
+    Uses the application's income and employment type and, once the credit
+    check has run, its credit score. Without a body the grid covers 12-84
+    months and amounts up to the eligible cap.
+    """
+    snapshot = await application_cache.get(db, application_id)
+    
+    if not snapshot:
+        raise_not_found(f"Loan application with ID {application_id} not found")
+    
+    application = snapshot["resources"]["application"]
+    credit = snapshot["resources"]["credit"]
+    offer_request = offer_request or OfferGridRequest()
+    
+    body = get_offer_grid(
+        application["monthly_income"],
+        application["employment_type"],
+        credit["credit_score"] if credit else None,
+        offer_request.tenures,
+        offer_request.amounts,
+        offer_request.amount_steps
+    )
+    return Response(content=body, media_type="application/json")
 
 
 @router.post("/{application_id}/kyc", response_model=KYCPerformResponse)
-def perform_kyc(
+async def perform_kyc(
     application_id: int,
-    db: Session = Depends(get_db)
+    response: Response,
+    run_async: bool = Query(False, alias="async", description="Queue the check and return 202 with a job ID"),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Perform KYC verification for a loan application.
@@ -226,11 +348,16 @@ def perform_kyc(
     Rules:
     - nameMatchScore < 80 → KYC_FAILED → NOT_ELIGIBLE
     - nameMatchScore >= 80 → KYC_PASSED → KYC_COMPLETED
+    
+    With ?async=true the check is queued instead: the response is 202 with
+    the job (poll GET /jobs/{job_id}; its result is this endpoint's body).
+    Provider errors are retried with backoff in the background.
     """
     # Get application
-    application = db.query(LoanApplication).filter(
-        LoanApplication.id == application_id
-    ).first()
+    result = await db.execute(
+        select(LoanApplication).where(LoanApplication.id == application_id)
+    )
+    application = result.scalars().first()
     
     if not application:
         raise_not_found(f"Loan application with ID {application_id} not found")
@@ -238,55 +365,39 @@ def perform_kyc(
     # Validate workflow state (must be DRAFT)
     ensure_status(application.status, ApplicationStatus.DRAFT)
     
-    # Update status to KYC_PENDING
-    application.status = ApplicationStatus.KYC_PENDING.value
-    db.commit()
-    
-    # Perform KYC
-    kyc_service = get_kyc_service()
-    kyc_result = kyc_service.perform_kyc(
-        name=application.full_name,
-        pan=application.pan
-    )
-    
-    # Determine KYC status
-    kyc_passed = kyc_service.is_passed(kyc_result)
-    kyc_status = KYCStatus.PASSED if kyc_passed else KYCStatus.FAILED
-    
-    # Store KYC result
-    db_kyc = KYCResult(
-        loan_application_id=application.id,
-        name_match_score=kyc_result["nameMatchScore"],
-        status=kyc_status.value,
-        pan_verified=kyc_result.get("panVerified", "NO"),
-        address_verified=kyc_result.get("addressVerified", "NO"),
-        raw_response=json.dumps(kyc_result)
-    )
-    db.add(db_kyc)
-    
-    # Update application status based on KYC result
-    if kyc_passed:
-        application.status = ApplicationStatus.KYC_COMPLETED.value
-        message = "KYC verification passed. You can proceed to credit check."
-    else:
-        application.status = ApplicationStatus.NOT_ELIGIBLE.value
-        message = f"KYC verification failed. Name match score: {kyc_result['nameMatchScore']}. Minimum required: 80."
+    if run_async:
+        job = await enqueue_job(db, application, KYC)
+        return job_accepted_response(job)
     
-    db.commit()
+    # Claim the step before calling the provider: a concurrent request for
+    # this application loses the conditional update and gets 409
+    await change_status(db, application, ApplicationStatus.KYC_PENDING)
+    await db.commit()
+    application_cache.invalidate(application.id)
     
-    return KYCPerformResponse(
-        application_id=application.id,
-        name_match_score=kyc_result["nameMatchScore"],
-        kyc_status=kyc_status,
-        application_status=application.status,
-        message=message
-    )
+    # Perform KYC
+    try:
+        outcome = await complete_kyc(db, application)
+        await db.commit()
+    except BaseException:
+        # Whatever failed, don't leave the application stuck in KYC_PENDING; the call can be retried
+        await release_claim(db, application, ApplicationStatus.KYC_PENDING, ApplicationStatus.DRAFT)
+        application_cache.invalidate(application_id)
+        raise
+    
+    application_cache.invalidate(application.id)
+    mark_recent_write(response)
+    
+    return KYCPerformResponse(**outcome)
 
 
 @router.post("/{application_id}/credit-check", response_model=CreditCheckResponse)
-def perform_credit_check(
+async def perform_credit_check(
     application_id: int,
-    db: Session = Depends(get_db)
+    response: Response,
+    check_request: Optional[CreditCheckRequest] = None,
+    run_async: bool = Query(False, alias="async", description="Queue the check and return 202 with a job ID"),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Perform credit bureau check for a loan application.
@@ -296,11 +407,19 @@ def perform_credit_check(
     Rules:
     - Credit score < 650 → REJECT
     - Active loans > 5 → REJECT
+    
+    Bureau responses for the same PAN are reused within the freshness
+    window; send {"force_recheck": true} to pull fresh data.
+    
+    With ?async=true the check is queued instead: the response is 202 with
+    the job (poll GET /jobs/{job_id}; its result is this endpoint's body).
+    Provider errors are retried with backoff in the background.
     """
     # Get application
-    application = db.query(LoanApplication).filter(
-        LoanApplication.id == application_id
-    ).first()
+    result = await db.execute(
+        select(LoanApplication).where(LoanApplication.id == application_id)
+    )
+    application = result.scalars().first()
     
     if not application:
         raise_not_found(f"Loan application with ID {application_id} not found")
@@ -308,92 +427,47 @@ def perform_credit_check(
     # Validate workflow state (must be KYC_COMPLETED)
     ensure_status(application.status, ApplicationStatus.KYC_COMPLETED)
     
-    # Update status to CREDIT_CHECK_PENDING
-    application.status = ApplicationStatus.CREDIT_CHECK_PENDING.value
-    db.commit()
-    
-    # Perform credit check
-    credit_service = get_credit_bureau_service()
-    credit_result = credit_service.check_credit(pan=application.pan)
-    
-    # Determine if approved
-    is_approved = credit_service.is_approved(credit_result)
-    rejection_reasons = credit_service.get_rejection_reasons(credit_result) if not is_approved else []
-    
-    # Store credit result
-    db_credit = CreditResult(
-        loan_application_id=application.id,
-        credit_score=credit_result["credit_score"],
-        active_loans=credit_result["active_loans"],
-        credit_utilization=credit_result.get("credit_utilization"),
-        payment_history_score=credit_result.get("payment_history_score"),
-        is_approved=is_approved,
-        rejection_reason="; ".join(rejection_reasons) if rejection_reasons else None,
-        raw_response=json.dumps(credit_result)
-    )
-    db.add(db_credit)
-    
-    # Update application status based on credit check result
-    if is_approved:
-        application.status = ApplicationStatus.CREDIT_CHECK_COMPLETED.value
-        message = "Credit check passed. Calculating eligibility..."
-        
-        # Automatically calculate eligibility
-        eligibility = calculate_eligibility(
-            monthly_income=application.monthly_income,
-            employment_type=application.employment_type,
-            loan_amount=application.loan_amount,
-            credit_score=credit_result["credit_score"]
-        )
-        
-        # Store eligibility result
-        db_eligibility = EligibilityResult(
-            loan_application_id=application.id,
-            max_emi=eligibility["max_emi"],
-            interest_rate=eligibility["interest_rate"],
-            tenure_months=eligibility["tenure_months"],
-            eligible_amount=eligibility["eligible_amount"],
-            is_eligible=eligibility["is_eligible"],
-            rejection_reasons=eligibility["rejection_reasons"]
-        )
-        db.add(db_eligibility)
-        
-        # Update final status
-        if eligibility["is_eligible"]:
-            application.status = ApplicationStatus.ELIGIBLE.value
-            message = f"Congratulations! You are eligible for a loan up to ₹{eligibility['eligible_amount']:,.2f}"
-        else:
-            application.status = ApplicationStatus.NOT_ELIGIBLE.value
-            message = f"Not eligible: {eligibility['rejection_reasons']}"
-    else:
-        application.status = ApplicationStatus.NOT_ELIGIBLE.value
-        message = f"Credit check failed: {'; '.join(rejection_reasons)}"
-    
-    db.commit()
-    
-    return CreditCheckResponse(
-        application_id=application.id,
-        credit_score=credit_result["credit_score"],
-        active_loans=credit_result["active_loans"],
-        is_approved=is_approved,
-        rejection_reason="; ".join(rejection_reasons) if rejection_reasons else None,
-        application_status=application.status,
-        message=message
-    )
+    force_refresh = bool(check_request and check_request.force_recheck)
+    if run_async:
+        job = await enqueue_job(db, application, CREDIT_CHECK, {"force_refresh": force_refresh})
+        return job_accepted_response(job)
+    
+    # Claim the step before calling the provider: a concurrent request for
+    # this application loses the conditional update and gets 409
+    await change_status(db, application, ApplicationStatus.CREDIT_CHECK_PENDING)
+    await db.commit()
+    application_cache.invalidate(application.id)
+    
+    # Perform credit check (and eligibility when approved)
+    try:
+        outcome = await complete_credit_check(db, application, force_refresh=force_refresh)
+        await db.commit()
+    except BaseException:
+        # Whatever failed, don't leave the application stuck in CREDIT_CHECK_PENDING; the call can be retried
+        await release_claim(db, application, ApplicationStatus.CREDIT_CHECK_PENDING, ApplicationStatus.KYC_COMPLETED)
+        application_cache.invalidate(application_id)
+        raise
+    
+    application_cache.invalidate(application.id)
+    mark_recent_write(response)
+    
+    return CreditCheckResponse(**outcome)
 
 
 @router.put("/{application_id}", response_model=LoanApplicationResponse)
-def update_loan_application(
+async def update_loan_application(
     application_id: int,
     update_data: LoanApplicationUpdate,
-    db: Session = Depends(get_db)
+    response: Response,
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Update a loan application (only allowed in DRAFT status).
     """
-    application = db.query(LoanApplication).filter(
-        LoanApplication.id == application_id
-    ).first()
+    result = await db.execute(
+        select(LoanApplication).where(LoanApplication.id == application_id)
+    )
+    application = result.scalars().first()
     
     if not application:
         raise_not_found(f"Loan application with ID {application_id} not found")
@@ -422,7 +496,9 @@ def update_loan_application(
         if not validation_result["is_valid"]:
             raise_bad_request("; ".join(validation_result["errors"]))
     
-    db.commit()
-    db.refresh(application)
+    await db.commit()
+    await db.refresh(application)
+    application_cache.invalidate(application.id)
+    mark_recent_write(response)
     
     return application
@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import Optional
 
 
 class Settings(BaseSettings):
@@ -10,12 +11,143 @@ class Settings(BaseSettings):
     
     # Database (loaded from .env)
     DATABASE_URL: str
+    # Optional explicit async URL; derived from DATABASE_URL when not set
+    ASYNC_DATABASE_URL: Optional[str] = None
+    
+    # Connection pool (applies to both sync and async engines)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 10.0  # seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 1800  # seconds before a connection is recycled
+    DB_POOL_PRE_PING: bool = True
+    
+    # Read replicas (comma-separated URLs; empty = all reads go to the primary)
+    DATABASE_REPLICA_URLS: str = ""
+    REPLICA_MAX_LAG_SECONDS: float = 5.0  # replicas lagging more than this are skipped
+    REPLICA_LAG_CHECK_INTERVAL: float = 5.0  # seconds between lag probes per replica
+    READ_YOUR_WRITES_SECONDS: float = 10.0  # reads stick to the primary after a write
+    
+    # Loading strategy for LoanApplication relationships ("select" or "raise";
+    # set to "raise" in tests so accidental lazy loads / N+1 queries fail)
+    ORM_RELATIONSHIP_LAZY: str = "select"
+    
+    # Per-application response cache (GET /loan/{id}, /kyc/{id}, /credit/{id}, eligibility)
+    RESPONSE_CACHE_MAX_ENTRIES: int = 10000
+    RESPONSE_CACHE_TTL_SECONDS: float = 10.0
     
     # JWT Settings (loaded from .env)
     SECRET_KEY: str
     ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
     
+    # Verified-token cache (skips JWT decode and user lookup on hits). Invalidation
+    # on deactivation / role change is per process, so other workers can keep
+    # serving the old principal for up to AUTH_CACHE_TTL_SECONDS: keep it short.
+    AUTH_CACHE_MAX_ENTRIES: int = 50000
+    AUTH_CACHE_TTL_SECONDS: float = 5.0
+    
+    # Password hashing (bcrypt runs in a dedicated process pool)
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_QUEUE: int = 64  # waiting jobs beyond this get 503
+    
+    # External providers ("mock" or "http")
+    KYC_PROVIDER: str = "mock"
+    KYC_PROVIDER_URL: str = ""
+    CREDIT_BUREAU_PROVIDER: str = "mock"
+    CREDIT_BUREAU_URL: str = ""
+    PROVIDER_API_KEY: Optional[str] = None
+    PROVIDER_TIMEOUT_SECONDS: float = 5.0
+    PROVIDER_MAX_RETRIES: int = 2
+    PROVIDER_BACKOFF_BASE_SECONDS: float = 0.2
+    PROVIDER_BACKOFF_MAX_SECONDS: float = 2.0
+    PROVIDER_MAX_CONNECTIONS: int = 100
+    PROVIDER_MAX_KEEPALIVE: int = 20
+    
+    # Per-provider circuit breaker and bulkhead
+    BREAKER_WINDOW_SIZE: int = 20  # most recent calls the rates are computed over
+    BREAKER_MIN_CALLS: int = 10
+    BREAKER_FAILURE_RATE_THRESHOLD: float = 0.5
+    BREAKER_SLOW_CALL_SECONDS: float = 3.0
+    BREAKER_SLOW_CALL_RATE_THRESHOLD: float = 0.8
+    BREAKER_OPEN_SECONDS: float = 30.0
+    BREAKER_HALF_OPEN_CALLS: int = 3
+    PROVIDER_MAX_CONCURRENT_CALLS: int = 50
+    PROVIDER_BULKHEAD_WAIT_SECONDS: float = 0.1
+    
+    # Credit bureau response cache (keyed by PAN)
+    CREDIT_CACHE_ENABLED: bool = True
+    CREDIT_CACHE_FRESHNESS_DAYS: int = 30
+    CREDIT_CACHE_MAX_ENTRIES: int = 100000
+    CREDIT_PULL_COST: float = 0.0  # cost of one bureau pull, for the cost-saved metric
+    
+    # Batch KYC (POST /kyc/batch)
+    KYC_BATCH_MAX_SIZE: int = 5000
+    KYC_BATCH_CONCURRENCY: int = 20  # keep at or below PROVIDER_MAX_CONCURRENT_CALLS
+    KYC_BATCH_CHUNK_SIZE: int = 500
+    
+    # Batch credit check + eligibility (POST /credit/batch)
+    CREDIT_BATCH_MAX_SIZE: int = 5000
+    CREDIT_BATCH_CONCURRENCY: int = 20  # keep at or below PROVIDER_MAX_CONCURRENT_CALLS
+    CREDIT_BATCH_CHUNK_SIZE: int = 500
+    
+    # Bulk application import (POST /admin/loans/import)
+    IMPORT_BATCH_SIZE: int = 1000
+    IMPORT_MAX_ERRORS_REPORTED: int = 1000
+    
+    # Streaming export (GET /admin/loans/export)
+    EXPORT_FETCH_SIZE: int = 2000  # rows per server-side cursor fetch
+    
+    # Risk-based pricing: JSON grid of rate / tenures by credit band and
+    # employment type (built-in grid when unset), re-read when the file changes
+    PRICING_GRID_FILE: Optional[str] = None
+    PRICING_RELOAD_INTERVAL_SECONDS: float = 5.0
+    
+    # Amortization schedules (GET /loan/schedule, GET /loan/{id}/schedule)
+    SCHEDULE_CACHE_MAX_ENTRIES: int = 1024  # LRU keyed by (principal, rate, tenure)
+    SCHEDULE_CACHE_TTL_SECONDS: float = 3600.0
+    SCHEDULE_MAX_TENURE_MONTHS: int = 480
+    SCHEDULE_STREAM_MIN_MONTHS: int = 120  # longer JSON schedules are streamed
+    SCHEDULE_STREAM_CHUNK_ROWS: int = 60
+    
+    # Offer grids (POST /loan/offers, POST /loan/{id}/offers)
+    OFFER_CACHE_MAX_ENTRIES: int = 4096
+    OFFER_CACHE_TTL_SECONDS: float = 300.0
+    OFFER_AMOUNT_ROUNDING: int = 1000  # default amounts are multiples of this
+    
+    # Portfolio re-evaluation (python -m app.jobs.reevaluate_portfolio, POST /admin/reevaluations)
+    REEVALUATION_CHUNK_SIZE: int = 1000  # applications per keyset chunk / write transaction
+    REEVALUATION_WORKERS: int = 2  # scoring processes (0 = score in the event loop process)
+    REEVALUATION_MAX_DB_DUTY: float = 0.5  # max share of wall time spent reading / writing the database
+    REEVALUATION_MAX_DIFFS_REPORTED: int = 500
+    REEVALUATION_STALE_SECONDS: float = 300.0  # a RUNNING run without progress for this long can be resumed
+    
+    # Background jobs (?async=true on POST /loan/{id}/kyc and /loan/{id}/credit-check)
+    JOB_WORKERS: int = 2  # queue workers started in each API process (0 = only python -m app.jobs.job_worker)
+    JOB_POLL_INTERVAL_SECONDS: float = 1.0
+    JOB_MAX_ATTEMPTS: int = 5  # then the job is dead-lettered
+    JOB_RETRY_BASE_SECONDS: float = 2.0  # backoff doubles per attempt, with jitter
+    JOB_RETRY_MAX_SECONDS: float = 300.0
+    JOB_LEASE_SECONDS: float = 120.0  # a RUNNING job is reclaimed after this long (keep above provider timeouts)
+    
+    # Application status event streams (GET /loan/{id}/events)
+    SSE_NOTIFY_CHANNEL: str = "application_status"  # Postgres LISTEN/NOTIFY channel
+    SSE_HEARTBEAT_SECONDS: float = 15.0
+    SSE_RETRY_MILLISECONDS: int = 3000  # client reconnect delay
+    SSE_QUEUE_SIZE: int = 100  # undelivered events per stream before it is dropped
+    SSE_REPLAY_EVENTS: int = 50  # kept per application for Last-Event-ID resume
+    SSE_REPLAY_APPLICATIONS: int = 10000
+    SSE_REPLAY_TTL_SECONDS: float = 3600.0
+    
+    # Status transition log analytics (GET /admin/analytics/...)
+    STATUS_ANALYTICS_DEFAULT_HOURS: int = 24
+    STATUS_ANALYTICS_MAX_HOURS: int = 24 * 31  # longest window one request may scan
+    
+    # Single-flight coalescing of concurrent provider calls with the same key
+    SINGLE_FLIGHT_ENABLED: bool = True
+    SINGLE_FLIGHT_MODE: str = "process"  # "process" or "advisory" (Postgres advisory locks, across workers)
+    SINGLE_FLIGHT_RESULT_TTL_SECONDS: float = 30.0
+    
     class Config:
         env_file = ".env"
 
@@ -1,12 +1,181 @@
-from sqlalchemy import create_engine
+import itertools
+import time
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from fastapi import Request, Response
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.core.metrics import PoolMetrics
+
+
+def get_async_database_url(url: str) -> str:
+    """
+    Derive the async driver URL from a sync database URL.
+
+    postgresql:// and postgresql+psycopg2:// map to asyncpg,
+    sqlite:// maps to aiosqlite. Anything else is returned unchanged.
+    """
+    if url.startswith(("postgresql+asyncpg://", "postgresql+psycopg://", "sqlite+aiosqlite://")):
+        return url
+    for prefix in ("postgresql+psycopg2://", "postgresql://", "postgres://"):
+        if url.startswith(prefix):
+            return "postgresql+asyncpg://" + url[len(prefix):]
+    if url.startswith("sqlite://"):
+        return "sqlite+aiosqlite://" + url[len("sqlite://"):]
+    return url
+
+
+def get_engine_options(url: str) -> dict:
+    """
+    Pool options from Settings.
+
+    SQLite uses its own pool classes that don't accept size/overflow/timeout,
+    so only pre-ping and recycle are passed there.
+    """
+    options = {
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+    }
+    if not url.startswith("sqlite"):
+        options.update(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+        )
+    return options
 
-engine = create_engine(settings.DATABASE_URL)
+
+def instrument_pool(sync_engine, metrics: PoolMetrics) -> None:
+    """Attach pool event listeners that feed the given PoolMetrics"""
+    event.listen(sync_engine, "connect", lambda *args: metrics.connections_opened.inc())
+    event.listen(sync_engine, "invalidate", lambda *args: metrics.connections_invalidated.inc())
+
+
+engine = create_engine(settings.DATABASE_URL, **get_engine_options(settings.DATABASE_URL))
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine used by the request path (routers run as `async def`)
+ASYNC_DATABASE_URL = settings.ASYNC_DATABASE_URL or get_async_database_url(settings.DATABASE_URL)
+
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **get_engine_options(ASYNC_DATABASE_URL))
+
+# Pool telemetry for the primary async engine (exposed on /health/deep)
+pool_metrics = PoolMetrics()
+instrument_pool(async_engine.sync_engine, pool_metrics)
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
+
+# Replication lag in seconds; 0 when the replica has replayed everything it received
+REPLICA_LAG_SQL = """
+SELECT CASE
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+END
+"""
+
+# Cookie set after a write; while it is valid the client's reads go to the primary
+PRIMARY_STICKY_COOKIE = "los_read_primary_until"
+
+# Session.info flags set by read_session (see ApplicationResponseCache)
+READ_FROM_REPLICA = "read_from_replica"
+READ_YOUR_WRITES = "read_your_writes"
+
+
+class ReplicaRouter:
+    """
+    Round-robin load balancing across read replicas.
+
+    Each replica's lag is probed at most once per REPLICA_LAG_CHECK_INTERVAL;
+    replicas lagging beyond REPLICA_MAX_LAG_SECONDS (or failing the probe)
+    are skipped. When no replica qualifies, `pick` returns None and the
+    caller falls back to the primary.
+    """
+
+    def __init__(self, urls: list, max_lag_seconds: float, check_interval: float):
+        self.urls = urls
+        self.engines = [create_async_engine(url, **get_engine_options(url)) for url in urls]
+        self.session_factories = [
+            async_sessionmaker(bind=replica, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+            for replica in self.engines
+        ]
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval = check_interval
+        self._lag = [0.0] * len(urls)
+        self._checked_at = [0.0] * len(urls)
+        self._cursor = itertools.count()
+
+    async def _refresh_lag(self, index: int) -> None:
+        now = time.monotonic()
+        if now - self._checked_at[index] < self.check_interval:
+            return
+        self._checked_at[index] = now
+        
+        replica = self.engines[index]
+        if replica.dialect.name != "postgresql":
+            self._lag[index] = 0.0
+            return
+        
+        try:
+            async with replica.connect() as conn:
+                self._lag[index] = float(await conn.scalar(text(REPLICA_LAG_SQL)) or 0)
+        except Exception:
+            self._lag[index] = float("inf")
+
+    async def pick(self) -> Optional[async_sessionmaker]:
+        """Return the next healthy replica's session factory, or None"""
+        for _ in range(len(self.engines)):
+            index = next(self._cursor) % len(self.engines)
+            await self._refresh_lag(index)
+            if self._lag[index] <= self.max_lag_seconds:
+                return self.session_factories[index]
+        return None
+
+    def snapshot(self) -> list:
+        """Last known lag per replica (host only, credentials stripped)"""
+        return [
+            {
+                "host": replica.url.host,
+                "database": replica.url.database,
+                "lag_seconds": None if lag == float("inf") else round(lag, 3),
+                "healthy": lag <= self.max_lag_seconds
+            }
+            for replica, lag in zip(self.engines, self._lag)
+        ]
+
+    async def dispose(self) -> None:
+        for replica in self.engines:
+            await replica.dispose()
+
+
+REPLICA_URLS = [
+    get_async_database_url(url.strip())
+    for url in settings.DATABASE_REPLICA_URLS.split(",")
+    if url.strip()
+]
+
+replica_router = ReplicaRouter(
+    REPLICA_URLS,
+    max_lag_seconds=settings.REPLICA_MAX_LAG_SECONDS,
+    check_interval=settings.REPLICA_LAG_CHECK_INTERVAL
+) if REPLICA_URLS else None
+
+replica_pool_metrics = PoolMetrics()
+if replica_router:
+    for replica in replica_router.engines:
+        instrument_pool(replica.sync_engine, replica_pool_metrics)
+
 Base = declarative_base()
 
 
@@ -19,6 +188,100 @@ def get_db():
         db.close()
 
 
+async def acquire_connection(db: AsyncSession, metrics: PoolMetrics) -> None:
+    """
+    Check out the session's connection up front, recording the pool wait
+    time and counting checkouts that time out.
+    """
+    start = time.perf_counter()
+    try:
+        await db.connection()
+    except PoolTimeoutError:
+        metrics.checkout_failures.inc()
+        raise
+    metrics.checkout_wait.observe((time.perf_counter() - start) * 1000)
+
+
+async def get_async_db():
+    """Dependency to get async database session"""
+    async with AsyncSessionLocal() as db:
+        await acquire_connection(db, pool_metrics)
+        yield db
+
+
+def mark_recent_write(response: Response) -> None:
+    """Pin the client's subsequent reads to the primary for READ_YOUR_WRITES_SECONDS"""
+    until = time.time() + settings.READ_YOUR_WRITES_SECONDS
+    response.set_cookie(
+        PRIMARY_STICKY_COOKIE,
+        f"{until:.3f}",
+        max_age=int(settings.READ_YOUR_WRITES_SECONDS) + 1,
+        httponly=True,
+        samesite="lax"
+    )
+
+
+def is_primary_sticky(request: Request) -> bool:
+    """True if the client wrote recently and must read from the primary"""
+    value = request.cookies.get(PRIMARY_STICKY_COOKIE)
+    if not value:
+        return False
+    try:
+        return float(value) > time.time()
+    except ValueError:
+        return False
+
+
+@asynccontextmanager
+async def read_session(request: Optional[Request] = None):
+    """
+    Open a session for read-only work.
+
+    Uses a healthy replica when one is configured, falling back to the
+    primary when replicas lag or the client has a recent write. The session
+    is flagged with READ_FROM_REPLICA or READ_YOUR_WRITES accordingly.
+    """
+    sticky = bool(request and is_primary_sticky(request))
+    factory = None
+    if replica_router and not sticky:
+        factory = await replica_router.pick()
+    
+    if factory is None:
+        async with AsyncSessionLocal() as db:
+            db.info[READ_YOUR_WRITES] = sticky
+            await acquire_connection(db, pool_metrics)
+            yield db
+        return
+    
+    async with factory() as db:
+        db.info[READ_FROM_REPLICA] = True
+        await acquire_connection(db, replica_pool_metrics)
+        yield db
+
+
+async def get_read_db(request: Request):
+    """Dependency to get a session for read-only endpoints (see read_session)"""
+    async with read_session(request) as db:
+        yield db
+
+
+async def ping_database(bind=None) -> float:
+    """Run a trivial round trip and return its latency in milliseconds"""
+    bind = bind or async_engine
+    start = time.perf_counter()
+    async with bind.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+    return (time.perf_counter() - start) * 1000
+
+
 def create_tables():
     """Create all tables in the database"""
     Base.metadata.create_all(bind=engine)
+
+
+async def dispose_engines():
+    """Close all pooled connections (called on application shutdown)"""
+    await async_engine.dispose()
+    if replica_router:
+        await replica_router.dispose()
+    engine.dispose()
@@ -0,0 +1,111 @@
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import bcrypt
+
+from app.core.config import settings
+from app.utils.exceptions import raise_service_unavailable
+
+
+# bcrypt only uses the first 72 bytes of a password
+BCRYPT_MAX_PASSWORD_BYTES = 72
+
+
+def _password_bytes(password: str) -> bytes:
+    return password.encode("utf-8")[:BCRYPT_MAX_PASSWORD_BYTES]
+
+
+def bcrypt_hash(password: str, rounds: int) -> str:
+    """Hash a password with the given bcrypt cost (runs in a pool process)"""
+    return bcrypt.hashpw(_password_bytes(password), bcrypt.gensalt(rounds=rounds)).decode("utf-8")
+
+
+def bcrypt_verify(password: str, hashed_password: str) -> bool:
+    """Check a password against a bcrypt hash (runs in a pool process)"""
+    try:
+        return bcrypt.checkpw(_password_bytes(password), hashed_password.encode("utf-8"))
+    except ValueError:
+        # Malformed stored hash
+        return False
+
+
+def get_hash_rounds(hashed_password: str) -> int:
+    """Extract the cost factor from a $2b$<cost>$... hash (0 if unparseable)"""
+    try:
+        return int(hashed_password.split("$")[2])
+    except (IndexError, ValueError):
+        return 0
+
+
+def needs_rehash(hashed_password: str) -> bool:
+    """True if the hash was made with a different cost than BCRYPT_ROUNDS"""
+    return get_hash_rounds(hashed_password) != settings.BCRYPT_ROUNDS
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt in a dedicated, size-limited process pool.
+    
+    bcrypt is deliberately slow and CPU bound; running it in the event loop
+    or the shared threadpool stalls unrelated endpoints. Work beyond
+    `max_queue` waiting jobs is rejected with 503 instead of piling up.
+    """
+    
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self.rejected = 0
+    
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn: never fork a process that already runs an event loop and threads
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+    
+    async def _submit(self, fn, *args):
+        if self._in_flight >= self.workers + self.max_queue:
+            self.rejected += 1
+            raise_service_unavailable("Authentication is busy, please retry shortly")
+        
+        self._in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self._in_flight -= 1
+    
+    async def hash(self, password: str) -> str:
+        return await self._submit(bcrypt_hash, password, settings.BCRYPT_ROUNDS)
+    
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self._submit(bcrypt_verify, password, hashed_password)
+    
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "in_flight": self._in_flight,
+            "rejected": self.rejected,
+            "rounds": settings.BCRYPT_ROUNDS
+        }
+    
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE
+)
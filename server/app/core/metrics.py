@@ -0,0 +1,103 @@
+import threading
+from bisect import bisect_left
+
+
+# Default latency buckets in milliseconds (upper bounds, +Inf implied)
+DEFAULT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class LatencyHistogram:
+    """
+    Thread-safe cumulative latency histogram.
+
+    Observations are recorded in milliseconds into fixed buckets,
+    Prometheus style (each bucket counts observations <= its bound).
+    """
+
+    def __init__(self, buckets_ms: tuple = DEFAULT_BUCKETS_MS):
+        self.buckets_ms = tuple(sorted(buckets_ms))
+        self._counts = [0] * (len(self.buckets_ms) + 1)
+        self._sum_ms = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value_ms: float) -> None:
+        """Record a single observation (milliseconds)"""
+        index = bisect_left(self.buckets_ms, value_ms)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum_ms += value_ms
+            self._count += 1
+
+    def snapshot(self) -> dict:
+        """Return cumulative bucket counts, count, sum and mean"""
+        with self._lock:
+            counts = list(self._counts)
+            total = self._count
+            total_ms = self._sum_ms
+
+        buckets = {}
+        running = 0
+        for bound, count in zip(self.buckets_ms, counts):
+            running += count
+            buckets[f"le_{bound}ms"] = running
+        buckets["le_inf"] = total
+
+        return {
+            "count": total,
+            "sum_ms": round(total_ms, 3),
+            "mean_ms": round(total_ms / total, 3) if total else 0.0,
+            "buckets": buckets
+        }
+
+
+class Counter:
+    """Thread-safe monotonically increasing counter"""
+
+    def __init__(self):
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: int = 1) -> None:
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> int:
+        return self._value
+
+
+class PoolMetrics:
+    """
+    Connection pool telemetry.
+
+    Live pool gauges (size, checked out, overflow) are read from the pool
+    itself; checkout wait time and failures are recorded by the session
+    dependency, which acquires the connection up front.
+    """
+
+    def __init__(self):
+        self.checkout_wait = LatencyHistogram()
+        self.checkout_failures = Counter()
+        self.connections_opened = Counter()
+        self.connections_invalidated = Counter()
+
+    def snapshot(self, pool=None) -> dict:
+        """Return recorded telemetry, merged with live statistics when a pool is given"""
+        stats = {
+            "checkout_wait": self.checkout_wait.snapshot(),
+            "checkout_failures": self.checkout_failures.value,
+            "connections_opened": self.connections_opened.value,
+            "connections_invalidated": self.connections_invalidated.value
+        }
+        if pool is None:
+            return stats
+
+        stats["pool_class"] = type(pool).__name__
+        # QueuePool exposes size/checkedout/overflow; other pools (e.g. SQLite's) may not
+        for name in ("size", "checkedin", "checkedout", "overflow"):
+            getter = getattr(pool, name, None)
+            if callable(getter):
+                stats[name] = getter()
+
+        return stats
@@ -1,30 +1,99 @@
+import hashlib
+import time
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
-import bcrypt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.cache import TTLCache
 from app.core.config import settings
-from app.core.database import get_db
+from app.core.database import get_async_db
+from app.core.hashing import bcrypt_hash, bcrypt_verify
+from app.schemas.user import Principal
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
 
+class PrincipalCache:
+    """
+    Cache of verified tokens, keyed by the SHA-256 digest of the token.
+    
+    Each entry holds the decoded claims and a slim user snapshot, so a hit
+    skips both JWT verification and the users lookup. Entries never outlive
+    the token's `exp` claim. `invalidate_user` bumps a per-user epoch that
+    makes every cached token of that user miss (e.g. after deactivation
+    or promotion); a lookup that raced with the invalidation is not stored.
+    
+    The epoch only changes in the worker that handled the admin request;
+    other workers drop the user's entries when they expire, so
+    AUTH_CACHE_TTL_SECONDS is the window in which a deactivated or demoted
+    user can still be served elsewhere. Epochs are kept for the same TTL:
+    every entry cached before a bump expires no later than the bump itself.
+    """
+    
+    def __init__(self, maxsize: int, ttl: float):
+        self.entries = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._epochs = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def digest(token: str) -> str:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+    
+    def epoch(self, email: str) -> int:
+        return self._epochs.get(email, 0)
+    
+    def get(self, token: str) -> Optional[tuple]:
+        """Return (claims, principal) for a cached token, or None"""
+        entry = self.entries.get(self.digest(token))
+        if entry is None or entry[2] != self.epoch(entry[1].email):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[0], entry[1]
+    
+    def put(self, token: str, claims: dict, principal: Principal, epoch: int) -> None:
+        """Cache a verified token; `epoch` must be read before the user lookup"""
+        if epoch != self.epoch(principal.email):
+            return
+        ttl = self.entries.ttl
+        if claims.get("exp"):
+            ttl = min(ttl, claims["exp"] - time.time())
+        if ttl > 0:
+            self.entries.set(self.digest(token), (claims, principal, epoch), ttl=ttl)
+    
+    def invalidate_user(self, email: str) -> None:
+        self._epochs.set(email, self.epoch(email) + 1)
+    
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.entries),
+            "maxsize": self.entries.maxsize,
+            "ttl_seconds": self.entries.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+principal_cache = PrincipalCache(
+    maxsize=settings.AUTH_CACHE_MAX_ENTRIES,
+    ttl=settings.AUTH_CACHE_TTL_SECONDS
+)
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a plain password against a hashed password"""
-    return bcrypt.checkpw(
-        plain_password.encode('utf-8'), 
-        hashed_password.encode('utf-8')
-    )
+    """Verify a plain password against a hashed password (blocking; prefer password_hasher.verify)"""
+    return bcrypt_verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
-    """Hash a password using bcrypt"""
-    # Truncate to 72 bytes (bcrypt limit)
-    password_bytes = password.encode('utf-8')[:72]
-    salt = bcrypt.gensalt()
-    return bcrypt.hashpw(password_bytes, salt).decode('utf-8')
+    """Hash a password using bcrypt (blocking; prefer password_hasher.hash)"""
+    return bcrypt_hash(password, settings.BCRYPT_ROUNDS)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -54,11 +123,15 @@ def decode_token(token: str) -> dict:
 
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-):
+    db: AsyncSession = Depends(get_async_db)
+) -> Principal:
     """Get the current authenticated user from the token"""
     from app.models.user import User
     
+    cached = principal_cache.get(token)
+    if cached is not None:
+        return cached[1]
+    
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -73,11 +146,21 @@ async def get_current_user(
     except JWTError:
         raise credentials_exception
     
-    user = db.query(User).filter(User.email == email).first()
+    epoch = principal_cache.epoch(email)
+    result = await db.execute(select(User).where(User.email == email))
+    user = result.scalars().first()
     if user is None:
         raise credentials_exception
     
-    return user
+    principal = Principal(
+        id=user.id,
+        email=user.email,
+        is_active=user.is_active,
+        is_admin=user.is_admin
+    )
+    principal_cache.put(token, payload, principal, epoch)
+    
+    return principal
 
 
 async def get_current_active_user(current_user = Depends(get_current_user)):
@@ -0,0 +1,42 @@
+"""
+Run background job workers (KYC / credit checks queued with ?async=true)
+outside the API processes.
+
+Usage:
+    python -m app.jobs.job_worker [--workers N]
+"""
+import argparse
+import asyncio
+
+from app.core.config import settings
+from app.core.database import dispose_engines
+from app.services.http_client import provider_http_client
+from app.services.job_queue_service import JobWorkerPool
+
+
+async def run(workers: int) -> None:
+    pool = JobWorkerPool(workers=workers, poll_interval=settings.JOB_POLL_INTERVAL_SECONDS)
+    await provider_http_client.startup()
+    pool.start()
+    print(f"{workers} job worker(s) running as {pool.name}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await pool.stop()
+        await provider_http_client.shutdown()
+        await dispose_engines()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=max(settings.JOB_WORKERS, 1), help="Concurrent jobs")
+    args = parser.parse_args()
+    
+    try:
+        asyncio.run(run(args.workers))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+"""
+Rebuild the application status counters and report drift.
+
+Usage:
+    python -m app.jobs.reconcile_status_counters
+"""
+import asyncio
+import json
+
+from app.core.database import AsyncSessionLocal, dispose_engines
+from app.services.status_counter_service import reconcile_status_counters
+
+
+async def run() -> dict:
+    try:
+        async with AsyncSessionLocal() as db:
+            report = await reconcile_status_counters(db)
+            await db.commit()
+    finally:
+        await dispose_engines()
+    return report
+
+
+def main():
+    report = asyncio.run(run())
+    print(json.dumps(report, indent=2))
+    if report["total_drift"]:
+        print(f"Corrected drift of {report['total_drift']} application(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Re-evaluate every decided (ELIGIBLE / NOT_ELIGIBLE) application against the
+current rules and pricing grid, and write the changed decisions.
+
+Usage:
+    python -m app.jobs.reevaluate_portfolio [--dry-run] [--workers N]
+    python -m app.jobs.reevaluate_portfolio --resume RUN_ID
+"""
+import argparse
+import asyncio
+import json
+
+from app.core.database import AsyncSessionLocal, dispose_engines
+from app.services.reevaluation_service import resume_run, run_reevaluation, start_run
+
+
+async def run(dry_run: bool, resume: int = None, workers: int = None) -> dict:
+    try:
+        async with AsyncSessionLocal() as db:
+            if resume:
+                evaluation = await resume_run(db, resume)
+            else:
+                evaluation = await start_run(db, dry_run=dry_run)
+            run_id = evaluation.id
+        print(f"Re-evaluation run {run_id} (resume it with --resume {run_id} if interrupted)")
+        report = await run_reevaluation(run_id, workers=workers)
+    finally:
+        await dispose_engines()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="Report the changes without writing them")
+    parser.add_argument("--resume", type=int, metavar="RUN_ID", help="Continue a failed or interrupted run")
+    parser.add_argument("--workers", type=int, help="Scoring processes (default REEVALUATION_WORKERS)")
+    args = parser.parse_args()
+    
+    report = asyncio.run(run(args.dry_run, args.resume, args.workers))
+    print(json.dumps(report, indent=2))
+    print(f"Scanned {report['scanned']} application(s), {report['changed']} changed")
+
+
+if __name__ == "__main__":
+    main()
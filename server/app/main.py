@@ -4,10 +4,49 @@ from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
 
 from app.core.config import settings
-from app.core.database import create_tables
+from app.core.database import (
+    create_tables,
+    dispose_engines,
+    AsyncSessionLocal,
+    async_engine,
+    pool_metrics,
+    ping_database,
+    replica_router,
+    replica_pool_metrics
+)
+from app.core.security import principal_cache
+from app.core.hashing import password_hasher
+from app.services.http_client import provider_http_client
+from app.services import credit_bureau_service
+from app.services.single_flight import single_flights
+from app.services.application_service import application_cache
+from app.services.schedule_service import schedule_cache
+from app.services.pricing_service import pricing_grid_loader
+from app.services.offer_service import offer_cache
+from app.services.job_queue_service import job_workers
+from app.services.event_hub import status_event_hub
+from app.services.status_counter_service import seed_status_counters
 from app.utils.exceptions import LOSException
-from app.api.v1 import auth, loan, kyc, credit, admin
+from app.api.v1 import auth, loan, kyc, credit, admin, jobs
+
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application startup / shutdown hooks"""
+    pricing_grid_loader.get()  # load the pricing grid and its factor tables (fails fast on a bad file)
+    async with AsyncSessionLocal() as db:
+        # First start on an existing database: build the status counters from loan_applications
+        if await seed_status_counters(db):
+            await db.commit()
+    await provider_http_client.startup()
+    await status_event_hub.start()
+    job_workers.start()
+    yield
+    await job_workers.stop()
+    await status_event_hub.stop()
+    await provider_http_client.shutdown()
+    password_hasher.shutdown()
+    await dispose_engines()
 
 
 # Create FastAPI application
@@ -25,7 +64,8 @@ app = FastAPI(
     """,
     version=settings.APP_VERSION,
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -35,15 +75,18 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
 
 # Global exception handler for custom exceptions
 @app.exception_handler(LOSException)
 async def los_exception_handler(request: Request, exc: LOSException):
+    retry_after = getattr(exc, "retry_after", None)
     return JSONResponse(
         status_code=exc.status_code,
-        content={"detail": exc.message}
+        content={"detail": exc.message},
+        headers={"Retry-After": str(retry_after)} if retry_after else None
     )
 
 
@@ -53,6 +96,7 @@ app.include_router(loan.router, prefix="/api/v1")
 app.include_router(kyc.router, prefix="/api/v1")
 app.include_router(credit.router, prefix="/api/v1")
 app.include_router(admin.router, prefix="/api/v1")
+app.include_router(jobs.router, prefix="/api/v1")
 
 
 @app.get("/", tags=["Health"])
@@ -63,6 +107,7 @@ def root():
         "docs": "/docs",
         "redoc": "/redoc",
         "health_check": "/health",
+        "deep_health_check": "/health/deep",
     }
 
 
@@ -76,6 +121,61 @@ def health_check():
     }
 
 
+# Deep health check: DB round trip + connection pool statistics
+@app.get("/health/deep", tags=["Health"])
+async def deep_health_check():
+    database = {}
+    healthy = True
+    
+    try:
+        database["latency_ms"] = round(await ping_database(), 3)
+        database["status"] = "up"
+    except Exception as exc:
+        healthy = False
+        database["status"] = "down"
+        database["error"] = str(exc)
+    
+    content = {
+        "status": "healthy" if healthy else "unhealthy",
+        "app": settings.APP_NAME,
+        "version": settings.APP_VERSION,
+        "database": database,
+        "pool": pool_metrics.snapshot(async_engine.sync_engine.pool),
+    }
+    
+    if replica_router:
+        content["replicas"] = replica_router.snapshot()
+        content["replica_pool"] = replica_pool_metrics.snapshot()
+    
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if healthy else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content=content
+    )
+
+
+# In-process metrics (per worker)
+@app.get("/metrics", tags=["Health"])
+def metrics():
+    content = {
+        "auth_cache": principal_cache.stats(),
+        "response_cache": application_cache.entries.stats(),
+        "schedule_cache": schedule_cache.stats(),
+        "pricing": pricing_grid_loader.stats(),
+        "offer_cache": offer_cache.stats(),
+        "password_hasher": password_hasher.stats(),
+        "job_workers": job_workers.stats(),
+        "event_hub": status_event_hub.stats(),
+    }
+    
+    if credit_bureau_service.credit_bureau_cache:
+        content["credit_cache"] = credit_bureau_service.credit_bureau_cache.stats()
+    
+    content["single_flight"] = {name: flight.stats() for name, flight in single_flights.items()}
+    content["providers"] = provider_http_client.snapshot()
+    
+    return content
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
@@ -29,6 +29,10 @@ class CreditResult(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
+    # Set when a portfolio re-evaluation fails the application before this
+    # result (kept for the audit trail; a new credit check replaces it)
+    superseded_at = Column(DateTime(timezone=True))
+    
     # Relationship
     loan_application = relationship("LoanApplication", back_populates="credit_result")
 
@@ -49,9 +53,17 @@ class EligibilityResult(Base):
     is_eligible = Column(Boolean, default=False)
     rejection_reasons = Column(String(1000))
     
+    # Pricing used (credit-score band, NULL without a score, and grid version)
+    score_band = Column(String(20))
+    pricing_version = Column(String(50))
+    
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
+    # Set when a portfolio re-evaluation fails the application before this
+    # result (kept for the audit trail; a new credit check replaces it)
+    superseded_at = Column(DateTime(timezone=True))
+    
     # Relationship
     loan_application = relationship("LoanApplication", back_populates="eligibility_result")
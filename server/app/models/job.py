@@ -0,0 +1,43 @@
+from sqlalchemy import Column, DateTime, Index, Integer, String, Text
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class Job(Base):
+    """
+    Background job (KYC or credit check of one application).
+
+    Workers claim due jobs with SELECT ... FOR UPDATE SKIP LOCKED, so several
+    workers share the queue without blocking on each other. A job that fails
+    with a provider error goes back to QUEUED with a later run_after; after
+    max_attempts it is left DEAD (the dead-letter set) for an admin to requeue.
+    """
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # Claim query: due QUEUED jobs (and expired RUNNING leases) in run_after order
+        Index("ix_jobs_status_run_after", "status", "run_after"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String(50), nullable=False)  # KYC or CREDIT_CHECK
+    loan_application_id = Column(Integer, nullable=False, index=True)
+    payload = Column(Text)  # JSON options of the job (e.g. force_refresh)
+
+    # QUEUED, RUNNING, SUCCEEDED or DEAD
+    status = Column(String(20), nullable=False, default="QUEUED")
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False)
+    run_after = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+    # Lease of the worker running the job
+    locked_by = Column(String(100))
+    locked_at = Column(DateTime(timezone=True))
+
+    # Outcome: the endpoint's response body (JSON) or the last error
+    result = Column(Text)
+    last_error = Column(String(1000))
+
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    finished_at = Column(DateTime(timezone=True))
@@ -1,12 +1,18 @@
-from sqlalchemy import Column, Integer, String, Float, Date, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
+from app.core.config import settings
 from app.core.database import Base
 from app.core.enums import ApplicationStatus, EmploymentType
 
 
 class LoanApplication(Base):
     __tablename__ = "loan_applications"
+    __table_args__ = (
+        # Keyset pagination: ORDER BY created_at DESC, id DESC (optionally filtered by status)
+        Index("ix_loan_applications_created_at_id", "created_at", "id"),
+        Index("ix_loan_applications_status_created_at_id", "status", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     
@@ -37,7 +43,8 @@ class LoanApplication(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     # Relationships
-    user = relationship("User", back_populates="loan_applications")
-    kyc_result = relationship("KYCResult", back_populates="loan_application", uselist=False)
-    credit_result = relationship("CreditResult", back_populates="loan_application", uselist=False)
-    eligibility_result = relationship("EligibilityResult", back_populates="loan_application", uselist=False)
+    # (lazy strategy is configurable so tests can make lazy loads raise)
+    user = relationship("User", back_populates="loan_applications", lazy=settings.ORM_RELATIONSHIP_LAZY)
+    kyc_result = relationship("KYCResult", back_populates="loan_application", uselist=False, lazy=settings.ORM_RELATIONSHIP_LAZY)
+    credit_result = relationship("CreditResult", back_populates="loan_application", uselist=False, lazy=settings.ORM_RELATIONSHIP_LAZY)
+    eligibility_result = relationship("EligibilityResult", back_populates="loan_application", uselist=False, lazy=settings.ORM_RELATIONSHIP_LAZY)
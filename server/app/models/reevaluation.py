@@ -0,0 +1,36 @@
+from sqlalchemy import Boolean, Column, DateTime, Integer, String, Text
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class ReevaluationRun(Base):
+    """
+    Progress and diff report of a portfolio re-evaluation.
+
+    last_application_id is the keyset checkpoint: it is written in the same
+    transaction as each chunk's decisions, so a resumed run continues right
+    after the last chunk that was committed.
+    """
+    __tablename__ = "reevaluation_runs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    status = Column(String(20), nullable=False, default="RUNNING")  # RUNNING, COMPLETED or FAILED
+    dry_run = Column(Boolean, nullable=False, default=False)
+
+    # Rules and pricing grid version the run scores against (JSON)
+    rules = Column(Text, nullable=False)
+
+    # Checkpoint and counts
+    last_application_id = Column(Integer, nullable=False, default=0)
+    scanned = Column(Integer, nullable=False, default=0)
+    changed = Column(Integer, nullable=False, default=0)
+    chunks = Column(Integer, nullable=False, default=0)
+
+    # Diff report (JSON) and the error of a failed run
+    report = Column(Text)
+    error = Column(String(1000))
+
+    # Timestamps (updated_at doubles as the heartbeat of a running job)
+    started_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    finished_at = Column(DateTime(timezone=True))
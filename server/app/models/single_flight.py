@@ -0,0 +1,17 @@
+from sqlalchemy import Column, DateTime, String, Text
+from app.core.database import Base
+
+
+class SingleFlightResult(Base):
+    """
+    Short-lived result of a coalesced provider call.
+
+    Written by the worker that held the advisory lock for the key, so
+    workers that were waiting on the same lock can reuse the result
+    instead of calling the provider again.
+    """
+    __tablename__ = "single_flight_results"
+
+    key = Column(String(255), primary_key=True)
+    result = Column(Text, nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, String
+from app.core.database import Base
+
+
+class ApplicationStatusCounter(Base):
+    """
+    Running count of loan applications per status.
+
+    Each status is spread over several shard rows so concurrent transitions
+    don't all queue on the same row lock; readers sum the shards.
+    """
+    __tablename__ = "application_status_counters"
+
+    status = Column(String(50), primary_key=True)
+    shard = Column(Integer, primary_key=True, default=0)
+    count = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,31 @@
+from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, Index, Integer, String
+from app.core.database import Base
+
+
+class ApplicationStatusEvent(Base):
+    """
+    Append-only log of application status transitions.
+
+    entered_at is when the application entered from_status (the occurred_at
+    of its previous event), filled in when the event is written. The time
+    spent in a state is then a single-row difference, and time-in-state and
+    throughput queries are range scans over (from_status, occurred_at) and
+    (occurred_at, to_status) that the indexes below fully cover.
+    """
+    __tablename__ = "application_status_events"
+    __table_args__ = (
+        Index("ix_application_status_events_application_occurred", "application_id", "occurred_at"),
+        Index("ix_application_status_events_from_occurred", "from_status", "occurred_at", "entered_at"),
+        Index("ix_application_status_events_occurred_to", "occurred_at", "to_status"),
+    )
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    application_id = Column(Integer, ForeignKey("loan_applications.id"), nullable=False)
+
+    # Transition (from_status is None for a newly created application)
+    from_status = Column(String(50))
+    to_status = Column(String(50), nullable=False)
+
+    # When it happened, and when the application entered from_status
+    occurred_at = Column(DateTime(timezone=True), nullable=False)
+    entered_at = Column(DateTime(timezone=True))
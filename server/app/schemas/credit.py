@@ -1,6 +1,7 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field, field_validator
+from typing import List, Optional
 from datetime import datetime
+from app.core.enums import EmploymentType
 
 
 class CreditResultBase(BaseModel):
@@ -23,6 +24,7 @@ class CreditResultResponse(CreditResultBase):
     is_approved: bool
     rejection_reason: Optional[str] = None
     created_at: datetime
+    superseded_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
@@ -49,6 +51,8 @@ class EligibilityResultBase(BaseModel):
     interest_rate: float
     tenure_months: int
     eligible_amount: Optional[float] = None
+    score_band: Optional[str] = None
+    pricing_version: Optional[str] = None
 
 
 class EligibilityResultCreate(EligibilityResultBase):
@@ -63,6 +67,7 @@ class EligibilityResultResponse(EligibilityResultBase):
     is_eligible: bool
     rejection_reasons: Optional[str] = None
     created_at: datetime
+    superseded_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
@@ -79,3 +84,80 @@ class EligibilityResponse(BaseModel):
     rejection_reasons: Optional[str] = None
     application_status: str
     message: str
+
+
+class CreditBatchRequest(BaseModel):
+    """Request body for batch credit check"""
+    application_ids: List[int] = Field(..., min_length=1)
+    force_recheck: Optional[bool] = False
+
+
+class CreditBatchItem(BaseModel):
+    """Outcome of the credit check and eligibility for one application in a batch"""
+    application_id: int
+    outcome: str  # ELIGIBLE, NOT_ELIGIBLE, SKIPPED, NOT_FOUND, PROVIDER_ERROR or ERROR
+    credit_score: Optional[int] = None
+    active_loans: Optional[int] = None
+    is_approved: Optional[bool] = None
+    eligible_amount: Optional[float] = None
+    application_status: Optional[str] = None
+    message: str
+
+
+class CreditBatchResponse(BaseModel):
+    """Response after batch credit check is performed"""
+    total: int
+    processed: int
+    eligible: int
+    not_eligible: int
+    unprocessed: int  # SKIPPED, NOT_FOUND, PROVIDER_ERROR and ERROR items
+    items: List[CreditBatchItem]
+
+
+class OfferGridRequest(BaseModel):
+    """Optional tenures and amounts for the offer grid"""
+    tenures: Optional[List[int]] = Field(None, min_length=1, max_length=24)
+    amounts: Optional[List[float]] = Field(None, min_length=1, max_length=100)
+    amount_steps: int = Field(10, ge=1, le=100)
+
+    @field_validator('tenures')
+    @classmethod
+    def validate_tenures(cls, v):
+        if v and not all(1 <= tenure <= 480 for tenure in v):
+            raise ValueError('Tenures must be between 1 and 480 months')
+        return v
+
+    @field_validator('amounts')
+    @classmethod
+    def validate_amounts(cls, v):
+        if v and not all(amount > 0 for amount in v):
+            raise ValueError('Amounts must be positive')
+        return v
+
+
+class OfferCalculatorRequest(OfferGridRequest):
+    """Applicant details for the stateless offer grid"""
+    monthly_income: float = Field(..., gt=0)
+    employment_type: EmploymentType = EmploymentType.SALARIED
+    credit_score: Optional[int] = Field(None, ge=300, le=900)
+
+
+class OfferGridResponse(BaseModel):
+    """
+    Offers for every (amount, tenure): emi, total_interest and affordable
+    have one row per amount and one column per tenure. A tenure with
+    tenure_allowed False has no affordable cell.
+    """
+    monthly_income: float
+    employment_type: str
+    score_band: Optional[str] = None
+    interest_rate: float
+    pricing_version: str
+    max_emi: float
+    tenures: List[int]
+    tenure_allowed: List[bool]
+    eligible_amounts: List[float]
+    amounts: List[float]
+    emi: List[List[float]]
+    total_interest: List[List[float]]
+    affordable: List[List[bool]]
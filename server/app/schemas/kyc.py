@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import List, Optional
 from datetime import datetime
 from app.core.enums import KYCStatus
 
@@ -37,3 +37,28 @@ class KYCPerformResponse(BaseModel):
     kyc_status: KYCStatus
     application_status: str
     message: str
+
+
+class KYCBatchRequest(BaseModel):
+    """Request body for batch KYC"""
+    application_ids: List[int] = Field(..., min_length=1)
+
+
+class KYCBatchItem(BaseModel):
+    """Outcome of KYC for one application in a batch"""
+    application_id: int
+    outcome: str  # KYC_COMPLETED, NOT_ELIGIBLE, SKIPPED, NOT_FOUND or PROVIDER_ERROR
+    kyc_status: Optional[KYCStatus] = None
+    name_match_score: Optional[float] = None
+    application_status: Optional[str] = None
+    message: str
+
+
+class KYCBatchResponse(BaseModel):
+    """Response after batch KYC is performed"""
+    total: int
+    processed: int
+    passed: int
+    failed: int
+    unprocessed: int  # SKIPPED, NOT_FOUND and PROVIDER_ERROR items
+    items: List[KYCBatchItem]
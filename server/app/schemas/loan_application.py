@@ -1,5 +1,5 @@
 from pydantic import BaseModel, field_validator
-from typing import Optional
+from typing import List, Optional
 from datetime import date, datetime
 from app.core.enums import ApplicationStatus, EmploymentType
 
@@ -80,3 +80,22 @@ class LoanApplicationDetailResponse(LoanApplicationResponse):
 
     class Config:
         from_attributes = True
+
+
+class AmortizationRow(BaseModel):
+    month: int
+    emi: float
+    principal: float
+    interest: float
+    balance: float
+
+
+class AmortizationScheduleResponse(BaseModel):
+    """Amortization schedule for a principal, annual rate and tenure"""
+    principal: float
+    annual_rate: float
+    tenure_months: int
+    emi: float
+    total_interest: float
+    total_payment: float
+    schedule: List[AmortizationRow]
@@ -18,6 +18,11 @@ class UserUpdate(BaseModel):
     password: Optional[str] = None
 
 
+class AdminUserUpdate(BaseModel):
+    is_active: Optional[bool] = None
+    is_admin: Optional[bool] = None
+
+
 class UserResponse(UserBase):
     id: int
     is_active: bool
@@ -35,3 +40,14 @@ class Token(BaseModel):
 
 class TokenData(BaseModel):
     email: Optional[str] = None
+
+
+class Principal(BaseModel):
+    """Slim snapshot of the authenticated user, cached per token"""
+    id: int
+    email: str
+    is_active: bool
+    is_admin: bool
+
+    class Config:
+        frozen = True
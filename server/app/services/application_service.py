@@ -0,0 +1,223 @@
+import time
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.database import READ_FROM_REPLICA, READ_YOUR_WRITES
+from app.models.loan_application import LoanApplication
+from app.schemas.loan_application import LoanApplicationDetailResponse
+from app.schemas.kyc import KYCResultResponse
+from app.schemas.credit import CreditResultResponse, EligibilityResultResponse
+from app.utils.http_cache import make_etag
+
+# Resources served from the per-application response cache
+CACHED_RESOURCES = ("application", "kyc", "credit", "eligibility")
+
+
+def _isoformat(value) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+async def load_application_with_results(db: AsyncSession, application_id: int) -> Optional[LoanApplication]:
+    """
+    Load a loan application together with its KYC, credit and eligibility results.
+    
+    All three results are one-to-one, so they are joined into a single
+    SELECT instead of being lazy-loaded one round trip at a time.
+    
+    Args:
+        db: Async database session
+        application_id: ID of the loan application
+        
+    Returns:
+        The LoanApplication with results populated, or None if not found
+    """
+    result = await db.execute(
+        select(LoanApplication)
+        .options(
+            joinedload(LoanApplication.kyc_result),
+            joinedload(LoanApplication.credit_result),
+            joinedload(LoanApplication.eligibility_result)
+        )
+        .where(LoanApplication.id == application_id)
+    )
+    return result.unique().scalars().first()
+
+
+def serialize_kyc_result(kyc_result) -> Optional[dict]:
+    """Serialize a KYCResult for the detail/history payloads"""
+    if not kyc_result:
+        return None
+    return {
+        "name_match_score": kyc_result.name_match_score,
+        "status": kyc_result.status,
+        "pan_verified": kyc_result.pan_verified,
+        "address_verified": kyc_result.address_verified,
+        "created_at": _isoformat(kyc_result.created_at)
+    }
+
+
+def serialize_credit_result(credit_result) -> Optional[dict]:
+    """Serialize a CreditResult for the detail/history payloads"""
+    if not credit_result:
+        return None
+    return {
+        "credit_score": credit_result.credit_score,
+        "active_loans": credit_result.active_loans,
+        "is_approved": credit_result.is_approved,
+        "rejection_reason": credit_result.rejection_reason,
+        "created_at": _isoformat(credit_result.created_at),
+        "superseded_at": _isoformat(credit_result.superseded_at)
+    }
+
+
+def serialize_eligibility_result(eligibility_result) -> Optional[dict]:
+    """Serialize an EligibilityResult for the detail/history payloads"""
+    if not eligibility_result:
+        return None
+    return {
+        "max_emi": eligibility_result.max_emi,
+        "interest_rate": eligibility_result.interest_rate,
+        "tenure_months": eligibility_result.tenure_months,
+        "eligible_amount": eligibility_result.eligible_amount,
+        "is_eligible": eligibility_result.is_eligible,
+        "rejection_reasons": eligibility_result.rejection_reasons,
+        "created_at": _isoformat(eligibility_result.created_at),
+        "superseded_at": _isoformat(eligibility_result.superseded_at)
+    }
+
+
+def serialize_verification_results(application: LoanApplication) -> dict:
+    """
+    Serialize the KYC, credit and eligibility results of an application.
+    
+    Expects the results to be eager-loaded (see load_application_with_results).
+    
+    Returns:
+        Dictionary with "kyc", "credit" and "eligibility" keys (None when absent)
+    """
+    return {
+        "kyc": serialize_kyc_result(application.kyc_result),
+        "credit": serialize_credit_result(application.credit_result),
+        "eligibility": serialize_eligibility_result(application.eligibility_result)
+    }
+
+
+def build_application_detail(application: LoanApplication) -> LoanApplicationDetailResponse:
+    """Build the GET /loan/{id} response from an eager-loaded application"""
+    results = serialize_verification_results(application)
+    return LoanApplicationDetailResponse(
+        id=application.id,
+        full_name=application.full_name,
+        mobile=application.mobile,
+        pan=application.pan,
+        dob=application.dob,
+        email=application.email,
+        address=application.address,
+        employment_type=application.employment_type,
+        monthly_income=application.monthly_income,
+        loan_amount=application.loan_amount,
+        loan_purpose=application.loan_purpose,
+        status=application.status,
+        created_at=application.created_at,
+        updated_at=application.updated_at,
+        kyc_result=results["kyc"],
+        credit_result=results["credit"],
+        eligibility_result=results["eligibility"]
+    )
+
+
+class ApplicationResponseCache:
+    """
+    In-process LRU/TTL cache of the serialized application, KYC, credit and
+    eligibility payloads, with their ETags and Cache-Control values.
+    
+    Entries are dropped by `invalidate` whenever an endpoint changes the
+    application, and expire after RESPONSE_CACHE_TTL_SECONDS otherwise:
+    that is how long another worker, or a job such as the portfolio
+    re-evaluation, can take to show up here. Final decisions get no longer
+    TTL, since re-evaluation can still change them. A load that started before the latest invalidation is not
+    stored, so a slow read can't put stale data back into the cache.
+    
+    Only primary reads fill the cache: a lagging replica could still return
+    the row from before the invalidation. Clients that wrote recently
+    (READ_YOUR_WRITES) skip cached entries, which may have been filled by
+    another worker before their write.
+    """
+    
+    def __init__(self, maxsize: int, ttl: float):
+        self.entries = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._invalidated_at = TTLCache(maxsize=maxsize, ttl=max(ttl, 60.0))
+    
+    def invalidate(self, application_id: int) -> None:
+        self._invalidated_at.set(application_id, time.monotonic())
+        self.entries.delete(application_id)
+    
+    async def get(self, db: AsyncSession, application_id: int) -> Optional[dict]:
+        """
+        Return the cached snapshot for an application, loading it on a miss.
+        
+        Returns:
+            Dictionary with "resources", "etags" and "cache_control", or None
+            if the application doesn't exist
+        """
+        if not db.info.get(READ_YOUR_WRITES):
+            snapshot = self.entries.get(application_id)
+            if snapshot is not None:
+                return snapshot
+        
+        started_at = time.monotonic()
+        application = await load_application_with_results(db, application_id)
+        if application is None:
+            return None
+        
+        snapshot = build_snapshot(application)
+        if db.info.get(READ_FROM_REPLICA):
+            return snapshot
+        
+        invalidated_at = self._invalidated_at.get(application_id)
+        if invalidated_at is None or invalidated_at < started_at:
+            self.entries.set(application_id, snapshot)
+        
+        return snapshot
+
+
+def build_snapshot(application: LoanApplication) -> dict:
+    """
+    Serialize every cached resource for an application.
+    
+    ETags derive from the application's status and last update, which
+    change in the same transaction as any of the result rows. Every
+    resource is sent with "no-cache": clients revalidate with the ETag and
+    get a 304 while nothing changed, so even a final decision that a
+    re-evaluation changes is never served stale from a browser cache.
+    """
+    version = application.updated_at or application.created_at
+    
+    resources = {
+        "application": build_application_detail(application).model_dump(mode="json"),
+        "kyc": KYCResultResponse.model_validate(application.kyc_result).model_dump(mode="json")
+        if application.kyc_result else None,
+        "credit": CreditResultResponse.model_validate(application.credit_result).model_dump(mode="json")
+        if application.credit_result else None,
+        "eligibility": EligibilityResultResponse.model_validate(application.eligibility_result).model_dump(mode="json")
+        if application.eligibility_result else None
+    }
+    
+    return {
+        "resources": resources,
+        "etags": {
+            resource: make_etag(resource, application.id, application.status, version)
+            for resource in CACHED_RESOURCES
+        },
+        "cache_control": "private, no-cache"
+    }
+
+
+application_cache = ApplicationResponseCache(
+    maxsize=settings.RESPONSE_CACHE_MAX_ENTRIES,
+    ttl=settings.RESPONSE_CACHE_TTL_SECONDS
+)
@@ -0,0 +1,145 @@
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import select
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.credit import CreditResult
+from app.models.loan_application import LoanApplication
+from app.services.credit_bureau_service import AsyncCreditBureauService
+
+
+def normalize_pan(pan: str) -> str:
+    return (pan or "").strip().upper()
+
+
+def _parse_timestamp(value) -> Optional[datetime]:
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        try:
+            parsed = datetime.fromisoformat(value)
+        except (TypeError, ValueError):
+            return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+class CachedCreditBureauService(AsyncCreditBureauService):
+    """
+    PAN-keyed cache in front of any async Credit Bureau service.
+    
+    Tiers:
+    - memory: per-process LRU, entries expire when the pull gets too old
+    - database: the newest credit_results.raw_response for the same PAN
+    
+    A pull is reused while younger than CREDIT_CACHE_FRESHNESS_DAYS. Its age
+    comes from `bureau_pulled_at`, stamped on every fresh pull, so re-serving
+    a cached result never extends its life. `force_refresh` always goes to
+    the bureau.
+    """
+    
+    def __init__(
+        self,
+        service: AsyncCreditBureauService,
+        freshness: timedelta = None,
+        maxsize: int = None,
+        session_factory=AsyncSessionLocal
+    ):
+        self.service = service
+        self.freshness = freshness or timedelta(days=settings.CREDIT_CACHE_FRESHNESS_DAYS)
+        self.memory = TTLCache(
+            maxsize=maxsize or settings.CREDIT_CACHE_MAX_ENTRIES,
+            ttl=self.freshness.total_seconds()
+        )
+        self.session_factory = session_factory
+        self.memory_hits = 0
+        self.database_hits = 0
+        self.misses = 0
+        self.bypasses = 0
+    
+    def is_approved(self, result: dict) -> bool:
+        return self.service.is_approved(result)
+    
+    def get_rejection_reasons(self, result: dict) -> list:
+        return self.service.get_rejection_reasons(result)
+    
+    def _remaining(self, pulled_at: Optional[datetime]) -> float:
+        """Seconds of freshness left for a pull made at `pulled_at`"""
+        if pulled_at is None:
+            return 0.0
+        age = datetime.now(timezone.utc) - pulled_at
+        return (self.freshness - age).total_seconds()
+    
+    async def _load_from_database(self, pan: str) -> Optional[dict]:
+        """Newest stored bureau response for this PAN, if still fresh"""
+        async with self.session_factory() as db:
+            result = await db.execute(
+                select(CreditResult.raw_response, CreditResult.created_at)
+                .join(LoanApplication, LoanApplication.id == CreditResult.loan_application_id)
+                .where(LoanApplication.pan == pan)
+                .order_by(CreditResult.created_at.desc())
+                .limit(1)
+            )
+            row = result.first()
+        
+        if not row or not row.raw_response:
+            return None
+        try:
+            data = json.loads(row.raw_response)
+        except ValueError:
+            return None
+        
+        pulled_at = _parse_timestamp(data.get("bureau_pulled_at")) or _parse_timestamp(row.created_at)
+        if self._remaining(pulled_at) <= 0:
+            return None
+        data["bureau_pulled_at"] = pulled_at.isoformat()
+        return data
+    
+    def _remember(self, pan: str, data: dict) -> None:
+        remaining = self._remaining(_parse_timestamp(data.get("bureau_pulled_at")))
+        if remaining > 0:
+            self.memory.set(pan, data, ttl=remaining)
+    
+    async def check_credit(self, pan: str, force_refresh: bool = False) -> dict:
+        pan = normalize_pan(pan)
+        
+        if force_refresh:
+            self.bypasses += 1
+        else:
+            cached = self.memory.get(pan)
+            if cached is not None:
+                self.memory_hits += 1
+                return {**cached, "cache_tier": "memory"}
+            
+            stored = await self._load_from_database(pan)
+            if stored is not None:
+                self.database_hits += 1
+                self._remember(pan, stored)
+                return {**stored, "cache_tier": "database"}
+            
+            self.misses += 1
+        
+        data = await self.service.check_credit(pan, force_refresh=force_refresh)
+        data = {key: value for key, value in data.items() if key != "cache_tier"}
+        data["bureau_pulled_at"] = datetime.now(timezone.utc).isoformat()
+        self._remember(pan, data)
+        return dict(data)
+    
+    def stats(self) -> dict:
+        hits = self.memory_hits + self.database_hits
+        lookups = hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "database_hits": self.database_hits,
+            "misses": self.misses,
+            "bypasses": self.bypasses,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "bureau_pulls": self.misses + self.bypasses,
+            "cost_saved": round(hits * settings.CREDIT_PULL_COST, 2),
+            "memory": self.memory.stats()
+        }
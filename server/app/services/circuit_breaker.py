@@ -0,0 +1,213 @@
+import asyncio
+import math
+import time
+from collections import deque
+
+from app.core.config import settings
+
+
+class CircuitBreaker:
+    """
+    Per-provider circuit breaker over a sliding window of recent calls.
+    
+    States:
+    - CLOSED: calls go through; once the window holds at least `min_calls`
+      outcomes, the breaker opens if the failure rate or the slow-call rate
+      reaches its threshold
+    - OPEN: calls are rejected without reaching the provider until
+      `open_seconds` have passed
+    - HALF_OPEN: up to `half_open_calls` probe calls are let through; the
+      breaker closes when they all succeed, and reopens on the first
+      failed or slow probe
+    
+    All methods are called from the event loop, so no locking is needed.
+    """
+    
+    CLOSED = "CLOSED"
+    OPEN = "OPEN"
+    HALF_OPEN = "HALF_OPEN"
+    
+    def __init__(
+        self,
+        name: str,
+        window_size: int,
+        min_calls: int,
+        failure_rate_threshold: float,
+        slow_call_seconds: float,
+        slow_call_rate_threshold: float,
+        open_seconds: float,
+        half_open_calls: int
+    ):
+        self.name = name
+        self.min_calls = min_calls
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+        
+        self.state = self.CLOSED
+        self._outcomes = deque(maxlen=window_size)  # (failed, slow) per call
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        
+        self.calls = 0
+        self.failures = 0
+        self.slow_calls = 0
+        self.rejected = 0
+        self.times_opened = 0
+    
+    def _rates(self) -> tuple:
+        total = len(self._outcomes)
+        if not total:
+            return 0.0, 0.0
+        failed = sum(1 for failure, _ in self._outcomes if failure)
+        slow = sum(1 for _, is_slow in self._outcomes if is_slow)
+        return failed / total, slow / total
+    
+    def _open(self) -> None:
+        self.state = self.OPEN
+        self._opened_at = time.monotonic()
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        self.times_opened += 1
+    
+    def _close(self) -> None:
+        self.state = self.CLOSED
+        self._outcomes.clear()
+    
+    def retry_after(self) -> int:
+        """Seconds until the breaker will let a probe through"""
+        if self.state != self.OPEN:
+            return 1
+        remaining = self.open_seconds - (time.monotonic() - self._opened_at)
+        return max(math.ceil(remaining), 1)
+    
+    def allow(self) -> bool:
+        """Reserve a call, or return False if the breaker rejects it"""
+        if self.state == self.OPEN:
+            if time.monotonic() - self._opened_at < self.open_seconds:
+                self.rejected += 1
+                return False
+            self.state = self.HALF_OPEN
+        
+        if self.state == self.HALF_OPEN:
+            if self._probes_in_flight >= self.half_open_calls:
+                self.rejected += 1
+                return False
+            self._probes_in_flight += 1
+        
+        return True
+    
+    def release(self) -> None:
+        """Give back a reservation for a call that never completed (e.g. cancelled)"""
+        if self.state == self.HALF_OPEN and self._probes_in_flight:
+            self._probes_in_flight -= 1
+    
+    def record(self, duration: float, failed: bool) -> None:
+        """Record the outcome of a call reserved with `allow`"""
+        slow = duration >= self.slow_call_seconds
+        self.calls += 1
+        self.failures += failed
+        self.slow_calls += slow
+        
+        if self.state == self.HALF_OPEN:
+            self._probes_in_flight = max(self._probes_in_flight - 1, 0)
+            if failed or slow:
+                self._open()
+                return
+            self._probe_successes += 1
+            if self._probe_successes >= self.half_open_calls:
+                self._close()
+            return
+        
+        if self.state == self.OPEN:
+            # Started before the breaker opened
+            return
+        
+        self._outcomes.append((failed, slow))
+        if len(self._outcomes) < self.min_calls:
+            return
+        failure_rate, slow_rate = self._rates()
+        if failure_rate >= self.failure_rate_threshold or slow_rate >= self.slow_call_rate_threshold:
+            self._open()
+    
+    def snapshot(self) -> dict:
+        failure_rate, slow_rate = self._rates()
+        return {
+            "state": self.state,
+            "window_calls": len(self._outcomes),
+            "failure_rate": round(failure_rate, 4),
+            "slow_call_rate": round(slow_rate, 4),
+            "retry_after_seconds": self.retry_after() if self.state == self.OPEN else 0,
+            "calls": self.calls,
+            "failures": self.failures,
+            "slow_calls": self.slow_calls,
+            "rejected": self.rejected,
+            "times_opened": self.times_opened
+        }
+
+
+class Bulkhead:
+    """
+    Cap on concurrent calls to one provider.
+    
+    A call waits at most `max_wait` seconds for a slot and is rejected
+    otherwise, so a slow provider can't tie up every request.
+    """
+    
+    def __init__(self, name: str, max_concurrent: int, max_wait: float):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_wait = max_wait
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self.active = 0
+        self.rejected = 0
+    
+    async def acquire(self) -> bool:
+        """Take a slot, or return False if none frees up within max_wait"""
+        if self._semaphore.locked():
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), timeout=self.max_wait)
+            except asyncio.TimeoutError:
+                self.rejected += 1
+                return False
+        else:
+            await self._semaphore.acquire()
+        self.active += 1
+        return True
+    
+    def release(self) -> None:
+        self.active -= 1
+        self._semaphore.release()
+    
+    def snapshot(self) -> dict:
+        return {
+            "active": self.active,
+            "max_concurrent": self.max_concurrent,
+            "rejected": self.rejected
+        }
+
+
+def build_circuit_breaker(name: str) -> CircuitBreaker:
+    """Circuit breaker configured from Settings"""
+    return CircuitBreaker(
+        name,
+        window_size=settings.BREAKER_WINDOW_SIZE,
+        min_calls=settings.BREAKER_MIN_CALLS,
+        failure_rate_threshold=settings.BREAKER_FAILURE_RATE_THRESHOLD,
+        slow_call_seconds=settings.BREAKER_SLOW_CALL_SECONDS,
+        slow_call_rate_threshold=settings.BREAKER_SLOW_CALL_RATE_THRESHOLD,
+        open_seconds=settings.BREAKER_OPEN_SECONDS,
+        half_open_calls=settings.BREAKER_HALF_OPEN_CALLS
+    )
+
+
+def build_bulkhead(name: str) -> Bulkhead:
+    """Bulkhead configured from Settings"""
+    return Bulkhead(
+        name,
+        max_concurrent=settings.PROVIDER_MAX_CONCURRENT_CALLS,
+        max_wait=settings.PROVIDER_BULKHEAD_WAIT_SECONDS
+    )
@@ -0,0 +1,290 @@
+import asyncio
+import json
+
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.enums import ApplicationStatus
+from app.models.credit import CreditResult, EligibilityResult
+from app.models.loan_application import LoanApplication
+from app.services.application_service import application_cache
+from app.services.credit_bureau_service import AsyncCreditBureauService
+from app.services.eligibility_service import calculate_eligibility_batch
+from app.services.verification_service import write_results
+from app.services.workflow_service import change_status_many
+from app.utils.exceptions import ProviderRejectedException, ProviderUnavailableException
+
+
+def _item(application_id: int, outcome: str, message: str, **fields) -> dict:
+    return {"application_id": application_id, "outcome": outcome, "message": message, **fields}
+
+
+def _record(application_id: int, target: ApplicationStatus, credit: dict = None) -> dict:
+    return {"id": application_id, "target": target, "credit": credit, "eligibility": None}
+
+
+def _fields(application: LoanApplication) -> dict:
+    """
+    The columns the batch needs, as plain values. A rollback (chunk fallback,
+    cleanup) expires the loaded LoanApplications, and reading an expired
+    attribute is an implicit query that an AsyncSession cannot run.
+    """
+    return {
+        "id": application.id,
+        "pan": application.pan,
+        "monthly_income": application.monthly_income,
+        "employment_type": application.employment_type,
+        "loan_amount": application.loan_amount
+    }
+
+
+async def _call_bureau(
+    credit_service: AsyncCreditBureauService,
+    semaphore: asyncio.Semaphore,
+    application: dict,
+    force_refresh: bool
+) -> dict:
+    """Run one bureau call under the fan-out limit; provider errors are returned, not raised"""
+    async with semaphore:
+        try:
+            return await credit_service.check_credit(application["pan"], force_refresh=force_refresh)
+        except (ProviderUnavailableException, ProviderRejectedException) as exc:
+            return {"error": exc.message}
+
+
+def _build_records(credit_service: AsyncCreditBureauService, chunk: list, items: dict) -> list:
+    """
+    Turn bureau responses into rows to write, computing eligibility for every
+    approved application of the chunk in one call.
+    
+    Returns:
+        One record per application: its target status and the CreditResult /
+        EligibilityResult rows (None when there is nothing to store)
+    """
+    records = []
+    approved = []
+    
+    for application, credit_result in chunk:
+        if "error" in credit_result:
+            # Back to KYC_COMPLETED so the application can be picked up again
+            records.append(_record(application["id"], ApplicationStatus.KYC_COMPLETED))
+            items[application["id"]] = _item(application["id"], "PROVIDER_ERROR", credit_result["error"])
+            continue
+        
+        try:
+            is_approved = credit_service.is_approved(credit_result)
+            rejection_reasons = credit_service.get_rejection_reasons(credit_result) if not is_approved else []
+            credit_row = {
+                "loan_application_id": application["id"],
+                "credit_score": credit_result["credit_score"],
+                "active_loans": credit_result["active_loans"],
+                "credit_utilization": credit_result.get("credit_utilization"),
+                "payment_history_score": credit_result.get("payment_history_score"),
+                "is_approved": is_approved,
+                "rejection_reason": "; ".join(rejection_reasons) if rejection_reasons else None,
+                "raw_response": json.dumps(credit_result)
+            }
+        except (KeyError, TypeError, ValueError) as exc:
+            records.append(_record(application["id"], ApplicationStatus.KYC_COMPLETED))
+            items[application["id"]] = _item(application["id"], "ERROR", f"Invalid bureau response: {exc}")
+            continue
+        
+        record = _record(application["id"], ApplicationStatus.NOT_ELIGIBLE, credit_row)
+        records.append(record)
+        fields = {
+            "credit_score": credit_row["credit_score"],
+            "active_loans": credit_row["active_loans"],
+            "is_approved": is_approved
+        }
+        
+        if is_approved:
+            approved.append((application, record, fields))
+        else:
+            items[application["id"]] = _item(
+                application["id"],
+                ApplicationStatus.NOT_ELIGIBLE.value,
+                f"Credit check failed: {credit_row['rejection_reason']}",
+                application_status=ApplicationStatus.NOT_ELIGIBLE.value,
+                **fields
+            )
+    
+    eligibilities = calculate_eligibility_batch([
+        {
+            "monthly_income": application["monthly_income"],
+            "employment_type": application["employment_type"],
+            "loan_amount": application["loan_amount"],
+            "credit_score": record["credit"]["credit_score"]
+        }
+        for application, record, _ in approved
+    ])
+    
+    for (application, record, fields), eligibility in zip(approved, eligibilities):
+        record["eligibility"] = {
+            "loan_application_id": application["id"],
+            "max_emi": eligibility["max_emi"],
+            "interest_rate": eligibility["interest_rate"],
+            "tenure_months": eligibility["tenure_months"],
+            "eligible_amount": eligibility["eligible_amount"],
+            "is_eligible": eligibility["is_eligible"],
+            "rejection_reasons": eligibility["rejection_reasons"],
+            "score_band": eligibility["score_band"],
+            "pricing_version": eligibility["pricing_version"]
+        }
+        if eligibility["is_eligible"]:
+            record["target"] = ApplicationStatus.ELIGIBLE
+            message = f"Congratulations! You are eligible for a loan up to ₹{eligibility['eligible_amount']:,.2f}"
+        else:
+            message = f"Not eligible: {eligibility['rejection_reasons']}"
+        items[application["id"]] = _item(
+            application["id"],
+            record["target"].value,
+            message,
+            application_status=record["target"].value,
+            eligible_amount=eligibility["eligible_amount"],
+            **fields
+        )
+    
+    return records
+
+
+async def _write_records(db: AsyncSession, records: list) -> None:
+    """Bulk write the result rows and apply the status updates (not committed)"""
+    credit_rows = [record["credit"] for record in records if record["credit"]]
+    eligibility_rows = [record["eligibility"] for record in records if record["eligibility"]]
+    
+    if credit_rows:
+        await write_results(db, CreditResult, credit_rows)
+    if eligibility_rows:
+        await write_results(db, EligibilityResult, eligibility_rows)
+    await change_status_many(
+        db,
+        ApplicationStatus.CREDIT_CHECK_PENDING,
+        {record["id"]: record["target"] for record in records}
+    )
+
+
+async def _persist_chunk(db: AsyncSession, records: list, items: dict) -> None:
+    """
+    Write one chunk in a single transaction. If that fails, fall back to one
+    transaction per application so a bad record only fails itself.
+    """
+    try:
+        await _write_records(db, records)
+        await db.commit()
+    except SQLAlchemyError:
+        await db.rollback()
+        for record in records:
+            try:
+                await _write_records(db, [record])
+                await db.commit()
+            except SQLAlchemyError as exc:
+                await db.rollback()
+                await change_status_many(
+                    db, ApplicationStatus.CREDIT_CHECK_PENDING, {record["id"]: ApplicationStatus.KYC_COMPLETED}
+                )
+                await db.commit()
+                items[record["id"]] = _item(
+                    record["id"], "ERROR", f"Could not store the result: {type(exc).__name__}"
+                )
+    
+    for record in records:
+        application_cache.invalidate(record["id"])
+
+
+async def run_credit_batch(
+    db: AsyncSession,
+    credit_service: AsyncCreditBureauService,
+    application_ids: list,
+    force_refresh: bool = False
+) -> list:
+    """
+    Perform the credit check and eligibility for many KYC_COMPLETED applications.
+    
+    1. Load every application in one query, keep the columns needed later
+       as plain values and claim the KYC_COMPLETED ones with a single update
+       to CREDIT_CHECK_PENDING (then commit, releasing the connection while
+       the bureau is called)
+    2. Per CREDIT_BATCH_CHUNK_SIZE applications: call the bureau
+       concurrently (at most CREDIT_BATCH_CONCURRENCY at a time), compute
+       eligibility for the chunk in one call, and bulk insert the
+       CreditResult and EligibilityResult rows with one status UPDATE
+    
+    Args:
+        db: The async session to use
+        credit_service: The async Credit Bureau service
+        application_ids: Applications to check (duplicates are ignored)
+        force_refresh: Bypass the bureau response cache
+    
+    Returns:
+        One outcome dict per application, in request order
+    """
+    application_ids = list(dict.fromkeys(application_ids))
+    items = {}
+    
+    result = await db.execute(
+        select(LoanApplication).where(LoanApplication.id.in_(application_ids))
+    )
+    applications = {application.id: application for application in result.scalars().all()}
+    
+    candidates = []
+    for application_id in application_ids:
+        application = applications.get(application_id)
+        if application is None:
+            items[application_id] = _item(
+                application_id, "NOT_FOUND", f"Loan application with ID {application_id} not found"
+            )
+        elif application.status != ApplicationStatus.KYC_COMPLETED.value:
+            items[application_id] = _item(
+                application_id,
+                "SKIPPED",
+                f"Invalid workflow state. Expected 'KYC_COMPLETED', but current status is '{application.status}'",
+                application_status=application.status
+            )
+        else:
+            candidates.append(_fields(application))
+    
+    claimed = set(await change_status_many(
+        db,
+        ApplicationStatus.KYC_COMPLETED,
+        {application["id"]: ApplicationStatus.CREDIT_CHECK_PENDING for application in candidates}
+    ))
+    await db.commit()
+    
+    pending = []
+    for application in candidates:
+        if application["id"] in claimed:
+            application_cache.invalidate(application["id"])
+            pending.append(application)
+        else:
+            # Another request moved it on after it was loaded
+            items[application["id"]] = _item(
+                application["id"], "SKIPPED", "Application is no longer in KYC_COMPLETED status"
+            )
+    
+    semaphore = asyncio.Semaphore(settings.CREDIT_BATCH_CONCURRENCY)
+    chunk_size = settings.CREDIT_BATCH_CHUNK_SIZE
+    
+    persisted = 0
+    try:
+        for start in range(0, len(pending), chunk_size):
+            chunk = pending[start:start + chunk_size]
+            credit_results = await asyncio.gather(
+                *(_call_bureau(credit_service, semaphore, application, force_refresh) for application in chunk)
+            )
+            records = _build_records(credit_service, list(zip(chunk, credit_results)), items)
+            await _persist_chunk(db, records, items)
+            persisted += len(chunk)
+    except BaseException:
+        # Don't leave the unprocessed applications stuck in CREDIT_CHECK_PENDING
+        await db.rollback()
+        await change_status_many(
+            db,
+            ApplicationStatus.CREDIT_CHECK_PENDING,
+            {application["id"]: ApplicationStatus.KYC_COMPLETED for application in pending[persisted:]}
+        )
+        await db.commit()
+        raise
+    
+    return [items[application_id] for application_id in application_ids]
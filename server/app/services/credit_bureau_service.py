@@ -2,7 +2,11 @@ import random
 import json
 from abc import ABC, abstractmethod
 from datetime import datetime
+from typing import Optional
+from app.core.config import settings
 from app.core.enums import BusinessRules
+from app.services.http_client import ProviderHttpClient, provider_http_client
+from app.services.pricing_service import credit_rating
 
 
 class CreditBureauService(ABC):
@@ -35,7 +39,70 @@ class CreditBureauService(ABC):
         pass
 
 
-class MockCibilService(CreditBureauService):
+class CreditDecisionMixin:
+    """
+    Approval rules shared by every bureau implementation.
+    Expects `required_min_score` and `max_allowed_loans` on the instance.
+    """
+    
+    def is_approved(self, result: dict) -> bool:
+        """
+        Check if credit is approved based on rules.
+        
+        Args:
+            result: The credit check result dictionary
+            
+        Returns:
+            True if both credit score >= 650 AND active loans <= 5
+        """
+        credit_score = result.get("credit_score", 0)
+        active_loans = result.get("active_loans", 999)
+        
+        score_ok = credit_score >= self.required_min_score
+        loans_ok = active_loans <= self.max_allowed_loans
+        
+        return score_ok and loans_ok
+    
+    def get_rejection_reasons(self, result: dict) -> list:
+        """
+        Get list of rejection reasons if credit is not approved.
+        
+        Args:
+            result: The credit check result dictionary
+            
+        Returns:
+            List of rejection reason strings
+        """
+        reasons = []
+        credit_score = result.get("credit_score", 0)
+        active_loans = result.get("active_loans", 999)
+        
+        if credit_score < self.required_min_score:
+            reasons.append(
+                f"Credit score {credit_score} is below minimum required score of {self.required_min_score}"
+            )
+        
+        if active_loans > self.max_allowed_loans:
+            reasons.append(
+                f"Active loans count {active_loans} exceeds maximum allowed of {self.max_allowed_loans}"
+            )
+        
+        return reasons
+    
+    def get_credit_rating(self, score: int) -> str:
+        """
+        Get credit rating category based on score.
+        
+        Args:
+            score: The credit score
+            
+        Returns:
+            Rating category string
+        """
+        return credit_rating(score)
+
+
+class MockCibilService(CreditDecisionMixin, CreditBureauService):
     """
     Mock CIBIL Service implementation.
     Simulates credit bureau check with deterministic scores based on PAN.
@@ -121,77 +188,127 @@ class MockCibilService(CreditBureauService):
         }
         
         return result
+
+
+# Factory function to get Credit Bureau service
+def get_credit_bureau_service() -> CreditBureauService:
+    """
+    Factory function to get the appropriate Credit Bureau service.
+    Can be extended to return different implementations based on config.
+    """
+    return MockCibilService()
+
+
+class AsyncCreditBureauService(CreditDecisionMixin, ABC):
+    """Abstract base class for async Credit Bureau services (used by the request path)"""
     
-    def is_approved(self, result: dict) -> bool:
+    required_min_score = BusinessRules.MIN_CREDIT_SCORE
+    max_allowed_loans = BusinessRules.MAX_ACTIVE_LOANS
+    
+    @abstractmethod
+    async def check_credit(self, pan: str, force_refresh: bool = False) -> dict:
         """
-        Check if credit is approved based on rules.
+        Check credit score and history.
         
         Args:
-            result: The credit check result dictionary
+            pan: The PAN number of the applicant
+            force_refresh: Bypass caching layers and pull fresh bureau data
             
         Returns:
-            True if both credit score >= 650 AND active loans <= 5
+            Dictionary containing credit bureau results (same shape as MockCibilService)
         """
-        credit_score = result.get("credit_score", 0)
-        active_loans = result.get("active_loans", 999)
-        
-        score_ok = credit_score >= self.required_min_score
-        loans_ok = active_loans <= self.max_allowed_loans
-        
-        return score_ok and loans_ok
+        pass
+
+
+class SyncCreditBureauAdapter(AsyncCreditBureauService):
+    """
+    Expose a sync CreditBureauService through the async interface.
+    
+    The call runs inline, so only wrap implementations that don't block
+    (such as MockCibilService).
+    """
+    
+    def __init__(self, service: CreditBureauService):
+        self.service = service
+    
+    async def check_credit(self, pan: str, force_refresh: bool = False) -> dict:
+        return self.service.check_credit(pan=pan)
+    
+    def is_approved(self, result: dict) -> bool:
+        return self.service.is_approved(result)
     
     def get_rejection_reasons(self, result: dict) -> list:
-        """
-        Get list of rejection reasons if credit is not approved.
-        
-        Args:
-            result: The credit check result dictionary
-            
-        Returns:
-            List of rejection reason strings
-        """
-        reasons = []
-        credit_score = result.get("credit_score", 0)
-        active_loans = result.get("active_loans", 999)
-        
-        if credit_score < self.required_min_score:
-            reasons.append(
-                f"Credit score {credit_score} is below minimum required score of {self.required_min_score}"
-            )
-        
-        if active_loans > self.max_allowed_loans:
-            reasons.append(
-                f"Active loans count {active_loans} exceeds maximum allowed of {self.max_allowed_loans}"
-            )
-        
-        return reasons
+        return self.service.get_rejection_reasons(result)
+
+
+class HttpCreditBureauService(AsyncCreditBureauService):
+    """
+    Credit bureau reached over HTTP.
     
-    def get_credit_rating(self, score: int) -> str:
-        """
-        Get credit rating category based on score.
-        
-        Args:
-            score: The credit score
-            
-        Returns:
-            Rating category string
-        """
-        if score >= 750:
-            return "EXCELLENT"
-        elif score >= 700:
-            return "GOOD"
-        elif score >= 650:
-            return "FAIR"
-        elif score >= 600:
-            return "POOR"
-        else:
-            return "VERY_POOR"
+    Contract: POST {base_url}/credit with {"pan"} returns at least
+    credit_score and active_loans, plus optional credit_utilization and
+    payment_history_score (same fields as MockCibilService).
+    """
+    
+    def __init__(
+        self,
+        base_url: str,
+        http_client: ProviderHttpClient,
+        api_key: Optional[str] = None,
+        timeout: Optional[float] = None
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.http_client = http_client
+        self.headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+        self.timeout = timeout
+    
+    async def check_credit(self, pan: str, force_refresh: bool = False) -> dict:
+        result = await self.http_client.request(
+            "Credit bureau",
+            "POST",
+            f"{self.base_url}/credit",
+            json={"pan": pan},
+            headers=self.headers,
+            timeout=self.timeout,
+            required_keys=("credit_score", "active_loans")
+        )
+        result.setdefault("pan", pan)
+        return result
 
 
-# Factory function to get Credit Bureau service
-def get_credit_bureau_service() -> CreditBureauService:
+_async_credit_bureau_service: Optional[AsyncCreditBureauService] = None
+
+# PAN-keyed cache layer, when enabled (exposed for metrics)
+credit_bureau_cache = None
+
+
+def build_async_credit_bureau_service() -> AsyncCreditBureauService:
+    """Build the async bureau service selected by CREDIT_BUREAU_PROVIDER ("mock" or "http")"""
+    if settings.CREDIT_BUREAU_PROVIDER == "http":
+        if not settings.CREDIT_BUREAU_URL:
+            raise ValueError("CREDIT_BUREAU_URL must be set when CREDIT_BUREAU_PROVIDER=http")
+        return HttpCreditBureauService(
+            base_url=settings.CREDIT_BUREAU_URL,
+            http_client=provider_http_client,
+            api_key=settings.PROVIDER_API_KEY
+        )
+    return SyncCreditBureauAdapter(MockCibilService())
+
+
+def get_async_credit_bureau_service() -> AsyncCreditBureauService:
     """
-    Factory function to get the appropriate Credit Bureau service.
-    Can be extended to return different implementations based on config.
+    Factory function to get the (shared) async Credit Bureau service,
+    wrapped in the PAN-keyed response cache when CREDIT_CACHE_ENABLED and
+    in single-flight coalescing when SINGLE_FLIGHT_ENABLED.
     """
-    return MockCibilService()
+    global _async_credit_bureau_service, credit_bureau_cache
+    if _async_credit_bureau_service is None:
+        service = build_async_credit_bureau_service()
+        if settings.CREDIT_CACHE_ENABLED:
+            from app.services.bureau_cache import CachedCreditBureauService
+            service = credit_bureau_cache = CachedCreditBureauService(service)
+        if settings.SINGLE_FLIGHT_ENABLED:
+            from app.services.single_flight import SingleFlightCreditBureauService
+            service = SingleFlightCreditBureauService(service)
+        _async_credit_bureau_service = service
+    return _async_credit_bureau_service
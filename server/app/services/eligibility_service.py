@@ -1,4 +1,7 @@
+import numpy as np
+
 from app.core.enums import EmploymentType
+from app.services.pricing_service import get_pricing_grid
 
 
 def calculate_eligibility(
@@ -8,19 +11,19 @@ def calculate_eligibility(
     credit_score: int = None
 ) -> dict:
     """
-    Calculate loan eligibility based on income and employment type.
+    Calculate loan eligibility based on income, employment type and credit score.
     
     Rules:
     - SALARIED: max_emi = income × 0.5 (50% of income)
     - SELF_EMPLOYED: max_emi = income × 0.4 (40% of income)
-    - Interest rate: 12% (static)
-    - Tenure: 36 months
+    - Interest rate and tenure: from the pricing grid, by credit-score band
+      and employment type (base terms, 12% / 36 months, without a score)
     
     Args:
         monthly_income: Monthly income of the applicant
         employment_type: Type of employment (SALARIED/SELF_EMPLOYED)
         loan_amount: Requested loan amount (optional)
-        credit_score: Credit score (optional, not used for rate - kept for API compatibility)
+        credit_score: Credit score (optional; selects the pricing band)
         
     Returns:
         Dictionary containing eligibility details
@@ -33,24 +36,14 @@ def calculate_eligibility(
     
     max_emi = monthly_income * emi_multiplier
     
-    # Static interest rate (annual) - 12%
-    interest_rate = 0.12
-    
-    # Fixed tenure in months - 36 months
-    tenure_months = 36
-    
-    # Calculate maximum eligible loan amount using EMI formula
-    # EMI = P × r × (1 + r)^n / ((1 + r)^n - 1)
-    # Rearranged: P = EMI × ((1 + r)^n - 1) / (r × (1 + r)^n)
-    monthly_rate = interest_rate / 12
-    n = tenure_months
+    # Rate, tenure and precomputed annuity factors for the applicant's band
+    grid = get_pricing_grid()
+    terms = grid.terms(credit_score, employment_type)
+    interest_rate = terms["rate"]
+    tenure_months = terms["tenure_months"]
     
-    if monthly_rate > 0:
-        eligible_amount = max_emi * ((1 + monthly_rate) ** n - 1) / (monthly_rate * (1 + monthly_rate) ** n)
-    else:
-        eligible_amount = max_emi * n
-    
-    eligible_amount = round(eligible_amount, 2)
+    # Maximum eligible loan amount: P = EMI × ((1 + r)^n - 1) / (r × (1 + r)^n)
+    eligible_amount = round(max_emi * terms["pv_factor"], 2)
     
     # Determine if requested loan amount is eligible
     is_eligible = True
@@ -62,14 +55,10 @@ def calculate_eligibility(
             f"Requested loan amount ₹{loan_amount:,.2f} exceeds eligible amount ₹{eligible_amount:,.2f}"
         )
     
-    # Calculate actual EMI for requested amount
+    # Calculate actual EMI for requested amount: EMI = P × r × (1 + r)^n / ((1 + r)^n - 1)
     actual_emi = None
     if loan_amount:
-        if monthly_rate > 0:
-            actual_emi = loan_amount * monthly_rate * ((1 + monthly_rate) ** n) / (((1 + monthly_rate) ** n) - 1)
-        else:
-            actual_emi = loan_amount / n
-        actual_emi = round(actual_emi, 2)
+        actual_emi = round(loan_amount * terms["emi_factor"], 2)
     
     return {
         "max_emi": round(max_emi, 2),
@@ -80,10 +69,192 @@ def calculate_eligibility(
         "is_eligible": is_eligible,
         "rejection_reasons": "; ".join(rejection_reasons) if rejection_reasons else None,
         "actual_emi": actual_emi,
-        "employment_type": employment_type if isinstance(employment_type, str) else employment_type.value
+        "employment_type": employment_type if isinstance(employment_type, str) else employment_type.value,
+        "score_band": terms["band"],
+        "pricing_version": grid.version
+    }
+
+
+def round_currency(values: np.ndarray) -> np.ndarray:
+    """
+    Round an array to 2 decimals exactly as Python's round(x, 2) does.
+    
+    round() decides on the exact binary value of x, while values * 100 is
+    itself rounded and can land exactly on a .5 tie. The rounding error of
+    that product is recovered exactly (Dekker's two-product) and breaks
+    such ties the way round() would.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    scaled = values * 100
+    
+    split = values * 134217729.0  # 2**27 + 1
+    high = split - (split - values)
+    low = values - high
+    error = (high * 100 - scaled) + low * 100
+    
+    rounded = np.rint(scaled)
+    tie = np.abs(scaled - np.trunc(scaled)) == 0.5
+    rounded = np.where(tie & (error > 0), np.ceil(scaled), rounded)
+    rounded = np.where(tie & (error < 0), np.floor(scaled), rounded)
+    return rounded / 100
+
+
+def _factor_columns(grid, interest_rate: np.ndarray, tenure_months: np.ndarray) -> tuple:
+    """(pv_factor, emi_factor) arrays for explicit rates and tenures, one computation per distinct pair"""
+    if interest_rate.size == 0:
+        return np.empty(0), np.empty(0)
+    pairs, inverse = np.unique(
+        np.stack([interest_rate, tenure_months.astype(np.float64)]), axis=1, return_inverse=True
+    )
+    factors = np.array([grid.get_factors(float(rate), int(n)) for rate, n in pairs.T])
+    inverse = inverse.reshape(-1)
+    return factors[inverse, 0], factors[inverse, 1]
+
+
+def calculate_eligibility_vectorized(
+    monthly_income,
+    employment_type,
+    loan_amount=None,
+    credit_score=None,
+    interest_rate=None,
+    tenure_months=None
+) -> dict:
+    """
+    Calculate loan eligibility for whole arrays of applications at once.
+    
+    Same rules as calculate_eligibility and the same results to the paisa
+    (same factors and operation order, Python-compatible rounding),
+    returned as columns.
+    
+    Args:
+        monthly_income: Array of monthly incomes
+        employment_type: Array of employment types (SALARIED/SELF_EMPLOYED)
+        loan_amount: Optional array of requested amounts (NaN or 0 = none)
+        credit_score: Optional array of credit scores (NaN = no score),
+            used to look up the rate and tenure in the pricing grid
+        interest_rate: Annual rate, scalar or array; overrides the grid
+            together with tenure_months
+        tenure_months: Tenure, scalar or array
+        
+    Returns:
+        Dictionary of NumPy arrays: max_emi, eligible_amount, actual_emi
+        (NaN where no loan amount), is_eligible, interest_rate,
+        tenure_months, score_band ("" without a score or with explicit
+        terms), plus the pricing_version string
+    """
+    income = np.asarray(monthly_income, dtype=np.float64)
+    shape = income.shape
+    
+    if isinstance(employment_type, np.ndarray) and employment_type.dtype.kind == "U":
+        employment = employment_type
+    else:
+        # Enum members are str subclasses; take their values before NumPy stringifies them
+        values = np.asarray(employment_type, dtype=object).ravel()
+        employment = np.array([getattr(value, "value", value) for value in values], dtype=str).reshape(shape)
+    
+    if loan_amount is None:
+        loan = np.full(shape, np.nan)
+    else:
+        loan = np.asarray(loan_amount, dtype=np.float64)
+    
+    salaried = employment == EmploymentType.SALARIED.value
+    max_emi = income * np.where(salaried, 0.5, 0.4)
+    
+    grid = get_pricing_grid()
+    if interest_rate is not None or tenure_months is not None:
+        rate = np.broadcast_to(np.asarray(
+            grid.base["rate"] if interest_rate is None else interest_rate, dtype=np.float64
+        ), shape)
+        tenure = np.broadcast_to(np.asarray(
+            grid.base["tenure_months"] if tenure_months is None else tenure_months, dtype=np.int64
+        ), shape)
+        pv_factor, emi_factor = _factor_columns(grid, rate.ravel(), tenure.ravel())
+        pv_factor = pv_factor.reshape(shape)
+        emi_factor = emi_factor.reshape(shape)
+        band = np.full(shape, "", dtype=object)
+    else:
+        if credit_score is None:
+            score = np.full(shape, np.nan)
+        else:
+            score = np.asarray(credit_score, dtype=np.float64)
+        band, rate, tenure, pv_factor, emi_factor = grid.lookup(score, salaried)
+    
+    eligible_amount = round_currency(max_emi * pv_factor)
+    
+    # Same truthiness as the scalar `if loan_amount`: missing and 0 mean no request
+    has_loan = ~np.isnan(loan) & (loan != 0)
+    actual_emi = np.where(has_loan, round_currency(np.where(has_loan, loan, 0.0) * emi_factor), np.nan)
+    
+    return {
+        "max_emi": round_currency(max_emi),
+        "eligible_amount": eligible_amount,
+        "actual_emi": actual_emi,
+        "is_eligible": ~(has_loan & (loan > eligible_amount)),
+        "interest_rate": np.array(rate),
+        "tenure_months": np.array(tenure),
+        "score_band": band,
+        "pricing_version": grid.version
     }
 
 
+def calculate_eligibility_batch(applications: list) -> list:
+    """
+    Calculate loan eligibility for many applications in one call.
+    
+    Same rules and results as calculate_eligibility, computed with
+    calculate_eligibility_vectorized and returned as one dict per application.
+    
+    Args:
+        applications: Dictionaries with monthly_income, employment_type and
+            optionally loan_amount and credit_score
+        
+    Returns:
+        List of eligibility dictionaries, in the same order
+    """
+    if not applications:
+        return []
+    
+    employment_types = [application["employment_type"] for application in applications]
+    loan_amounts = [application.get("loan_amount") for application in applications]
+    credit_scores = [application.get("credit_score") for application in applications]
+    
+    columns = calculate_eligibility_vectorized(
+        monthly_income=[application["monthly_income"] for application in applications],
+        employment_type=employment_types,
+        loan_amount=[amount if amount else np.nan for amount in loan_amounts],
+        credit_score=[np.nan if score is None else score for score in credit_scores]
+    )
+    
+    results = []
+    for index, employment_type in enumerate(employment_types):
+        loan_amount = loan_amounts[index]
+        interest_rate = float(columns["interest_rate"][index])
+        eligible_amount = float(columns["eligible_amount"][index])
+        is_eligible = bool(columns["is_eligible"][index])
+        
+        rejection_reasons = None
+        if not is_eligible:
+            rejection_reasons = (
+                f"Requested loan amount ₹{loan_amount:,.2f} exceeds eligible amount ₹{eligible_amount:,.2f}"
+            )
+        
+        results.append({
+            "max_emi": float(columns["max_emi"][index]),
+            "interest_rate": round(interest_rate, 4),
+            "interest_rate_percent": round(interest_rate * 100, 2),
+            "tenure_months": int(columns["tenure_months"][index]),
+            "eligible_amount": eligible_amount,
+            "is_eligible": is_eligible,
+            "rejection_reasons": rejection_reasons,
+            "actual_emi": float(columns["actual_emi"][index]) if loan_amount else None,
+            "employment_type": employment_type if isinstance(employment_type, str) else employment_type.value,
+            "score_band": columns["score_band"][index] or None,
+            "pricing_version": columns["pricing_version"]
+        })
+    
+    return results
+
+
 def calculate_emi(principal: float, annual_rate: float, tenure_months: int) -> float:
     """
     Calculate EMI (Equated Monthly Installment).
@@ -130,9 +301,19 @@ def calculate_total_interest(principal: float, emi: float, tenure_months: int) -
     return round(total_interest, 2)
 
 
-def get_amortization_schedule(principal: float, annual_rate: float, tenure_months: int) -> list:
+# Below this many paise (₹1e11), 2-decimal floats convert to and from integer paise exactly
+EXACT_PAISE_LIMIT = 10 ** 13
+
+
+def amortization_columns(principal: float, annual_rate: float, tenure_months: int) -> dict:
     """
-    Generate loan amortization schedule.
+    Generate the amortization schedule as columns.
+    
+    Each month's interest is rounded from the previous month's rounded
+    balance, so the schedule is path-dependent: a closed-form formula drifts
+    from it by a paisa here and there. The recurrence is kept, but the EMI,
+    principal and balance are carried in integer paise, which leaves one
+    round() per month instead of three and gives the same values.
     
     Args:
         principal: Loan principal amount
@@ -140,29 +321,74 @@ def get_amortization_schedule(principal: float, annual_rate: float, tenure_month
         tenure_months: Loan tenure in months
         
     Returns:
-        List of dictionaries containing monthly breakdown
+        Dictionary with the EMI and the principal, interest and balance
+        lists (one entry per month)
     """
     monthly_rate = annual_rate / 12
     emi = calculate_emi(principal, annual_rate, tenure_months)
-    balance = principal
-    schedule = []
+    emi_paise = round(emi * 100)
+    principals = []
+    interests = []
+    balances = []
     
-    for month in range(1, tenure_months + 1):
+    balance = principal
+    balance_paise = None
+    for _ in range(tenure_months):
         interest_component = round(balance * monthly_rate, 2)
-        principal_component = round(emi - interest_component, 2)
-        balance = round(balance - principal_component, 2)
+        if balance_paise is not None and max(abs(balance_paise), abs(emi_paise)) < EXACT_PAISE_LIMIT:
+            principal_paise = emi_paise - round(interest_component * 100)
+            balance_paise -= principal_paise
+            principal_component = principal_paise / 100
+            balance = balance_paise / 100
+        else:
+            # First month (the principal may carry more than 2 decimals), or
+            # amounts too large for paise to be exact in a float
+            principal_component = round(emi - interest_component, 2)
+            balance = round(balance - principal_component, 2)
+            balance_paise = round(balance * 100)
         
-        # Handle floating point precision for last payment
-        if month == tenure_months:
-            principal_component = round(principal_component + balance, 2)
-            balance = 0
+        principals.append(principal_component)
+        interests.append(interest_component)
+        balances.append(max(balance, 0))
+    
+    # Handle floating point precision for last payment
+    if tenure_months > 0:
+        principals[-1] = round(principals[-1] + balance, 2)
+        balances[-1] = 0
+    
+    return {
+        "emi": emi,
+        "principal": principals,
+        "interest": interests,
+        "balance": balances
+    }
+
+
+def get_amortization_schedule(principal: float, annual_rate: float, tenure_months: int) -> list:
+    """
+    Generate loan amortization schedule.
+    
+    Args:
+        principal: Loan principal amount
+        annual_rate: Annual interest rate
+        tenure_months: Loan tenure in months
         
-        schedule.append({
+    Returns:
+        List of dictionaries containing monthly breakdown
+    """
+    columns = amortization_columns(principal, annual_rate, tenure_months)
+    emi = columns["emi"]
+    
+    return [
+        {
             "month": month,
             "emi": emi,
             "principal": principal_component,
             "interest": interest_component,
-            "balance": max(balance, 0)
-        })
-    
-    return schedule
+            "balance": balance
+        }
+        for month, (principal_component, interest_component, balance) in enumerate(
+            zip(columns["principal"], columns["interest"], columns["balance"]),
+            start=1
+        )
+    ]
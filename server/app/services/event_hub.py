@@ -0,0 +1,277 @@
+import asyncio
+import json
+from collections import defaultdict, deque
+from typing import AsyncIterator, Optional
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, async_engine
+from app.core.enums import ApplicationStatus
+from app.services.application_service import build_snapshot, load_application_with_results
+from app.services.status_notifications import add_local_listener, remove_local_listener
+
+
+# Transitions after which the stream also carries the KYC / credit / eligibility results
+RESULT_STATUSES = {
+    ApplicationStatus.KYC_COMPLETED.value,
+    ApplicationStatus.ELIGIBLE.value,
+    ApplicationStatus.NOT_ELIGIBLE.value,
+}
+
+
+async def load_application_state(application_id: int) -> Optional[dict]:
+    """
+    Current status and KYC / credit / eligibility results, read from the
+    primary rather than the response cache or a replica, so nothing
+    committed before the call is missing
+    """
+    async with AsyncSessionLocal() as db:
+        application = await load_application_with_results(db, application_id)
+    if application is None:
+        return None
+    resources = build_snapshot(application)["resources"]
+    return {
+        "status": resources["application"]["status"],
+        "results": {name: resources[name] for name in ("kyc", "credit", "eligibility")}
+    }
+
+
+class Subscriber:
+    """One open event stream: a bounded queue of events (None = disconnect)"""
+    
+    __slots__ = ("application_id", "queue")
+    
+    def __init__(self, application_id: int, queue_size: int):
+        self.application_id = application_id
+        self.queue = asyncio.Queue(maxsize=queue_size)
+
+
+class StatusEventHub:
+    """
+    In-process fan-out of application status events to SSE subscribers.
+    
+    Committed transitions arrive through Postgres LISTEN on one dedicated
+    connection per process (or directly from the committing session on
+    other databases) and go through a single dispatcher task. Subscribers
+    are indexed by application ID, so an event costs one dictionary lookup
+    and a put per open stream of that application; idle streams cost
+    nothing but their queue.
+    
+    The last SSE_REPLAY_EVENTS events of recently active applications are
+    kept so a reconnecting client can resume from its Last-Event-ID. Event
+    IDs are chosen by the publisher, so they are the same in every worker.
+    """
+    
+    def __init__(self, channel: str, queue_size: int, replay_events: int, replay_applications: int, replay_ttl: float):
+        self.channel = channel
+        self.queue_size = queue_size
+        self.replay_events = replay_events
+        self._subscribers = defaultdict(set)
+        self._replay = TTLCache(maxsize=replay_applications, ttl=replay_ttl)
+        self._inbox = None
+        self._tasks = []
+        self.listening = False
+        self.received = 0
+        self.delivered = 0
+        self.dropped_subscribers = 0
+        self.listen_errors = 0
+    
+    async def start(self) -> None:
+        if self._tasks:
+            return
+        self._inbox = asyncio.Queue()
+        self._tasks.append(asyncio.create_task(self._dispatch()))
+        if async_engine.dialect.name == "postgresql" and async_engine.dialect.driver == "asyncpg":
+            self._tasks.append(asyncio.create_task(self._listen()))
+        else:
+            add_local_listener(self._receive)
+    
+    async def stop(self) -> None:
+        remove_local_listener(self._receive)
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._inbox = None
+        for subscribers in list(self._subscribers.values()):
+            for subscriber in list(subscribers):
+                self._disconnect(subscriber)
+    
+    def _receive(self, events: list) -> None:
+        if self._inbox is None:
+            return
+        for item in events:
+            self.received += 1
+            self._inbox.put_nowait(item)
+    
+    def _on_notify(self, connection, pid, channel, payload) -> None:
+        try:
+            item = json.loads(payload)
+        except ValueError:
+            return
+        self._receive([item])
+    
+    async def _listen(self) -> None:
+        """Hold a LISTEN connection, reconnecting with backoff when it drops"""
+        delay = 1.0
+        while True:
+            try:
+                async with async_engine.connect() as conn:
+                    raw = await conn.get_raw_connection()
+                    driver = raw.driver_connection
+                    await driver.add_listener(self.channel, self._on_notify)
+                    self.listening = True
+                    delay = 1.0
+                    try:
+                        while not driver.is_closed():
+                            await asyncio.sleep(settings.SSE_HEARTBEAT_SECONDS)
+                    finally:
+                        self.listening = False
+                        if not driver.is_closed():
+                            await driver.remove_listener(self.channel, self._on_notify)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self.listen_errors += 1
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30.0)
+    
+    async def _dispatch(self) -> None:
+        while True:
+            item = await self._inbox.get()
+            application_id = item.get("application_id")
+            if application_id is None:
+                continue
+            
+            subscribers = self._subscribers.get(application_id)
+            if subscribers and item.get("to") in RESULT_STATUSES:
+                # Loaded once per event, however many streams are open
+                try:
+                    state = await load_application_state(application_id)
+                except Exception:
+                    state = None
+                if state is not None:
+                    item["results"] = state["results"]
+            
+            self._remember(item)
+            for subscriber in list(self._subscribers.get(application_id, ())):
+                try:
+                    subscriber.queue.put_nowait(item)
+                    self.delivered += 1
+                except asyncio.QueueFull:
+                    # Too slow: drop it; the client resumes with Last-Event-ID
+                    self.dropped_subscribers += 1
+                    self._disconnect(subscriber)
+    
+    def _remember(self, item: dict) -> None:
+        events = self._replay.get(item["application_id"])
+        if events is None:
+            events = deque(maxlen=self.replay_events)
+        events.append(item)
+        self._replay.set(item["application_id"], events)
+    
+    def replay_after(self, application_id: int, last_event_id: str) -> Optional[list]:
+        """Events after last_event_id, or None when it is no longer in the replay buffer"""
+        events = list(self._replay.get(application_id) or ())
+        for index, item in enumerate(events):
+            if item["id"] == last_event_id:
+                return events[index + 1:]
+        return None
+    
+    def subscribe(self, application_id: int) -> Subscriber:
+        subscriber = Subscriber(application_id, self.queue_size)
+        self._subscribers[application_id].add(subscriber)
+        return subscriber
+    
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        subscribers = self._subscribers.get(subscriber.application_id)
+        if subscribers is not None:
+            subscribers.discard(subscriber)
+            if not subscribers:
+                del self._subscribers[subscriber.application_id]
+    
+    def _disconnect(self, subscriber: Subscriber) -> None:
+        self.unsubscribe(subscriber)
+        while not subscriber.queue.empty():
+            subscriber.queue.get_nowait()
+        subscriber.queue.put_nowait(None)
+    
+    def stats(self) -> dict:
+        return {
+            "listening": self.listening,
+            "streams": sum(len(subscribers) for subscribers in self._subscribers.values()),
+            "applications": len(self._subscribers),
+            "received": self.received,
+            "delivered": self.delivered,
+            "dropped_subscribers": self.dropped_subscribers,
+            "listen_errors": self.listen_errors,
+            "replay": self._replay.stats()
+        }
+
+
+status_event_hub = StatusEventHub(
+    channel=settings.SSE_NOTIFY_CHANNEL,
+    queue_size=settings.SSE_QUEUE_SIZE,
+    replay_events=settings.SSE_REPLAY_EVENTS,
+    replay_applications=settings.SSE_REPLAY_APPLICATIONS,
+    replay_ttl=settings.SSE_REPLAY_TTL_SECONDS
+)
+
+
+def format_event(event_type: str, data: dict, event_id: Optional[str] = None) -> str:
+    """One Server-Sent Events message"""
+    lines = [f"event: {event_type}"]
+    if event_id:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'))}")
+    return "\n".join(lines) + "\n\n"
+
+
+async def stream_application_events(application_id: int, last_event_id: Optional[str] = None) -> AsyncIterator[str]:
+    """
+    SSE body for one application.
+    
+    Subscribes first, then sends either the events after last_event_id (when
+    still in the replay buffer) or a "snapshot" event with the current status
+    and results, then every "status" event as it happens. A comment line is
+    sent every SSE_HEARTBEAT_SECONDS so proxies keep the connection open.
+    
+    The snapshot is read from the primary after subscribing, so a transition
+    committed in between is either in the snapshot or queued (possibly both),
+    never lost. Queued events that were already sent in the replay are skipped.
+    
+    Args:
+        application_id: The application to follow
+        last_event_id: The Last-Event-ID request header, if any
+    """
+    subscriber = status_event_hub.subscribe(application_id)
+    try:
+        yield f"retry: {settings.SSE_RETRY_MILLISECONDS}\n\n"
+        
+        replayed = set()
+        replay = status_event_hub.replay_after(application_id, last_event_id) if last_event_id else None
+        if replay is None:
+            state = await load_application_state(application_id)
+            if state is None:
+                return
+            yield format_event("snapshot", {"application_id": application_id, **state})
+        else:
+            for item in replay:
+                replayed.add(item["id"])
+                yield format_event("status", item, item["id"])
+        
+        while True:
+            try:
+                item = await asyncio.wait_for(subscriber.queue.get(), timeout=settings.SSE_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            if item is None:
+                break
+            if item["id"] in replayed:
+                # Buffered for the replay and queued for this stream as well
+                replayed.discard(item["id"])
+                continue
+            yield format_event("status", item, item["id"])
+    finally:
+        status_event_hub.unsubscribe(subscriber)
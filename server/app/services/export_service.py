@@ -0,0 +1,172 @@
+import csv
+import io
+import json
+import zlib
+from datetime import date, datetime, time, timedelta, timezone
+from typing import AsyncIterator, Optional
+
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.database import read_session
+from app.core.enums import ApplicationStatus
+from app.models.credit import CreditResult, EligibilityResult
+from app.models.kyc import KYCResult
+from app.models.loan_application import LoanApplication
+
+
+APPLICATION_COLUMNS = [
+    LoanApplication.id,
+    LoanApplication.user_id,
+    LoanApplication.full_name,
+    LoanApplication.mobile,
+    LoanApplication.pan,
+    LoanApplication.dob,
+    LoanApplication.email,
+    LoanApplication.address,
+    LoanApplication.employment_type,
+    LoanApplication.monthly_income,
+    LoanApplication.loan_amount,
+    LoanApplication.loan_purpose,
+    LoanApplication.status,
+    LoanApplication.created_at,
+    LoanApplication.updated_at,
+]
+
+RESULT_COLUMNS = [
+    KYCResult.status.label("kyc_status"),
+    KYCResult.name_match_score.label("kyc_name_match_score"),
+    CreditResult.credit_score.label("credit_score"),
+    CreditResult.active_loans.label("credit_active_loans"),
+    CreditResult.is_approved.label("credit_is_approved"),
+    CreditResult.rejection_reason.label("credit_rejection_reason"),
+    EligibilityResult.max_emi.label("eligibility_max_emi"),
+    EligibilityResult.interest_rate.label("eligibility_interest_rate"),
+    EligibilityResult.tenure_months.label("eligibility_tenure_months"),
+    EligibilityResult.eligible_amount.label("eligibility_eligible_amount"),
+    EligibilityResult.is_eligible.label("eligibility_is_eligible"),
+    EligibilityResult.score_band.label("eligibility_score_band"),
+    EligibilityResult.pricing_version.label("eligibility_pricing_version"),
+]
+
+
+def apply_loan_filters(
+    query,
+    status: Optional[ApplicationStatus] = None,
+    created_from: Optional[date] = None,
+    created_to: Optional[date] = None
+):
+    """Apply the admin status and creation-date filters (UTC dates, inclusive)"""
+    if status:
+        query = query.where(LoanApplication.status == status.value)
+    if created_from:
+        query = query.where(
+            LoanApplication.created_at >= datetime.combine(created_from, time.min, tzinfo=timezone.utc)
+        )
+    if created_to:
+        query = query.where(
+            LoanApplication.created_at < datetime.combine(created_to + timedelta(days=1), time.min, tzinfo=timezone.utc)
+        )
+    return query
+
+
+def build_export_query(
+    status: Optional[ApplicationStatus] = None,
+    created_from: Optional[date] = None,
+    created_to: Optional[date] = None,
+    include_results: bool = False
+):
+    """Column-level SELECT for the export (no ORM objects), oldest first"""
+    columns = APPLICATION_COLUMNS + (RESULT_COLUMNS if include_results else [])
+    query = select(*columns)
+    if include_results:
+        query = (
+            query
+            .outerjoin(KYCResult, KYCResult.loan_application_id == LoanApplication.id)
+            .outerjoin(CreditResult, CreditResult.loan_application_id == LoanApplication.id)
+            .outerjoin(EligibilityResult, EligibilityResult.loan_application_id == LoanApplication.id)
+        )
+    query = apply_loan_filters(query, status, created_from, created_to)
+    return query.order_by(LoanApplication.created_at, LoanApplication.id)
+
+
+def _plain(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def _encode_csv(rows: list, header: Optional[list]) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(header)
+    for row in rows:
+        writer.writerow(["" if value is None else _plain(value) for value in row])
+    return buffer.getvalue()
+
+
+def _encode_ndjson(rows: list, keys: list) -> str:
+    return "".join(
+        json.dumps({key: _plain(value) for key, value in zip(keys, row)}) + "\n"
+        for row in rows
+    )
+
+
+async def stream_export(
+    export_format: str,
+    status: Optional[ApplicationStatus] = None,
+    created_from: Optional[date] = None,
+    created_to: Optional[date] = None,
+    include_results: bool = False,
+    compress: bool = False
+) -> AsyncIterator[bytes]:
+    """
+    Stream loan applications as CSV or NDJSON, optionally gzip-compressed.
+    
+    Rows come from a server-side cursor (stream_results + yield_per), and each
+    partition of EXPORT_FETCH_SIZE rows is encoded and sent before the next
+    is fetched, so memory stays flat however many rows match.
+    
+    The session is opened here rather than through a dependency because the
+    body is produced after the endpoint has returned.
+    
+    Args:
+        export_format: "csv" or "ndjson"
+        status: Optional status filter
+        created_from: Optional first creation date (inclusive)
+        created_to: Optional last creation date (inclusive)
+        include_results: Join the KYC / credit / eligibility results
+        compress: gzip the output on the fly
+    
+    Yields:
+        Encoded chunks of the export
+    """
+    query = build_export_query(status, created_from, created_to, include_results)
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS) if compress else None
+    
+    async with read_session() as db:
+        result = await db.stream(query.execution_options(yield_per=settings.EXPORT_FETCH_SIZE))
+        keys = list(result.keys())
+        header = keys if export_format == "csv" else None
+        
+        async for partition in result.partitions():
+            if export_format == "csv":
+                text = _encode_csv(partition, header)
+                header = None
+            else:
+                text = _encode_ndjson(partition, keys)
+            
+            data = text.encode("utf-8")
+            if compressor:
+                data = compressor.compress(data)
+            if data:
+                yield data
+        
+        if header:
+            # No rows: still send the CSV header
+            data = _encode_csv([], header).encode("utf-8")
+            yield compressor.compress(data) if compressor else data
+    
+    if compressor:
+        yield compressor.flush()
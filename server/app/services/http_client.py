@@ -0,0 +1,218 @@
+import asyncio
+import math
+import random
+import time
+from typing import Optional
+
+import httpx
+
+from app.core.config import settings
+from app.services.circuit_breaker import build_bulkhead, build_circuit_breaker
+from app.utils.exceptions import ProviderRejectedException, ProviderUnavailableException
+
+
+# Transient failures worth retrying
+RETRYABLE_STATUS_CODES = {429, 502, 503, 504}
+RETRYABLE_EXCEPTIONS = (httpx.TimeoutException, httpx.NetworkError, httpx.RemoteProtocolError)
+
+
+class ProviderHttpClient:
+    """
+    Shared keep-alive HTTP client for external verification providers.
+    
+    One httpx.AsyncClient (and connection pool) is created at startup and
+    reused by every provider call; `request` adds a per-call timeout and
+    bounded retries with full-jitter exponential backoff. A Retry-After on
+    a 429 / 503 is honoured when it is within PROVIDER_BACKOFF_MAX_SECONDS;
+    a longer one ends the call at once, passing the Retry-After on. A 4xx
+    other than 429 is the caller's fault: it is neither retried nor counted
+    by the circuit breaker, and raises ProviderRejectedException.
+    
+    Each provider also gets a circuit breaker and a bulkhead. While a
+    provider's breaker is open, or all its slots are busy, calls fail fast
+    with ProviderUnavailableException (503 + Retry-After) instead of
+    waiting out the timeout.
+    """
+    
+    def __init__(
+        self,
+        max_connections: int,
+        max_keepalive: int,
+        timeout: float,
+        max_retries: int,
+        backoff_base: float,
+        backoff_max: float
+    ):
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive
+        )
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._client: Optional[httpx.AsyncClient] = None
+        self.breakers = {}
+        self.bulkheads = {}
+    
+    async def startup(self) -> None:
+        if self._client is None:
+            self._client = httpx.AsyncClient(limits=self.limits, timeout=self.timeout)
+    
+    async def shutdown(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            # Used outside the app lifespan (scripts, jobs)
+            self._client = httpx.AsyncClient(limits=self.limits, timeout=self.timeout)
+        return self._client
+    
+    def _backoff(self, attempt: int) -> float:
+        """Full jitter: uniform(0, min(max, base * 2^attempt))"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+    
+    def _guards(self, provider: str) -> tuple:
+        if provider not in self.breakers:
+            self.breakers[provider] = build_circuit_breaker(provider)
+            self.bulkheads[provider] = build_bulkhead(provider)
+        return self.breakers[provider], self.bulkheads[provider]
+    
+    @staticmethod
+    def _retry_after(response: httpx.Response) -> Optional[float]:
+        """Retry-After in seconds (delta-seconds form only), or None"""
+        try:
+            return max(float(response.headers["Retry-After"]), 0.0)
+        except (KeyError, ValueError):
+            return None
+    
+    async def _send(self, provider: str, method: str, url: str, timeout: Optional[float], **kwargs) -> httpx.Response:
+        """Send with retries; return the first non-retryable response"""
+        last_error = None
+        retry_after = None
+        
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                await asyncio.sleep(retry_after if retry_after is not None else self._backoff(attempt - 1))
+            try:
+                response = await self.client.request(
+                    method, url, timeout=timeout or self.timeout, **kwargs
+                )
+            except RETRYABLE_EXCEPTIONS as exc:
+                last_error = f"{type(exc).__name__}: {exc}"
+                retry_after = None
+                continue
+            
+            if response.status_code in RETRYABLE_STATUS_CODES:
+                last_error = f"HTTP {response.status_code}"
+                retry_after = self._retry_after(response)
+                if retry_after is not None and retry_after > self.backoff_max:
+                    raise ProviderUnavailableException(
+                        f"{provider} provider asked to retry in {retry_after:g}s ({last_error})",
+                        retry_after=math.ceil(retry_after)
+                    )
+                continue
+            return response
+        
+        raise ProviderUnavailableException(
+            f"{provider} provider unavailable after {self.max_retries + 1} attempts ({last_error})",
+            retry_after=math.ceil(retry_after) if retry_after else None
+        )
+    
+    async def request(
+        self,
+        provider: str,
+        method: str,
+        url: str,
+        timeout: Optional[float] = None,
+        required_keys: tuple = (),
+        **kwargs
+    ) -> dict:
+        """
+        Send a request and return the decoded JSON body.
+        
+        Args:
+            required_keys: Keys the response object must have; a body that is
+                not a JSON object with all of them is treated like a failed call
+        
+        Raises:
+            ProviderUnavailableException: if every attempt failed, the
+                provider's circuit breaker or bulkhead rejected the call, or
+                the response body was not the expected JSON object
+            ProviderRejectedException: if the provider answered 4xx
+        """
+        breaker, bulkhead = self._guards(provider)
+        
+        if not await bulkhead.acquire():
+            raise ProviderUnavailableException(
+                f"{provider} provider is at its concurrency limit, try again shortly",
+                retry_after=1
+            )
+        try:
+            if not breaker.allow():
+                raise ProviderUnavailableException(
+                    f"{provider} provider is temporarily unavailable (circuit open)",
+                    retry_after=breaker.retry_after()
+                )
+            
+            start = time.perf_counter()
+            try:
+                response = await self._send(provider, method, url, timeout, **kwargs)
+            except ProviderUnavailableException:
+                breaker.record(time.perf_counter() - start, failed=True)
+                raise
+            except BaseException:
+                breaker.release()
+                raise
+            if 400 <= response.status_code < 500:
+                # The provider is up but refused this request: says nothing about its health
+                breaker.release()
+            else:
+                breaker.record(time.perf_counter() - start, failed=response.status_code >= 500)
+        finally:
+            bulkhead.release()
+        
+        if response.status_code >= 500:
+            raise ProviderUnavailableException(
+                f"{provider} provider failed the request (HTTP {response.status_code})"
+            )
+        if response.status_code >= 400:
+            raise ProviderRejectedException(
+                f"{provider} provider rejected the request (HTTP {response.status_code})",
+                provider_status=response.status_code
+            )
+        try:
+            body = response.json()
+        except ValueError:
+            raise ProviderUnavailableException(f"{provider} provider returned a response that is not JSON")
+        if not isinstance(body, dict):
+            raise ProviderUnavailableException(f"{provider} provider returned an unexpected response")
+        missing = [key for key in required_keys if key not in body]
+        if missing:
+            raise ProviderUnavailableException(
+                f"{provider} provider response is missing {', '.join(missing)}"
+            )
+        return body
+    
+    def snapshot(self) -> dict:
+        """Circuit breaker and bulkhead state per provider"""
+        return {
+            provider: {
+                "circuit_breaker": breaker.snapshot(),
+                "bulkhead": self.bulkheads[provider].snapshot()
+            }
+            for provider, breaker in self.breakers.items()
+        }
+
+
+provider_http_client = ProviderHttpClient(
+    max_connections=settings.PROVIDER_MAX_CONNECTIONS,
+    max_keepalive=settings.PROVIDER_MAX_KEEPALIVE,
+    timeout=settings.PROVIDER_TIMEOUT_SECONDS,
+    max_retries=settings.PROVIDER_MAX_RETRIES,
+    backoff_base=settings.PROVIDER_BACKOFF_BASE_SECONDS,
+    backoff_max=settings.PROVIDER_BACKOFF_MAX_SECONDS
+)
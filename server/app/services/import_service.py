@@ -0,0 +1,311 @@
+import codecs
+import csv
+import json
+import time
+from typing import AsyncIterator
+
+from fastapi import UploadFile
+from pydantic import ValidationError
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.enums import ApplicationStatus
+from app.models.loan_application import LoanApplication
+from app.models.user import User
+from app.schemas.loan_application import LoanApplicationCreate
+from app.services.workflow_service import record_created
+from app.utils.validators import validate_application_data
+
+
+# Same limit as POST /loan/create (all applications, regardless of status)
+MAX_APPLICATIONS_PER_USER = 5
+
+# Statuses that block a second application for the same PAN
+ACTIVE_STATUSES = [
+    ApplicationStatus.DRAFT.value,
+    ApplicationStatus.KYC_PENDING.value,
+    ApplicationStatus.KYC_COMPLETED.value,
+    ApplicationStatus.CREDIT_CHECK_PENDING.value,
+    ApplicationStatus.CREDIT_CHECK_COMPLETED.value
+]
+
+# Columns written by the import, in COPY order
+IMPORT_COLUMNS = [
+    "user_id", "full_name", "mobile", "pan", "dob", "email", "address",
+    "employment_type", "monthly_income", "loan_amount", "loan_purpose", "status"
+]
+
+
+async def iter_lines(upload: UploadFile, chunk_size: int = 64 * 1024) -> AsyncIterator[str]:
+    """
+    Yield decoded lines from an upload, reading it in fixed-size chunks.
+    
+    Starlette spools multipart parts over 1 MB to a temporary file, so
+    only one chunk (plus a partial line) is in memory at a time.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    while True:
+        chunk = await upload.read(chunk_size)
+        if not chunk:
+            break
+        pending += decoder.decode(chunk)
+        lines = pending.split("\n")
+        pending = lines.pop()
+        for line in lines:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+
+async def iter_csv_rows(lines: AsyncIterator[str]) -> AsyncIterator[tuple]:
+    """
+    Yield (line number, row dict) from CSV lines; the first record is the header.
+    
+    Quoted fields may span lines: lines are joined until the quotes balance.
+    """
+    header = None
+    record = ""
+    start = 0
+    number = 0
+    async for line in lines:
+        number += 1
+        if not record:
+            start = number
+            record = line
+        else:
+            record += "\n" + line
+        if record.count('"') % 2:
+            continue
+        
+        values = next(csv.reader([record]))
+        record = ""
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        if not any(value.strip() for value in values):
+            continue
+        yield start, dict(zip(header, values))
+    
+    if record:
+        yield start, {"__error__": "Unterminated quoted field"}
+
+
+async def iter_ndjson_rows(lines: AsyncIterator[str]) -> AsyncIterator[tuple]:
+    """Yield (line number, row dict) from NDJSON lines, skipping blank lines"""
+    number = 0
+    async for line in lines:
+        number += 1
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as exc:
+            yield number, {"__error__": f"Invalid JSON: {exc}"}
+            continue
+        if not isinstance(row, dict):
+            yield number, {"__error__": "Each line must be a JSON object"}
+            continue
+        yield number, row
+
+
+def _parse_row(row: dict) -> tuple:
+    """
+    Validate one row with the same rules as POST /loan/create.
+    
+    Returns:
+        (LoanApplicationCreate or None, list of error messages)
+    """
+    if "__error__" in row:
+        return None, [row["__error__"]]
+    
+    # CSV gives empty strings for missing optional values
+    data = {key: value for key, value in row.items() if value not in ("", None)}
+    try:
+        application = LoanApplicationCreate.model_validate(data)
+    except ValidationError as exc:
+        return None, [
+            f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+            for error in exc.errors()
+        ]
+    
+    validation_result = validate_application_data(
+        pan=application.pan,
+        dob=application.dob,
+        loan_amount=application.loan_amount,
+        monthly_income=application.monthly_income
+    )
+    return application, validation_result["errors"]
+
+
+async def _copy_rows(db: AsyncSession, rows: list) -> None:
+    """
+    Insert rows with COPY on PostgreSQL (asyncpg), or executemany elsewhere.
+    
+    COPY runs on the session's connection, inside its open transaction.
+    """
+    conn = await db.connection()
+    if conn.dialect.name == "postgresql" and conn.dialect.driver == "asyncpg":
+        raw = await conn.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            LoanApplication.__tablename__,
+            records=[tuple(row[column] for column in IMPORT_COLUMNS) for row in rows],
+            columns=IMPORT_COLUMNS
+        )
+    else:
+        await db.execute(insert(LoanApplication), rows)
+
+
+class ApplicationImporter:
+    """
+    Import loan applications from a stream of rows, one batch at a time.
+    
+    For each batch of IMPORT_BATCH_SIZE rows:
+    - rows are validated with LoanApplicationCreate and validate_application_data
+    - duplicate PANs (in the file, or active in the database) and the
+      per-user application limit are checked with one query each
+    - valid rows are written with COPY (executemany on SQLite), logged as
+      created and committed
+    
+    Rows are linked to the registered user with the same email, if any.
+    Only the first IMPORT_MAX_ERRORS_REPORTED row errors are kept.
+    """
+    
+    def __init__(self, db: AsyncSession, batch_size: int = None, max_errors: int = None):
+        self.db = db
+        self.batch_size = batch_size or settings.IMPORT_BATCH_SIZE
+        self.max_errors = max_errors or settings.IMPORT_MAX_ERRORS_REPORTED
+        self.seen_pans = set()
+        self.errors = []
+        self.rows_total = 0
+        self.rows_imported = 0
+        self.rows_failed = 0
+        self.batches = 0
+    
+    def _reject(self, line: int, messages: list) -> None:
+        self.rows_failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"row": line, "errors": messages})
+    
+    async def _load_batch_context(self, applications: list) -> tuple:
+        """Active PANs, user IDs by email and application counts per user, for one batch"""
+        pans = {application.pan for application in applications}
+        emails = {application.email.lower() for application in applications if application.email}
+        
+        result = await self.db.execute(
+            select(LoanApplication.pan).where(
+                LoanApplication.pan.in_(pans),
+                LoanApplication.status.in_(ACTIVE_STATUSES)
+            ).distinct()
+        )
+        active_pans = set(result.scalars().all())
+        
+        user_ids = {}
+        if emails:
+            result = await self.db.execute(
+                select(User.id, User.email).where(func.lower(User.email).in_(emails))
+            )
+            user_ids = {email.lower(): user_id for user_id, email in result.all()}
+        
+        counts = {}
+        if user_ids:
+            result = await self.db.execute(
+                select(LoanApplication.user_id, func.count())
+                .where(LoanApplication.user_id.in_(set(user_ids.values())))
+                .group_by(LoanApplication.user_id)
+            )
+            counts = dict(result.all())
+        
+        return active_pans, user_ids, counts
+    
+    async def _flush(self, batch: list) -> None:
+        """Validate a batch of (line, row) pairs set-wise and insert the valid rows"""
+        self.batches += 1
+        parsed = []
+        for line, row in batch:
+            application, errors = _parse_row(row)
+            if errors:
+                self._reject(line, errors)
+            else:
+                parsed.append((line, application))
+        
+        if not parsed:
+            return
+        
+        active_pans, user_ids, counts = await self._load_batch_context(
+            [application for _, application in parsed]
+        )
+        
+        rows = []
+        for line, application in parsed:
+            if application.pan in active_pans or application.pan in self.seen_pans:
+                self._reject(line, [f"An active application already exists for PAN {application.pan}"])
+                continue
+            
+            user_id = user_ids.get(application.email.lower()) if application.email else None
+            if user_id is not None:
+                if counts.get(user_id, 0) >= MAX_APPLICATIONS_PER_USER:
+                    self._reject(line, [f"User already has {MAX_APPLICATIONS_PER_USER} applications"])
+                    continue
+                counts[user_id] = counts.get(user_id, 0) + 1
+            
+            self.seen_pans.add(application.pan)
+            rows.append({
+                "user_id": user_id,
+                "full_name": application.full_name,
+                "mobile": application.mobile,
+                "pan": application.pan,
+                "dob": application.dob,
+                "email": application.email,
+                "address": application.address,
+                "employment_type": application.employment_type.value,
+                "monthly_income": application.monthly_income,
+                "loan_amount": application.loan_amount,
+                "loan_purpose": application.loan_purpose,
+                "status": ApplicationStatus.DRAFT.value
+            })
+        
+        if rows:
+            await _copy_rows(self.db, rows)
+            # COPY returns no IDs; the batch's PANs were free, so they identify the new rows
+            result = await self.db.execute(
+                select(LoanApplication.id).where(
+                    LoanApplication.pan.in_([row["pan"] for row in rows]),
+                    LoanApplication.status == ApplicationStatus.DRAFT.value
+                )
+            )
+            await record_created(self.db, list(result.scalars().all()))
+        await self.db.commit()
+        self.rows_imported += len(rows)
+    
+    async def run(self, rows: AsyncIterator[tuple]) -> dict:
+        """
+        Consume (line number, row dict) pairs and return the import report.
+        
+        Returns:
+            Dictionary with row counts, throughput and the per-row errors
+        """
+        start = time.perf_counter()
+        batch = []
+        async for line, row in rows:
+            self.rows_total += 1
+            batch.append((line, row))
+            if len(batch) >= self.batch_size:
+                await self._flush(batch)
+                batch = []
+        if batch:
+            await self._flush(batch)
+        elapsed = time.perf_counter() - start
+        
+        return {
+            "rows_total": self.rows_total,
+            "rows_imported": self.rows_imported,
+            "rows_failed": self.rows_failed,
+            "batches": self.batches,
+            "elapsed_seconds": round(elapsed, 3),
+            "rows_per_second": round(self.rows_total / elapsed, 1) if elapsed > 0 else 0.0,
+            "errors": self.errors,
+            "errors_truncated": self.rows_failed > len(self.errors)
+        }
@@ -0,0 +1,393 @@
+import asyncio
+import json
+import os
+import random
+import socket
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from fastapi import status
+from fastapi.responses import JSONResponse
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, mark_recent_write
+from app.core.enums import ApplicationStatus
+from app.models.job import Job
+from app.models.loan_application import LoanApplication
+from app.services.application_service import application_cache
+from app.services.verification_service import complete_credit_check, complete_kyc
+from app.services.workflow_service import change_status_many
+from app.utils.exceptions import (
+    ConflictException,
+    NotFoundException,
+    ProviderRejectedException,
+    ProviderUnavailableException,
+    StatusConflictException
+)
+
+
+QUEUED = "QUEUED"
+RUNNING = "RUNNING"
+SUCCEEDED = "SUCCEEDED"
+DEAD = "DEAD"
+
+KYC = "KYC"
+CREDIT_CHECK = "CREDIT_CHECK"
+
+# Per kind: the status a job starts from, the status the application waits in
+# while the job is queued or running, and the step that does the work
+JOB_KINDS = {
+    KYC: {
+        "from_status": ApplicationStatus.DRAFT,
+        "pending_status": ApplicationStatus.KYC_PENDING,
+        "handler": complete_kyc
+    },
+    CREDIT_CHECK: {
+        "from_status": ApplicationStatus.KYC_COMPLETED,
+        "pending_status": ApplicationStatus.CREDIT_CHECK_PENDING,
+        "handler": complete_credit_check
+    },
+}
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def retry_delay(attempts: int, retry_after: Optional[float] = None) -> float:
+    """
+    Seconds before the next attempt: exponential backoff from
+    JOB_RETRY_BASE_SECONDS, capped at JOB_RETRY_MAX_SECONDS, never sooner
+    than the provider's Retry-After, with jitter so jobs that failed
+    together don't all retry together.
+    """
+    delay = min(settings.JOB_RETRY_MAX_SECONDS, settings.JOB_RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+    delay = max(delay, retry_after or 0)
+    return delay * random.uniform(0.5, 1.0)
+
+
+async def enqueue_job(db: AsyncSession, application, kind: str, payload: Optional[dict] = None) -> Job:
+    """
+    Move the application to the job's pending status and queue the job, in
+    one transaction (committed here).
+    
+    The status change is a conditional update, so two requests for the same
+    application can't both queue a job.
+    
+    Raises:
+        StatusConflictException: The application is no longer in the job's starting status
+    """
+    spec = JOB_KINDS[kind]
+    application_id = application.id
+    claimed = await change_status_many(db, spec["from_status"], {application_id: spec["pending_status"]})
+    if not claimed:
+        await db.rollback()
+        raise StatusConflictException(
+            f"Invalid workflow state. Expected '{spec['from_status'].value}'; "
+            f"the application was moved on by another request"
+        )
+    
+    job = Job(
+        kind=kind,
+        loan_application_id=application_id,
+        payload=json.dumps(payload or {}),
+        status=QUEUED,
+        max_attempts=settings.JOB_MAX_ATTEMPTS,
+        run_after=_now()
+    )
+    db.add(job)
+    await db.commit()
+    await db.refresh(job)
+    application_cache.invalidate(application_id)
+    job_workers.notify()
+    return job
+
+
+async def claim_job(db: AsyncSession, worker_id: str) -> Optional[Job]:
+    """
+    Claim the next due job: a QUEUED job whose run_after has passed, or a
+    RUNNING one whose lease expired (its worker died).
+    
+    FOR UPDATE SKIP LOCKED lets concurrent workers each take a different
+    row instead of queueing on the same one. The claim is committed before
+    the job runs, so no lock is held during the provider call.
+    """
+    now = _now()
+    result = await db.execute(
+        select(Job)
+        .where(or_(
+            and_(Job.status == QUEUED, Job.run_after <= now),
+            and_(Job.status == RUNNING, Job.locked_at < now - timedelta(seconds=settings.JOB_LEASE_SECONDS))
+        ))
+        .order_by(Job.run_after, Job.id)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+    )
+    job = result.scalars().first()
+    if job is None:
+        await db.rollback()
+        return None
+    
+    job.status = RUNNING
+    job.attempts += 1
+    job.locked_by = worker_id
+    job.locked_at = now
+    await db.commit()
+    
+    # Detached, so a rollback after a failed attempt doesn't expire the lease fields
+    db.expunge(job)
+    return job
+
+
+async def _settle(db: AsyncSession, job: Job, **values) -> bool:
+    """Update the job if this worker still holds its lease (not committed)"""
+    result = await db.execute(
+        update(Job)
+        .where(
+            Job.id == job.id,
+            Job.status == RUNNING,
+            Job.locked_by == job.locked_by,
+            Job.attempts == job.attempts
+        )
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount == 1
+
+
+async def _fail(db: AsyncSession, job: Job, error: str, retry_after: Optional[float] = None, permanent: bool = False) -> str:
+    """
+    Schedule the next attempt, or dead-letter the job after max_attempts (at
+    once when `permanent`) and hand the application back to the job's
+    starting status so the step can be requested again. Committed here.
+    
+    Returns:
+        QUEUED or DEAD
+    """
+    spec = JOB_KINDS[job.kind]
+    error = error[:1000]
+    
+    if permanent or job.attempts >= job.max_attempts:
+        if not await _settle(db, job, status=DEAD, last_error=error, finished_at=_now()):
+            await db.rollback()
+            return RUNNING
+        await change_status_many(db, spec["pending_status"], {job.loan_application_id: spec["from_status"]})
+        outcome = DEAD
+    else:
+        run_after = _now() + timedelta(seconds=retry_delay(job.attempts, retry_after))
+        if not await _settle(db, job, status=QUEUED, last_error=error, run_after=run_after, locked_by=None):
+            await db.rollback()
+            return RUNNING
+        outcome = QUEUED
+    
+    await db.commit()
+    application_cache.invalidate(job.loan_application_id)
+    return outcome
+
+
+async def process_job(db: AsyncSession, job: Job) -> str:
+    """
+    Run a claimed job and record its outcome.
+    
+    The step's writes and the job's SUCCEEDED status commit together, and
+    only while the worker still holds the lease, so a job reclaimed after
+    a lease expiry can't be applied twice.
+    
+    Returns:
+        The job's new status (RUNNING if the lease was lost)
+    """
+    spec = JOB_KINDS[job.kind]
+    
+    if job.attempts > job.max_attempts:
+        # Reclaimed after its last attempt's worker died
+        return await _fail(db, job, job.last_error or "Worker lost the job on its last attempt")
+    
+    application = await db.get(LoanApplication, job.loan_application_id)
+    if application is None or application.status != spec["pending_status"].value:
+        current = application.status if application else "deleted"
+        if await _settle(db, job, status=DEAD, last_error=f"Application is {current}", finished_at=_now()):
+            await db.commit()
+            return DEAD
+        await db.rollback()
+        return RUNNING
+    
+    # Release the connection while the provider is called
+    await db.commit()
+    
+    try:
+        outcome = await spec["handler"](db, application, **json.loads(job.payload or "{}"))
+    except ProviderUnavailableException as exc:
+        await db.rollback()
+        return await _fail(db, job, exc.message, exc.retry_after)
+    except ProviderRejectedException as exc:
+        # The provider refused this application: another attempt would get the same answer
+        await db.rollback()
+        return await _fail(db, job, exc.message, permanent=True)
+    except Exception as exc:
+        await db.rollback()
+        return await _fail(db, job, f"{type(exc).__name__}: {exc}")
+    
+    if not await _settle(db, job, status=SUCCEEDED, result=json.dumps(outcome), last_error=None, finished_at=_now()):
+        await db.rollback()
+        return RUNNING
+    await db.commit()
+    application_cache.invalidate(application.id)
+    return SUCCEEDED
+
+
+async def requeue_job(db: AsyncSession, job_id: int) -> Job:
+    """
+    Put a dead-lettered job back on the queue with fresh attempts (committed).
+    
+    Raises:
+        NotFoundException: No such job
+        ConflictException: The job is not DEAD, or the application has moved
+            on from the job's starting status
+    """
+    job = await db.get(Job, job_id)
+    if job is None:
+        raise NotFoundException(f"Job {job_id} not found")
+    if job.status != DEAD:
+        raise ConflictException(f"Job {job_id} is {job.status}; only DEAD jobs can be requeued")
+    
+    spec = JOB_KINDS[job.kind]
+    application_id = job.loan_application_id
+    claimed = await change_status_many(db, spec["from_status"], {application_id: spec["pending_status"]})
+    if not claimed:
+        await db.rollback()
+        raise ConflictException(
+            f"Application {application_id} is no longer in {spec['from_status'].value} status"
+        )
+    
+    job.status = QUEUED
+    job.attempts = 0
+    job.run_after = _now()
+    job.locked_by = None
+    job.locked_at = None
+    job.finished_at = None
+    await db.commit()
+    await db.refresh(job)
+    application_cache.invalidate(application_id)
+    job_workers.notify()
+    return job
+
+
+def job_accepted_response(job: Job) -> JSONResponse:
+    """202 Accepted with the job snapshot and its status URL in Location"""
+    response = JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content=job_snapshot(job),
+        headers={"Location": f"/api/v1/jobs/{job.id}"}
+    )
+    mark_recent_write(response)
+    return response
+
+
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+def job_snapshot(job: Job) -> dict:
+    """A job as a JSON-ready dictionary (the step's response body under "result")"""
+    return {
+        "job_id": job.id,
+        "kind": job.kind,
+        "application_id": job.loan_application_id,
+        "status": job.status,
+        "attempts": job.attempts,
+        "max_attempts": job.max_attempts,
+        "run_after": _isoformat(job.run_after),
+        "last_error": job.last_error,
+        "result": json.loads(job.result) if job.result else None,
+        "created_at": _isoformat(job.created_at),
+        "updated_at": _isoformat(job.updated_at),
+        "finished_at": _isoformat(job.finished_at)
+    }
+
+
+class JobWorkerPool:
+    """
+    Asyncio workers that claim and run queued jobs.
+    
+    Each worker runs one job at a time. When the queue is empty workers
+    wait up to JOB_POLL_INTERVAL_SECONDS, or until a job is queued from
+    this process. Several processes (API workers or python -m
+    app.jobs.job_worker) can share the queue; SKIP LOCKED keeps them off
+    each other's rows.
+    """
+    
+    def __init__(self, workers: int, poll_interval: float):
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.name = f"{socket.gethostname()}:{os.getpid()}"
+        self._tasks = []
+        self._wakeup = None
+        self.busy = 0
+        self.outcomes = {SUCCEEDED: 0, QUEUED: 0, DEAD: 0, RUNNING: 0}
+        self.errors = 0
+    
+    def start(self) -> None:
+        if self._tasks or self.workers <= 0:
+            return
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._work(f"{self.name}:{index}")) for index in range(self.workers)]
+    
+    async def stop(self) -> None:
+        """
+        Stop the workers. A job cut short stays RUNNING and is picked up
+        again once its lease expires.
+        """
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+    
+    def notify(self) -> None:
+        """Wake idle workers (a job was queued)"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+    
+    async def run_once(self, worker_id: str) -> bool:
+        """Claim and run one job; False when none was due"""
+        async with AsyncSessionLocal() as db:
+            job = await claim_job(db, worker_id)
+            if job is None:
+                return False
+            self.busy += 1
+            try:
+                self.outcomes[await process_job(db, job)] += 1
+            finally:
+                self.busy -= 1
+        return True
+    
+    async def _work(self, worker_id: str) -> None:
+        while True:
+            try:
+                if await self.run_once(worker_id):
+                    continue
+            except SQLAlchemyError:
+                # Database unavailable: back off for a poll interval
+                self.errors += 1
+            
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+    
+    def stats(self) -> dict:
+        return {
+            "workers": len(self._tasks),
+            "busy": self.busy,
+            "succeeded": self.outcomes[SUCCEEDED],
+            "retried": self.outcomes[QUEUED],
+            "dead": self.outcomes[DEAD],
+            "lease_lost": self.outcomes[RUNNING],
+            "errors": self.errors
+        }
+
+
+job_workers = JobWorkerPool(workers=settings.JOB_WORKERS, poll_interval=settings.JOB_POLL_INTERVAL_SECONDS)
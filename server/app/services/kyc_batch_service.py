@@ -0,0 +1,177 @@
+import asyncio
+import json
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.enums import ApplicationStatus, KYCStatus
+from app.models.kyc import KYCResult
+from app.models.loan_application import LoanApplication
+from app.services.application_service import application_cache
+from app.services.kyc_service import AsyncKYCService
+from app.services.workflow_service import change_status_many
+from app.utils.exceptions import ProviderRejectedException, ProviderUnavailableException
+
+
+def _item(application_id: int, outcome: str, message: str, **fields) -> dict:
+    return {"application_id": application_id, "outcome": outcome, "message": message, **fields}
+
+
+def _fields(application: LoanApplication) -> dict:
+    """
+    The columns the batch needs, as plain values. The cleanup after a failed
+    chunk rolls back, which expires the loaded LoanApplications, and reading
+    an expired attribute is an implicit query that an AsyncSession cannot run.
+    """
+    return {"id": application.id, "full_name": application.full_name, "pan": application.pan}
+
+
+async def _call_provider(kyc_service: AsyncKYCService, semaphore: asyncio.Semaphore, application: dict) -> dict:
+    """Run one KYC call under the fan-out limit; provider errors are returned, not raised"""
+    async with semaphore:
+        try:
+            return await kyc_service.perform_kyc(name=application["full_name"], pan=application["pan"])
+        except (ProviderUnavailableException, ProviderRejectedException) as exc:
+            return {"error": exc.message}
+
+
+async def _persist_chunk(db: AsyncSession, kyc_service: AsyncKYCService, chunk: list, items: dict) -> None:
+    """Write the KYC results and status updates for one chunk, then commit"""
+    rows = []
+    targets = {}
+    
+    for application, kyc_result in chunk:
+        if "error" in kyc_result:
+            # Back to DRAFT so the application can be picked up again
+            targets[application["id"]] = ApplicationStatus.DRAFT
+            items[application["id"]] = _item(application["id"], "PROVIDER_ERROR", kyc_result["error"])
+            continue
+        
+        try:
+            kyc_passed = kyc_service.is_passed(kyc_result)
+            kyc_status = KYCStatus.PASSED if kyc_passed else KYCStatus.FAILED
+            row = {
+                "loan_application_id": application["id"],
+                "name_match_score": kyc_result["nameMatchScore"],
+                "status": kyc_status.value,
+                "pan_verified": kyc_result.get("panVerified", "NO"),
+                "address_verified": kyc_result.get("addressVerified", "NO"),
+                "raw_response": json.dumps(kyc_result)
+            }
+        except (KeyError, TypeError, ValueError) as exc:
+            # A malformed answer only fails its own application
+            targets[application["id"]] = ApplicationStatus.DRAFT
+            items[application["id"]] = _item(application["id"], "PROVIDER_ERROR", f"Invalid KYC response: {exc}")
+            continue
+        
+        target = ApplicationStatus.KYC_COMPLETED if kyc_passed else ApplicationStatus.NOT_ELIGIBLE
+        rows.append(row)
+        targets[application["id"]] = target
+        items[application["id"]] = _item(
+            application["id"],
+            target.value,
+            "KYC verification passed." if kyc_passed else (
+                f"KYC verification failed. Name match score: {kyc_result['nameMatchScore']}. Minimum required: 80."
+            ),
+            kyc_status=kyc_status,
+            name_match_score=kyc_result["nameMatchScore"],
+            application_status=target.value
+        )
+    
+    if rows:
+        await db.execute(insert(KYCResult), rows)
+    await change_status_many(db, ApplicationStatus.KYC_PENDING, targets)
+    await db.commit()
+    
+    for application_id in targets:
+        application_cache.invalidate(application_id)
+
+
+async def run_kyc_batch(db: AsyncSession, kyc_service: AsyncKYCService, application_ids: list) -> list:
+    """
+    Perform KYC for many DRAFT applications.
+    
+    1. Load every application in one query, keep the columns needed later
+       as plain values and claim the DRAFT ones with a single
+       DRAFT -> KYC_PENDING update (then commit, releasing the
+       connection while the provider is called)
+    2. Call the provider concurrently, at most KYC_BATCH_CONCURRENCY at a time
+    3. Per KYC_BATCH_CHUNK_SIZE applications, insert the KYCResult rows in
+       one statement and set the statuses in one UPDATE
+    
+    Args:
+        db: The async session to use
+        kyc_service: The async KYC service
+        application_ids: Applications to verify (duplicates are ignored)
+    
+    Returns:
+        One outcome dict per application, in request order
+    """
+    application_ids = list(dict.fromkeys(application_ids))
+    items = {}
+    
+    result = await db.execute(
+        select(LoanApplication).where(LoanApplication.id.in_(application_ids))
+    )
+    applications = {application.id: application for application in result.scalars().all()}
+    
+    drafts = []
+    for application_id in application_ids:
+        application = applications.get(application_id)
+        if application is None:
+            items[application_id] = _item(
+                application_id, "NOT_FOUND", f"Loan application with ID {application_id} not found"
+            )
+        elif application.status != ApplicationStatus.DRAFT.value:
+            items[application_id] = _item(
+                application_id,
+                "SKIPPED",
+                f"Invalid workflow state. Expected 'DRAFT', but current status is '{application.status}'",
+                application_status=application.status
+            )
+        else:
+            drafts.append(_fields(application))
+    
+    claimed = set(await change_status_many(
+        db,
+        ApplicationStatus.DRAFT,
+        {application["id"]: ApplicationStatus.KYC_PENDING for application in drafts}
+    ))
+    await db.commit()
+    
+    pending = []
+    for application in drafts:
+        if application["id"] in claimed:
+            application_cache.invalidate(application["id"])
+            pending.append(application)
+        else:
+            # Another request moved it out of DRAFT after it was loaded
+            items[application["id"]] = _item(
+                application["id"], "SKIPPED", "Application is no longer in DRAFT status"
+            )
+    
+    semaphore = asyncio.Semaphore(settings.KYC_BATCH_CONCURRENCY)
+    chunk_size = settings.KYC_BATCH_CHUNK_SIZE
+    
+    persisted = 0
+    try:
+        for start in range(0, len(pending), chunk_size):
+            chunk = pending[start:start + chunk_size]
+            kyc_results = await asyncio.gather(
+                *(_call_provider(kyc_service, semaphore, application) for application in chunk)
+            )
+            await _persist_chunk(db, kyc_service, list(zip(chunk, kyc_results)), items)
+            persisted += len(chunk)
+    except BaseException:
+        # Don't leave the unprocessed applications stuck in KYC_PENDING
+        await db.rollback()
+        await change_status_many(
+            db,
+            ApplicationStatus.KYC_PENDING,
+            {application["id"]: ApplicationStatus.DRAFT for application in pending[persisted:]}
+        )
+        await db.commit()
+        raise
+    
+    return [items[application_id] for application_id in application_ids]
@@ -1,7 +1,10 @@
 import random
 import json
 from abc import ABC, abstractmethod
+from typing import Optional
+from app.core.config import settings
 from app.core.enums import KYCStatus, BusinessRules
+from app.services.http_client import ProviderHttpClient, provider_http_client
 
 
 class KYCService(ABC):
@@ -128,6 +131,89 @@ class MockKYCService(KYCService):
             return "Poor match. Verification failed."
 
 
+class AsyncKYCService(ABC):
+    """Abstract base class for async KYC services (used by the request path)"""
+    
+    @abstractmethod
+    async def perform_kyc(self, name: str, pan: str = None) -> dict:
+        """
+        Perform KYC verification.
+        
+        Args:
+            name: The name of the applicant
+            pan: The PAN number of the applicant
+            
+        Returns:
+            Dictionary containing KYC results (same shape as MockKYCService)
+        """
+        pass
+    
+    def get_kyc_status(self, result: dict) -> KYCStatus:
+        """Get KYC status from result"""
+        status_str = result.get("status", "PENDING")
+        return KYCStatus(status_str)
+    
+    def is_passed(self, result: dict) -> bool:
+        """Check if KYC passed"""
+        return self.get_kyc_status(result) == KYCStatus.PASSED
+
+
+class SyncKYCServiceAdapter(AsyncKYCService):
+    """
+    Expose a sync KYCService through the async interface.
+    
+    The call runs inline, so only wrap implementations that don't block
+    (such as MockKYCService).
+    """
+    
+    def __init__(self, service: KYCService):
+        self.service = service
+    
+    async def perform_kyc(self, name: str, pan: str = None) -> dict:
+        return self.service.perform_kyc(name=name, pan=pan)
+    
+    def get_kyc_status(self, result: dict) -> KYCStatus:
+        return self.service.get_kyc_status(result)
+
+
+class HttpKYCService(AsyncKYCService):
+    """
+    KYC provider reached over HTTP.
+    
+    Contract: POST {base_url}/kyc with {"name", "pan"} returns the same
+    fields as MockKYCService (nameMatchScore, status, panVerified, ...).
+    If the provider omits "status", it is derived from nameMatchScore.
+    """
+    
+    def __init__(
+        self,
+        base_url: str,
+        http_client: ProviderHttpClient,
+        api_key: Optional[str] = None,
+        timeout: Optional[float] = None
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.http_client = http_client
+        self.headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+        self.timeout = timeout
+        self.min_passing_score = BusinessRules.MIN_KYC_SCORE
+    
+    async def perform_kyc(self, name: str, pan: str = None) -> dict:
+        result = await self.http_client.request(
+            "KYC",
+            "POST",
+            f"{self.base_url}/kyc",
+            json={"name": name, "pan": pan},
+            headers=self.headers,
+            timeout=self.timeout,
+            required_keys=("nameMatchScore",)
+        )
+        if "status" not in result:
+            passed = result.get("nameMatchScore", 0) >= self.min_passing_score
+            result["status"] = (KYCStatus.PASSED if passed else KYCStatus.FAILED).value
+        return result
+
+
 # Factory function to get KYC service
 def get_kyc_service() -> KYCService:
     """
@@ -135,3 +221,34 @@ def get_kyc_service() -> KYCService:
     Can be extended to return different implementations based on config.
     """
     return MockKYCService()
+
+
+_async_kyc_service: Optional[AsyncKYCService] = None
+
+
+def build_async_kyc_service() -> AsyncKYCService:
+    """Build the async KYC service selected by KYC_PROVIDER ("mock" or "http")"""
+    if settings.KYC_PROVIDER == "http":
+        if not settings.KYC_PROVIDER_URL:
+            raise ValueError("KYC_PROVIDER_URL must be set when KYC_PROVIDER=http")
+        return HttpKYCService(
+            base_url=settings.KYC_PROVIDER_URL,
+            http_client=provider_http_client,
+            api_key=settings.PROVIDER_API_KEY
+        )
+    return SyncKYCServiceAdapter(MockKYCService())
+
+
+def get_async_kyc_service() -> AsyncKYCService:
+    """
+    Factory function to get the (shared) async KYC service,
+    wrapped in single-flight coalescing when SINGLE_FLIGHT_ENABLED.
+    """
+    global _async_kyc_service
+    if _async_kyc_service is None:
+        service = build_async_kyc_service()
+        if settings.SINGLE_FLIGHT_ENABLED:
+            from app.services.single_flight import SingleFlightKYCService
+            service = SingleFlightKYCService(service)
+        _async_kyc_service = service
+    return _async_kyc_service
@@ -0,0 +1,141 @@
+import json
+from typing import Optional
+
+import numpy as np
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.enums import EmploymentType
+from app.services.eligibility_service import round_currency
+from app.services.pricing_service import get_pricing_grid
+
+
+DEFAULT_OFFER_TENURES = (12, 24, 36, 48, 60, 72, 84)
+DEFAULT_AMOUNT_STEPS = 10
+
+offer_cache = TTLCache(maxsize=settings.OFFER_CACHE_MAX_ENTRIES, ttl=settings.OFFER_CACHE_TTL_SECONDS)
+
+
+def _amount_steps(cap: float, steps: int) -> np.ndarray:
+    """`steps` evenly spaced amounts up to the cap, rounded down to OFFER_AMOUNT_ROUNDING when the cap allows"""
+    unit = settings.OFFER_AMOUNT_ROUNDING if cap >= settings.OFFER_AMOUNT_ROUNDING * steps else 1
+    amounts = np.floor(cap * np.arange(1, steps + 1) / steps / unit) * unit
+    return np.unique(amounts[amounts > 0])
+
+
+def compute_offer_grid(
+    monthly_income: float,
+    employment_type,
+    credit_score: Optional[int] = None,
+    tenures: Optional[list] = None,
+    amounts: Optional[list] = None,
+    amount_steps: int = DEFAULT_AMOUNT_STEPS
+) -> dict:
+    """
+    Compute every (amount, tenure) offer in one pass.
+    
+    The rate comes from the pricing grid for the applicant's band, and the
+    EMI factors of the grid tenures are already precomputed there, so the
+    whole grid is one outer product plus rounding. The eligible caps and
+    EMIs use the same arithmetic as calculate_eligibility, and the total
+    interest the same as calculate_total_interest, so they agree to the paisa.
+    
+    Args:
+        monthly_income: Monthly income of the applicant
+        employment_type: SALARIED or SELF_EMPLOYED
+        credit_score: Credit score (None = base terms)
+        tenures: Tenures in months (default 12-84 in steps of 12)
+        amounts: Loan amounts (default: amount_steps amounts up to the
+            highest eligible amount among the band's allowed tenures)
+        amount_steps: Number of default amounts
+    
+    Returns:
+        JSON-ready dictionary with the terms, the eligible amount per tenure
+        and emi / total_interest / affordable matrices (one row per amount,
+        one column per tenure; a column whose tenure is not allowed for the
+        band is never affordable)
+    """
+    grid = get_pricing_grid()
+    terms = grid.terms(credit_score, employment_type)
+    employment = getattr(employment_type, "value", employment_type)
+    rate = terms["rate"]
+    
+    emi_multiplier = 0.5 if employment == EmploymentType.SALARIED.value else 0.4
+    max_emi = monthly_income * emi_multiplier
+    
+    tenures = sorted(set(tenures)) if tenures else list(DEFAULT_OFFER_TENURES)
+    factors = np.array([grid.get_factors(rate, tenure) for tenure in tenures])
+    tenure_array = np.array(tenures, dtype=np.int64)
+    allowed_tenures = set(terms["tenures"])
+    allowed = [tenure in allowed_tenures for tenure in tenures]
+    
+    # Same arithmetic as calculate_eligibility: round(max_emi × pv_factor, 2)
+    eligible_amounts = round_currency(max_emi * factors[:, 0])
+    
+    if amounts:
+        amount_array = np.array(sorted(set(amounts)), dtype=np.float64)
+    else:
+        caps = eligible_amounts[np.array(allowed)] if any(allowed) else eligible_amounts
+        amount_array = _amount_steps(float(caps.max()), amount_steps)
+    
+    # EMI = round(amount × emi_factor, 2); total interest as calculate_total_interest
+    emi = round_currency(amount_array[:, None] * factors[None, :, 1])
+    total_interest = round_currency(emi * tenure_array[None, :] - amount_array[:, None])
+    # A tenure outside the band's allowed tenures is never on offer, whatever the amount
+    affordable = (
+        (emi <= max_emi)
+        & (amount_array[:, None] <= eligible_amounts[None, :])
+        & np.array(allowed)[None, :]
+    )
+    
+    return {
+        "monthly_income": monthly_income,
+        "employment_type": employment,
+        "score_band": terms["band"],
+        "interest_rate": round(rate, 4),
+        "pricing_version": grid.version,
+        "max_emi": round(max_emi, 2),
+        "tenures": tenures,
+        "tenure_allowed": allowed,
+        "eligible_amounts": eligible_amounts.tolist(),
+        "amounts": amount_array.tolist(),
+        "emi": emi.tolist(),
+        "total_interest": total_interest.tolist(),
+        "affordable": affordable.tolist()
+    }
+
+
+def get_offer_grid(
+    monthly_income: float,
+    employment_type,
+    credit_score: Optional[int] = None,
+    tenures: Optional[list] = None,
+    amounts: Optional[list] = None,
+    amount_steps: int = DEFAULT_AMOUNT_STEPS
+) -> bytes:
+    """
+    The offer grid as encoded JSON, cached per (income, employment type,
+    score band, grid version) and requested tenures / amounts.
+    
+    Offers only depend on the band, not the exact score, so every applicant
+    in a band with the same income shares one entry.
+    """
+    grid = get_pricing_grid()
+    employment = getattr(employment_type, "value", employment_type)
+    band = grid.terms(credit_score, employment)["band"]
+    key = (
+        float(monthly_income),
+        employment,
+        band,
+        grid.version,
+        tuple(sorted(set(tenures))) if tenures else None,
+        tuple(sorted(set(amounts))) if amounts else None,
+        None if amounts else amount_steps
+    )
+    
+    body = offer_cache.get(key)
+    if body is None:
+        offers = compute_offer_grid(monthly_income, employment, credit_score, tenures, amounts, amount_steps)
+        body = json.dumps(offers, separators=(",", ":")).encode("utf-8")
+        offer_cache.set(key, body)
+    return body
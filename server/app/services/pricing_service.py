@@ -0,0 +1,277 @@
+import json
+import os
+import threading
+import time
+from typing import Optional
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.enums import EmploymentType
+
+
+# Credit rating bands, highest first: (minimum score, band)
+CREDIT_RATING_BANDS = [
+    (750, "EXCELLENT"),
+    (700, "GOOD"),
+    (650, "FAIR"),
+    (600, "POOR"),
+]
+LOWEST_BAND = "VERY_POOR"
+BAND_NAMES = [band for _, band in CREDIT_RATING_BANDS] + [LOWEST_BAND]
+
+EMPLOYMENT_TYPES = [EmploymentType.SELF_EMPLOYED.value, EmploymentType.SALARIED.value]
+
+# Built-in grid, used unless PRICING_GRID_FILE is set. "base" applies when
+# there is no credit score (the previous flat 12% / 36 months).
+DEFAULT_PRICING_GRID = {
+    "version": "default-v1",
+    "base": {"rate": 0.12, "tenure_months": 36},
+    "bands": {
+        "EXCELLENT": {
+            "SALARIED": {"rate": 0.105, "tenure_months": 36, "tenures": [12, 24, 36, 48, 60, 72, 84]},
+            "SELF_EMPLOYED": {"rate": 0.115, "tenure_months": 36, "tenures": [12, 24, 36, 48, 60]}
+        },
+        "GOOD": {
+            "SALARIED": {"rate": 0.12, "tenure_months": 36, "tenures": [12, 24, 36, 48, 60]},
+            "SELF_EMPLOYED": {"rate": 0.13, "tenure_months": 36, "tenures": [12, 24, 36, 48, 60]}
+        },
+        "FAIR": {
+            "SALARIED": {"rate": 0.14, "tenure_months": 36, "tenures": [12, 24, 36]},
+            "SELF_EMPLOYED": {"rate": 0.155, "tenure_months": 24, "tenures": [12, 24, 36]}
+        },
+        "POOR": {
+            "SALARIED": {"rate": 0.18, "tenure_months": 24, "tenures": [12, 24]},
+            "SELF_EMPLOYED": {"rate": 0.2, "tenure_months": 12, "tenures": [12, 24]}
+        },
+        "VERY_POOR": {
+            "SALARIED": {"rate": 0.22, "tenure_months": 12, "tenures": [12]},
+            "SELF_EMPLOYED": {"rate": 0.24, "tenure_months": 12, "tenures": [12]}
+        }
+    }
+}
+
+
+def credit_rating(score: int) -> str:
+    """Credit rating band for a score (EXCELLENT, GOOD, FAIR, POOR or VERY_POOR)"""
+    for minimum, band in CREDIT_RATING_BANDS:
+        if score >= minimum:
+            return band
+    return LOWEST_BAND
+
+
+def annuity_factors(annual_rate: float, tenure_months: int) -> tuple:
+    """
+    Present-value and EMI factors for a rate and tenure.
+    
+    eligible amount = max EMI × pv_factor, EMI = loan amount × emi_factor
+    
+    Returns:
+        (pv_factor, emi_factor)
+    """
+    monthly_rate = annual_rate / 12
+    n = tenure_months
+    if monthly_rate > 0:
+        growth = (1 + monthly_rate) ** n
+        return (growth - 1) / (monthly_rate * growth), monthly_rate * growth / (growth - 1)
+    return float(n), 1 / n
+
+
+def _check_terms(where: str, terms: dict, with_tenures: bool) -> None:
+    rate = terms.get("rate")
+    tenure = terms.get("tenure_months")
+    if not isinstance(rate, (int, float)) or not 0 <= rate <= 1:
+        raise ValueError(f"{where}: rate must be a number between 0 and 1")
+    if not isinstance(tenure, int) or tenure < 1:
+        raise ValueError(f"{where}: tenure_months must be a positive integer")
+    if with_tenures:
+        tenures = terms.get("tenures")
+        if not tenures or not all(isinstance(value, int) and value >= 1 for value in tenures):
+            raise ValueError(f"{where}: tenures must be a non-empty list of positive integers")
+        if tenure not in tenures:
+            raise ValueError(f"{where}: tenure_months must be one of tenures")
+
+
+class PricingGrid:
+    """
+    Rate and tenures by credit-score band and employment type, with the
+    annuity factors of every (rate, tenure) in the grid computed up front.
+    
+    Eligibility then takes a dictionary lookup and a multiply; the NumPy
+    tables serve calculate_eligibility_vectorized the same values.
+    """
+    
+    def __init__(self, config: dict):
+        version = config.get("version")
+        if not version:
+            raise ValueError("Pricing grid: version is required")
+        _check_terms("Pricing grid base", config.get("base") or {}, with_tenures=False)
+        
+        self.version = str(version)
+        self.factors = {}
+        base = config["base"]
+        self.base = self._terms(None, base["rate"], base["tenure_months"], [base["tenure_months"]])
+        
+        self.cells = {}
+        bands = config.get("bands") or {}
+        for band in BAND_NAMES:
+            for employment in EMPLOYMENT_TYPES:
+                terms = (bands.get(band) or {}).get(employment)
+                if terms is None:
+                    raise ValueError(f"Pricing grid: missing terms for {band} / {employment}")
+                _check_terms(f"Pricing grid {band} / {employment}", terms, with_tenures=True)
+                self.cells[(band, employment)] = self._terms(
+                    band, terms["rate"], terms["tenure_months"], terms["tenures"]
+                )
+        
+        # Lookup tables: rows are bands from lowest to highest, then "no score";
+        # columns follow EMPLOYMENT_TYPES
+        rows = list(reversed(BAND_NAMES))
+        table = [[self.cells[(band, employment)] for employment in EMPLOYMENT_TYPES] for band in rows]
+        table.append([self.base, self.base])
+        self.thresholds = np.array(sorted(minimum for minimum, _ in CREDIT_RATING_BANDS), dtype=np.float64)
+        self.band_table = np.array(rows + [""], dtype=object)
+        self.rate_table = np.array([[cell["rate"] for cell in row] for row in table])
+        self.tenure_table = np.array([[cell["tenure_months"] for cell in row] for row in table], dtype=np.int64)
+        self.pv_table = np.array([[cell["pv_factor"] for cell in row] for row in table])
+        self.emi_table = np.array([[cell["emi_factor"] for cell in row] for row in table])
+    
+    def _terms(self, band: Optional[str], rate: float, tenure_months: int, tenures: list) -> dict:
+        rate = float(rate)
+        for tenure in tenures:
+            self.factors[(rate, tenure)] = annuity_factors(rate, tenure)
+        pv_factor, emi_factor = self.factors[(rate, tenure_months)]
+        return {
+            "band": band,
+            "rate": rate,
+            "tenure_months": tenure_months,
+            "tenures": sorted(tenures),
+            "pv_factor": pv_factor,
+            "emi_factor": emi_factor
+        }
+    
+    def terms(self, credit_score: Optional[int], employment_type) -> dict:
+        """Pricing terms for a credit score (None = base terms) and employment type"""
+        if credit_score is None:
+            return self.base
+        employment = getattr(employment_type, "value", employment_type)
+        if employment != EmploymentType.SALARIED.value:
+            employment = EmploymentType.SELF_EMPLOYED.value
+        return self.cells[(credit_rating(credit_score), employment)]
+    
+    def get_factors(self, annual_rate: float, tenure_months: int) -> tuple:
+        """(pv_factor, emi_factor), from the precomputed table when the pair is in the grid"""
+        factors = self.factors.get((annual_rate, tenure_months))
+        if factors is None:
+            factors = annuity_factors(annual_rate, tenure_months)
+        return factors
+    
+    def lookup(self, credit_score: np.ndarray, salaried: np.ndarray) -> tuple:
+        """
+        Vectorized terms lookup.
+        
+        Args:
+            credit_score: Scores as floats (NaN = no score)
+            salaried: Boolean array
+        
+        Returns:
+            (band, rate, tenure_months, pv_factor, emi_factor) arrays
+        """
+        row = np.searchsorted(self.thresholds, credit_score, side="right")
+        row = np.where(np.isnan(credit_score), len(self.band_table) - 1, row)
+        column = salaried.astype(np.int64)
+        return (
+            self.band_table[row],
+            self.rate_table[row, column],
+            self.tenure_table[row, column],
+            self.pv_table[row, column],
+            self.emi_table[row, column]
+        )
+
+
+class PricingGridLoader:
+    """
+    Holds the active pricing grid.
+    
+    With PRICING_GRID_FILE set, the file's modification time is checked at
+    most every PRICING_RELOAD_INTERVAL_SECONDS and the grid (with its
+    factor tables) is rebuilt when it changes. A file that fails to load
+    at startup is an error; on a later reload the previous grid stays
+    active and the error is reported in stats().
+    """
+    
+    def __init__(self, path: Optional[str], reload_interval: float):
+        self.path = path
+        self.reload_interval = reload_interval
+        self._lock = threading.Lock()
+        self._grid = None
+        self._mtime = None
+        self._checked_at = 0.0
+        self.reloads = 0
+        self.last_error = None
+    
+    def _read(self) -> PricingGrid:
+        with open(self.path, encoding="utf-8") as handle:
+            config = json.load(handle)
+        try:
+            return PricingGrid(config)
+        except (AttributeError, KeyError, TypeError) as exc:
+            raise ValueError(f"Pricing grid: invalid structure ({exc})") from exc
+    
+    def _load(self) -> None:
+        if not self.path:
+            self._grid = PricingGrid(DEFAULT_PRICING_GRID)
+            return
+        
+        mtime = os.stat(self.path).st_mtime
+        if self._grid is None:
+            self._grid = self._read()
+        else:
+            try:
+                self._grid = self._read()
+                self.last_error = None
+            except (OSError, ValueError) as exc:
+                self.last_error = f"{type(exc).__name__}: {exc}"
+                self._mtime = mtime
+                return
+            self.reloads += 1
+        self._mtime = mtime
+    
+    def get(self) -> PricingGrid:
+        """The active grid, reloaded first if the file has changed"""
+        grid = self._grid
+        if grid is not None and (
+            not self.path or time.monotonic() - self._checked_at < self.reload_interval
+        ):
+            return grid
+        
+        with self._lock:
+            if self._grid is None:
+                self._load()
+            elif self.path:
+                self._checked_at = time.monotonic()
+                try:
+                    changed = os.stat(self.path).st_mtime != self._mtime
+                except OSError as exc:
+                    self.last_error = f"{type(exc).__name__}: {exc}"
+                    changed = False
+                if changed:
+                    self._load()
+            return self._grid
+    
+    def stats(self) -> dict:
+        grid = self.get()
+        return {
+            "version": grid.version,
+            "source": self.path or "built-in",
+            "reloads": self.reloads,
+            "last_error": self.last_error
+        }
+
+
+pricing_grid_loader = PricingGridLoader(settings.PRICING_GRID_FILE, settings.PRICING_RELOAD_INTERVAL_SECONDS)
+
+
+def get_pricing_grid() -> PricingGrid:
+    """The active pricing grid"""
+    return pricing_grid_loader.get()
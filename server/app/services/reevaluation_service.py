@@ -0,0 +1,569 @@
+import asyncio
+import json
+import multiprocessing
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, read_session
+from app.core.enums import ApplicationStatus, BusinessRules, KYCStatus
+from app.models.credit import CreditResult, EligibilityResult
+from app.models.kyc import KYCResult
+from app.models.loan_application import LoanApplication
+from app.models.reevaluation import ReevaluationRun
+from app.services.application_service import application_cache
+from app.services.credit_bureau_service import CreditDecisionMixin
+from app.services.eligibility_service import calculate_eligibility_batch
+from app.services.pricing_service import get_pricing_grid
+from app.services.workflow_service import change_status_many
+from app.utils.exceptions import ConflictException, NotFoundException
+
+
+RUNNING = "RUNNING"
+COMPLETED = "COMPLETED"
+FAILED = "FAILED"
+
+# Only decided applications are re-evaluated; in-flight ones are left to the workflow
+TERMINAL_STATUSES = [ApplicationStatus.ELIGIBLE.value, ApplicationStatus.NOT_ELIGIBLE.value]
+
+# Everything a decision depends on, in one column-level SELECT per chunk
+CHUNK_COLUMNS = [
+    LoanApplication.id,
+    LoanApplication.status,
+    LoanApplication.employment_type,
+    LoanApplication.monthly_income,
+    LoanApplication.loan_amount,
+    KYCResult.id.label("kyc_id"),
+    KYCResult.name_match_score.label("kyc_score"),
+    KYCResult.status.label("kyc_status"),
+    CreditResult.id.label("credit_id"),
+    CreditResult.credit_score,
+    CreditResult.active_loans,
+    CreditResult.is_approved.label("credit_approved"),
+    CreditResult.rejection_reason.label("credit_rejection_reason"),
+    CreditResult.superseded_at.label("credit_superseded_at"),
+    EligibilityResult.id.label("eligibility_id"),
+    EligibilityResult.max_emi,
+    EligibilityResult.interest_rate,
+    EligibilityResult.tenure_months,
+    EligibilityResult.eligible_amount,
+    EligibilityResult.is_eligible,
+    EligibilityResult.rejection_reasons,
+    EligibilityResult.score_band,
+    EligibilityResult.superseded_at.label("eligibility_superseded_at"),
+]
+
+# Eligibility columns compared to decide whether a stored result changed
+# (pricing_version alone changing doesn't rewrite an otherwise identical result)
+ELIGIBILITY_FIELDS = [
+    "max_emi", "interest_rate", "tenure_months", "eligible_amount",
+    "is_eligible", "rejection_reasons", "score_band"
+]
+
+
+def current_rules() -> dict:
+    """The decision rules and pricing grid version a new run scores against"""
+    return {
+        "min_kyc_score": BusinessRules.MIN_KYC_SCORE,
+        "min_credit_score": BusinessRules.MIN_CREDIT_SCORE,
+        "max_active_loans": BusinessRules.MAX_ACTIVE_LOANS,
+        "pricing_version": get_pricing_grid().version
+    }
+
+
+class _CreditRules(CreditDecisionMixin):
+    """Credit approval rules with explicit thresholds"""
+    
+    def __init__(self, min_score: int, max_loans: int):
+        self.required_min_score = min_score
+        self.max_allowed_loans = max_loans
+
+
+def _decision(row: dict) -> dict:
+    return {
+        "id": row["id"],
+        "from_status": row["status"],
+        "status": row["status"],
+        "kyc": None,
+        "credit": None,
+        "eligibility": None,
+        "changes": {}
+    }
+
+
+def _change(decision: dict, field: str, before, after) -> None:
+    if before != after:
+        decision["changes"][field] = [before, after]
+
+
+def rescore_chunk(rows: list, rules: dict) -> list:
+    """
+    Re-score applications against the given rules (runs in a pool process).
+    
+    Applies the same decisions as the live workflow: KYC passes at
+    min_kyc_score, credit is approved by CreditDecisionMixin and eligibility
+    comes from calculate_eligibility_batch with the active pricing grid.
+    Applications that now pass KYC but never reached the credit bureau
+    can't be decided without a bureau call; they are only reported.
+    
+    Results are never deleted: a credit or eligibility result the new
+    decision no longer stands on is marked superseded, and a superseded
+    result the decision stands on again is restored.
+    
+    Args:
+        rows: Chunk rows (CHUNK_COLUMNS) as dictionaries
+        rules: Rules recorded on the run (see current_rules)
+    
+    Returns:
+        One decision per application whose outcome changed, with the rows to
+        write and the before / after values of every changed field
+    """
+    grid_version = get_pricing_grid().version
+    if grid_version != rules["pricing_version"]:
+        raise ValueError(
+            f"Pricing grid changed from {rules['pricing_version']} to {grid_version}; start a new run"
+        )
+    credit_rules = _CreditRules(rules["min_credit_score"], rules["max_active_loans"])
+    
+    decisions = []
+    approved = []
+    for row in rows:
+        if row["kyc_id"] is None:
+            continue
+        
+        decision = _decision(row)
+        credit_current = row["credit_id"] is not None and row["credit_superseded_at"] is None
+        eligibility_current = row["eligibility_id"] is not None and row["eligibility_superseded_at"] is None
+        kyc_passed = row["kyc_score"] >= rules["min_kyc_score"]
+        kyc_status = (KYCStatus.PASSED if kyc_passed else KYCStatus.FAILED).value
+        
+        if kyc_passed and row["credit_id"] is None:
+            if row["kyc_status"] != kyc_status:
+                decision["needs_credit_check"] = True
+                _change(decision, "kyc_status", row["kyc_status"], kyc_status)
+                decisions.append(decision)
+            continue
+        
+        if row["kyc_status"] != kyc_status:
+            decision["kyc"] = {"id": row["kyc_id"], "status": kyc_status}
+            _change(decision, "kyc_status", row["kyc_status"], kyc_status)
+        
+        if not kyc_passed:
+            # A KYC-failed application keeps its credit and eligibility results,
+            # superseded; a KYC retry runs the credit check again and replaces them
+            decision["status"] = ApplicationStatus.NOT_ELIGIBLE.value
+            if credit_current:
+                decision["credit"] = {"op": "supersede", "id": row["credit_id"]}
+                _change(decision, "credit_approved", row["credit_approved"], None)
+            if eligibility_current:
+                decision["eligibility"] = {"op": "supersede", "id": row["eligibility_id"]}
+                _change(decision, "is_eligible", row["is_eligible"], None)
+        else:
+            credit_result = {"credit_score": row["credit_score"], "active_loans": row["active_loans"]}
+            is_approved = credit_rules.is_approved(credit_result)
+            reasons = credit_rules.get_rejection_reasons(credit_result) if not is_approved else []
+            rejection_reason = "; ".join(reasons) if reasons else None
+            if (
+                not credit_current
+                or is_approved != row["credit_approved"]
+                or rejection_reason != row["credit_rejection_reason"]
+            ):
+                decision["credit"] = {
+                    "op": "update",
+                    "id": row["credit_id"],
+                    "is_approved": is_approved,
+                    "rejection_reason": rejection_reason,
+                    "superseded_at": None
+                }
+                previous = row if credit_current else {}
+                _change(decision, "credit_approved", previous.get("credit_approved"), is_approved)
+                _change(decision, "credit_rejection_reason", previous.get("credit_rejection_reason"), rejection_reason)
+            
+            if is_approved:
+                approved.append((row, decision, eligibility_current))
+                continue
+            
+            decision["status"] = ApplicationStatus.NOT_ELIGIBLE.value
+            if eligibility_current:
+                decision["eligibility"] = {"op": "supersede", "id": row["eligibility_id"]}
+                _change(decision, "is_eligible", row["is_eligible"], None)
+        
+        _change(decision, "status", decision["from_status"], decision["status"])
+        if decision["changes"]:
+            decisions.append(decision)
+    
+    eligibilities = calculate_eligibility_batch([
+        {
+            "monthly_income": row["monthly_income"],
+            "employment_type": row["employment_type"],
+            "loan_amount": row["loan_amount"],
+            "credit_score": row["credit_score"]
+        }
+        for row, _, _ in approved
+    ])
+    
+    for (row, decision, eligibility_current), eligibility in zip(approved, eligibilities):
+        values = {field: eligibility[field] for field in ELIGIBILITY_FIELDS}
+        if row["eligibility_id"] is None:
+            decision["eligibility"] = {
+                "op": "insert",
+                "loan_application_id": row["id"],
+                "pricing_version": eligibility["pricing_version"],
+                **values
+            }
+        elif not eligibility_current or any(row[field] != values[field] for field in ELIGIBILITY_FIELDS):
+            decision["eligibility"] = {
+                "op": "update",
+                "id": row["eligibility_id"],
+                "pricing_version": eligibility["pricing_version"],
+                "superseded_at": None,
+                **values
+            }
+        previous = row if eligibility_current else {}
+        for field in ("eligible_amount", "interest_rate", "tenure_months", "is_eligible"):
+            _change(decision, field, previous.get(field), values[field])
+        
+        decision["status"] = (
+            ApplicationStatus.ELIGIBLE if values["is_eligible"] else ApplicationStatus.NOT_ELIGIBLE
+        ).value
+        _change(decision, "status", decision["from_status"], decision["status"])
+        if decision["changes"]:
+            decisions.append(decision)
+    
+    return decisions
+
+
+def _empty_report() -> dict:
+    return {
+        "transitions": {},
+        "fields": {},
+        "needs_credit_check": 0,
+        "diffs": [],
+        "diffs_truncated": False
+    }
+
+
+def _add_to_report(report: dict, decisions: list, max_diffs: int) -> None:
+    """Count the transitions / changed fields of a chunk and keep the first max_diffs diffs"""
+    transitions = Counter(report["transitions"])
+    fields = Counter(report["fields"])
+    for decision in decisions:
+        if decision.get("needs_credit_check"):
+            report["needs_credit_check"] += 1
+        if decision["status"] != decision["from_status"]:
+            transitions[f"{decision['from_status']} -> {decision['status']}"] += 1
+        fields.update(decision["changes"].keys())
+        
+        if len(report["diffs"]) < max_diffs:
+            diff = {"application_id": decision["id"], **decision["changes"]}
+            if decision.get("needs_credit_check"):
+                diff["note"] = "KYC now passes; needs a credit check to be decided"
+            report["diffs"].append(diff)
+        else:
+            report["diffs_truncated"] = True
+    
+    report["transitions"] = dict(transitions)
+    report["fields"] = dict(fields)
+
+
+async def _read_chunk(after_id: int, size: int) -> list:
+    """The next `size` decided applications after `after_id` (keyset, id order)"""
+    query = (
+        select(*CHUNK_COLUMNS)
+        .outerjoin(KYCResult, KYCResult.loan_application_id == LoanApplication.id)
+        .outerjoin(CreditResult, CreditResult.loan_application_id == LoanApplication.id)
+        .outerjoin(EligibilityResult, EligibilityResult.loan_application_id == LoanApplication.id)
+        .where(LoanApplication.id > after_id, LoanApplication.status.in_(TERMINAL_STATUSES))
+        .order_by(LoanApplication.id)
+        .limit(size)
+    )
+    async with read_session() as db:
+        result = await db.execute(query)
+        return [dict(row._mapping) for row in result.all()]
+
+
+async def _score(pool: Optional[ProcessPoolExecutor], workers: int, rows: list, rules: dict) -> list:
+    """Score a chunk, split across the pool processes (in-process without a pool)"""
+    if pool is None:
+        return rescore_chunk(rows, rules)
+    
+    loop = asyncio.get_running_loop()
+    size = -(-len(rows) // workers)
+    parts = await asyncio.gather(*(
+        loop.run_in_executor(pool, rescore_chunk, rows[start:start + size], rules)
+        for start in range(0, len(rows), size)
+    ))
+    return [decision for part in parts for decision in part]
+
+
+async def _write_decisions(db: AsyncSession, decisions: list) -> list:
+    """
+    Apply a chunk's decisions (not committed).
+    
+    Each application is claimed with change_status_many from the status it
+    was read in, unchanged statuses included, so an application that moved
+    since it was read (e.g. a KYC retry) is left alone.
+    
+    Returns:
+        The decisions that were applied
+    """
+    by_status = defaultdict(dict)
+    for decision in decisions:
+        by_status[decision["from_status"]][decision["id"]] = decision["status"]
+    
+    claimed = set()
+    for from_status, targets in by_status.items():
+        claimed.update(await change_status_many(db, from_status, targets))
+    applied = [decision for decision in decisions if decision["id"] in claimed]
+    
+    kyc_rows = [decision["kyc"] for decision in applied if decision["kyc"]]
+    if kyc_rows:
+        await db.execute(update(KYCResult), kyc_rows)
+    
+    operations = defaultdict(list)
+    for decision in applied:
+        for model, change in ((CreditResult, decision["credit"]), (EligibilityResult, decision["eligibility"])):
+            if change:
+                row = {key: value for key, value in change.items() if key != "op"}
+                operations[(model, change["op"])].append(row)
+    
+    for (model, op), rows in operations.items():
+        if op == "supersede":
+            await db.execute(
+                update(model)
+                .where(model.id.in_([row["id"] for row in rows]))
+                .values(superseded_at=func.now())
+            )
+        elif op == "insert":
+            await db.execute(insert(model), rows)
+        else:
+            await db.execute(update(model), rows)
+    
+    return applied
+
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    # SQLite returns naive datetimes
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def is_stale(run: ReevaluationRun) -> bool:
+    """True for a RUNNING run that hasn't checkpointed for REEVALUATION_STALE_SECONDS"""
+    heartbeat = _as_utc(run.updated_at or run.started_at)
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=settings.REEVALUATION_STALE_SECONDS)
+    return run.status == RUNNING and heartbeat is not None and heartbeat < cutoff
+
+
+async def _live_run(db: AsyncSession, exclude_id: Optional[int] = None) -> Optional[ReevaluationRun]:
+    query = select(ReevaluationRun).where(ReevaluationRun.status == RUNNING)
+    if exclude_id is not None:
+        query = query.where(ReevaluationRun.id != exclude_id)
+    result = await db.execute(query)
+    return next((run for run in result.scalars().all() if not is_stale(run)), None)
+
+
+async def start_run(db: AsyncSession, dry_run: bool = False) -> ReevaluationRun:
+    """
+    Record a new run with the current rules.
+    
+    Raises:
+        ConflictException: Another run is in progress
+    """
+    live = await _live_run(db)
+    if live:
+        raise ConflictException(f"Re-evaluation run {live.id} is already in progress")
+    
+    run = ReevaluationRun(
+        status=RUNNING,
+        dry_run=dry_run,
+        rules=json.dumps(current_rules()),
+        report=json.dumps(_empty_report())
+    )
+    db.add(run)
+    await db.commit()
+    await db.refresh(run)
+    return run
+
+
+async def resume_run(db: AsyncSession, run_id: int) -> ReevaluationRun:
+    """
+    Mark a failed or stale run as running again; it continues from its checkpoint.
+    
+    Raises:
+        NotFoundException: No such run
+        ConflictException: The run is completed or still in progress, or
+            another run is in progress
+    """
+    run = await db.get(ReevaluationRun, run_id)
+    if run is None:
+        raise NotFoundException(f"Re-evaluation run {run_id} not found")
+    if run.status == COMPLETED:
+        raise ConflictException(f"Re-evaluation run {run_id} is already completed")
+    if run.status == RUNNING and not is_stale(run):
+        raise ConflictException(f"Re-evaluation run {run_id} is still in progress")
+    
+    live = await _live_run(db, exclude_id=run_id)
+    if live:
+        raise ConflictException(f"Re-evaluation run {live.id} is already in progress")
+    
+    run.status = RUNNING
+    run.error = None
+    run.updated_at = datetime.now(timezone.utc)
+    await db.commit()
+    await db.refresh(run)
+    return run
+
+
+async def _checkpoint(db: AsyncSession, run_id: int, **values) -> None:
+    await db.execute(update(ReevaluationRun).where(ReevaluationRun.id == run_id).values(**values))
+
+
+async def run_reevaluation(run_id: int, workers: Optional[int] = None) -> dict:
+    """
+    Re-score every decided application of a run, from its checkpoint on.
+    
+    Per chunk of REEVALUATION_CHUNK_SIZE applications (keyset order on id):
+    1. Read the applications and their results in one column-level query
+       (on a replica when one is configured)
+    2. Re-score them across REEVALUATION_WORKERS processes
+    3. Write the changed decisions in bulk and advance the checkpoint in
+       the same transaction (only the checkpoint and report in a dry run)
+    
+    After each chunk the job sleeps so reads and writes take at most
+    REEVALUATION_MAX_DB_DUTY of the wall time, keeping the primary
+    available for live traffic. A crash leaves the run RUNNING; once stale
+    it can be resumed and skips the chunks already committed.
+    
+    Args:
+        run_id: A run created by start_run (or resumed by resume_run)
+        workers: Scoring processes (default REEVALUATION_WORKERS, 0 = in-process)
+    
+    Returns:
+        The run snapshot (see run_snapshot)
+    """
+    async with AsyncSessionLocal() as db:
+        run = await db.get(ReevaluationRun, run_id)
+        if run is None:
+            raise NotFoundException(f"Re-evaluation run {run_id} not found")
+        rules = json.loads(run.rules)
+        report = json.loads(run.report) if run.report else _empty_report()
+        dry_run = run.dry_run
+        last_id, scanned, changed, chunks = run.last_application_id, run.scanned, run.changed, run.chunks
+    
+    workers = settings.REEVALUATION_WORKERS if workers is None else workers
+    chunk_size = settings.REEVALUATION_CHUNK_SIZE
+    duty = settings.REEVALUATION_MAX_DB_DUTY
+    pool = None
+    if workers > 0:
+        # spawn: never fork a process that already runs an event loop and threads
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    
+    try:
+        async with AsyncSessionLocal() as db:
+            while True:
+                started = time.perf_counter()
+                rows = await _read_chunk(last_id, chunk_size)
+                read_seconds = time.perf_counter() - started
+                if not rows:
+                    break
+                
+                started = time.perf_counter()
+                decisions = await _score(pool, workers, rows, rules)
+                score_seconds = time.perf_counter() - started
+                
+                started = time.perf_counter()
+                unresolved = [decision for decision in decisions if decision.get("needs_credit_check")]
+                applied = [decision for decision in decisions if not decision.get("needs_credit_check")]
+                if not dry_run:
+                    applied = await _write_decisions(db, applied)
+                _add_to_report(report, applied + unresolved, settings.REEVALUATION_MAX_DIFFS_REPORTED)
+                last_id = rows[-1]["id"]
+                scanned += len(rows)
+                changed += len(applied)
+                chunks += 1
+                await _checkpoint(
+                    db,
+                    run_id,
+                    last_application_id=last_id,
+                    scanned=scanned,
+                    changed=changed,
+                    chunks=chunks,
+                    report=json.dumps(report)
+                )
+                await db.commit()
+                write_seconds = time.perf_counter() - started
+                
+                if not dry_run:
+                    for decision in applied:
+                        application_cache.invalidate(decision["id"])
+                
+                if 0 < duty < 1:
+                    db_seconds = read_seconds + write_seconds
+                    await asyncio.sleep(max(0.0, db_seconds * (1 / duty - 1) - score_seconds))
+            
+            await _checkpoint(db, run_id, status=COMPLETED, finished_at=datetime.now(timezone.utc))
+            await db.commit()
+    except Exception as exc:
+        async with AsyncSessionLocal() as db:
+            await _checkpoint(
+                db,
+                run_id,
+                status=FAILED,
+                error=f"{type(exc).__name__}: {exc}"[:1000],
+                finished_at=datetime.now(timezone.utc)
+            )
+            await db.commit()
+        raise
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+    
+    async with AsyncSessionLocal() as db:
+        return run_snapshot(await db.get(ReevaluationRun, run_id))
+
+
+def run_snapshot(run: ReevaluationRun) -> dict:
+    """A run as a JSON-ready dictionary, with its rules and diff report"""
+    return {
+        "id": run.id,
+        "status": run.status,
+        "dry_run": run.dry_run,
+        "stale": is_stale(run),
+        "rules": json.loads(run.rules),
+        "last_application_id": run.last_application_id,
+        "scanned": run.scanned,
+        "changed": run.changed,
+        "chunks": run.chunks,
+        "error": run.error,
+        "report": json.loads(run.report) if run.report else None,
+        "started_at": run.started_at.isoformat() if run.started_at else None,
+        "updated_at": run.updated_at.isoformat() if run.updated_at else None,
+        "finished_at": run.finished_at.isoformat() if run.finished_at else None
+    }
+
+
+# Runs started from the API, kept referenced until they finish
+_background_runs = set()
+
+
+async def _run_in_background(run_id: int) -> None:
+    try:
+        await run_reevaluation(run_id)
+    except Exception:
+        # Already recorded on the run (status FAILED and its error)
+        pass
+
+
+def launch_run(run_id: int) -> None:
+    """Run a re-evaluation as a task of the current event loop"""
+    task = asyncio.create_task(_run_in_background(run_id))
+    _background_runs.add(task)
+    task.add_done_callback(_background_runs.discard)
@@ -0,0 +1,160 @@
+import csv
+import io
+import json
+from typing import Iterator, Optional
+
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.services.eligibility_service import amortization_columns, calculate_total_interest
+
+
+# Defaults of the stateless calculator (the built-in pricing grid's base terms)
+DEFAULT_ANNUAL_RATE = 0.12
+DEFAULT_TENURE_MONTHS = 36
+
+SCHEDULE_FIELDS = ["month", "emi", "principal", "interest", "balance"]
+
+schedule_cache = TTLCache(
+    maxsize=settings.SCHEDULE_CACHE_MAX_ENTRIES,
+    ttl=settings.SCHEDULE_CACHE_TTL_SECONDS
+)
+
+
+def get_schedule(principal: float, annual_rate: float, tenure_months: int) -> dict:
+    """
+    Return the amortization schedule, from the LRU cache when possible.
+    
+    Schedules only depend on (principal, rate, tenure), so entries never
+    need invalidating. The columns are stored as tuples: cached entries are
+    shared between requests and must not be modified.
+    
+    Args:
+        principal: Loan principal amount
+        annual_rate: Annual interest rate (e.g., 0.12 for 12%)
+        tenure_months: Loan tenure in months
+    
+    Returns:
+        Dictionary with the totals and the month, principal, interest and
+        balance columns
+    """
+    key = (float(principal), float(annual_rate), int(tenure_months))
+    schedule = schedule_cache.get(key)
+    if schedule is not None:
+        return schedule
+    
+    principal, annual_rate, tenure_months = key
+    columns = amortization_columns(principal, annual_rate, tenure_months)
+    emi = columns["emi"]
+    schedule = {
+        "principal": principal,
+        "annual_rate": annual_rate,
+        "tenure_months": tenure_months,
+        "emi": emi,
+        "total_interest": calculate_total_interest(principal, emi, tenure_months),
+        "total_payment": round(emi * tenure_months, 2),
+        "month": tuple(range(1, tenure_months + 1)),
+        "principal_component": tuple(columns["principal"]),
+        "interest_component": tuple(columns["interest"]),
+        "balance": tuple(columns["balance"])
+    }
+    schedule_cache.set(key, schedule)
+    return schedule
+
+
+def iter_schedule_rows(schedule: dict) -> Iterator[tuple]:
+    """(month, emi, principal, interest, balance) per month"""
+    emi = schedule["emi"]
+    for month, principal, interest, balance in zip(
+        schedule["month"],
+        schedule["principal_component"],
+        schedule["interest_component"],
+        schedule["balance"]
+    ):
+        yield month, emi, principal, interest, balance
+
+
+def _dumps(content) -> str:
+    # Same encoding as JSONResponse, so streamed and buffered bodies are identical
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":"))
+
+
+def schedule_summary(schedule: dict) -> dict:
+    """The schedule totals, without the monthly rows"""
+    return {
+        "principal": schedule["principal"],
+        "annual_rate": schedule["annual_rate"],
+        "tenure_months": schedule["tenure_months"],
+        "emi": schedule["emi"],
+        "total_interest": schedule["total_interest"],
+        "total_payment": schedule["total_payment"]
+    }
+
+
+def schedule_payload(schedule: dict) -> dict:
+    """The schedule in the AmortizationScheduleResponse shape"""
+    return {
+        **schedule_summary(schedule),
+        "schedule": [dict(zip(SCHEDULE_FIELDS, row)) for row in iter_schedule_rows(schedule)]
+    }
+
+
+def _chunks(rows: Iterator[tuple], size: int) -> Iterator[list]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def stream_schedule_json(schedule: dict, chunk_rows: int) -> Iterator[str]:
+    """Encode the schedule as JSON, chunk_rows months at a time"""
+    yield _dumps(schedule_summary(schedule))[:-1] + ',"schedule":['
+    
+    separator = ""
+    for chunk in _chunks(iter_schedule_rows(schedule), chunk_rows):
+        yield separator + ",".join(_dumps(dict(zip(SCHEDULE_FIELDS, row))) for row in chunk)
+        separator = ","
+    yield "]}"
+
+
+def stream_schedule_csv(schedule: dict, chunk_rows: int) -> Iterator[str]:
+    """Encode the schedule as CSV (one row per month), chunk_rows months at a time"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(SCHEDULE_FIELDS)
+    for chunk in _chunks(iter_schedule_rows(schedule), chunk_rows):
+        writer.writerows(chunk)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def schedule_response(schedule: dict, export_format: str, filename: Optional[str] = None):
+    """
+    Build the HTTP response for a schedule.
+    
+    CSV is always streamed. JSON is streamed for tenures of at least
+    SCHEDULE_STREAM_MIN_MONTHS and sent in one body otherwise; both give
+    the same bytes.
+    """
+    chunk_rows = settings.SCHEDULE_STREAM_CHUNK_ROWS
+    
+    if export_format == "csv":
+        filename = filename or "amortization_schedule.csv"
+        return StreamingResponse(
+            stream_schedule_csv(schedule, chunk_rows),
+            media_type="text/csv",
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+        )
+    
+    if schedule["tenure_months"] >= settings.SCHEDULE_STREAM_MIN_MONTHS:
+        return StreamingResponse(stream_schedule_json(schedule, chunk_rows), media_type="application/json")
+    
+    return JSONResponse(schedule_payload(schedule))
@@ -0,0 +1,221 @@
+import asyncio
+import copy
+import hashlib
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Optional
+
+from sqlalchemy import delete, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.core.config import settings
+from app.core.database import async_engine
+from app.models.single_flight import SingleFlightResult
+from app.services.bureau_cache import normalize_pan
+from app.services.credit_bureau_service import AsyncCreditBureauService
+from app.services.kyc_service import AsyncKYCService
+
+
+def advisory_lock_id(key: str) -> int:
+    """Map a key onto the signed 64-bit id space of pg_advisory_lock"""
+    digest = hashlib.sha256(key.encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big", signed=True)
+
+
+class AdvisoryLockCoordinator:
+    """
+    Coalesce calls across workers with Postgres advisory locks.
+    
+    The first worker to take the lock for a key makes the call and stores
+    the result in single_flight_results for SINGLE_FLIGHT_RESULT_TTL_SECONDS.
+    Workers that were blocked on the same lock then read that result
+    instead of calling again.
+    
+    The lock is session-level, so one pooled connection is held for the
+    duration of the call (at most one per key per worker, since callers in
+    the same worker are coalesced before reaching here).
+    """
+    
+    def __init__(self, bind=async_engine, ttl: float = None):
+        self.bind = bind
+        self.ttl = timedelta(seconds=settings.SINGLE_FLIGHT_RESULT_TTL_SECONDS if ttl is None else ttl)
+        self.calls = 0
+        self.reused = 0
+    
+    async def _load(self, conn, key: str):
+        stored = await conn.scalar(
+            select(SingleFlightResult.result).where(
+                SingleFlightResult.key == key,
+                SingleFlightResult.expires_at > datetime.now(timezone.utc)
+            )
+        )
+        await conn.commit()
+        return json.loads(stored) if stored is not None else None
+    
+    async def _store(self, conn, key: str, result) -> None:
+        now = datetime.now(timezone.utc)
+        statement = pg_insert(SingleFlightResult).values(
+            key=key,
+            result=json.dumps(result),
+            expires_at=now + self.ttl
+        )
+        await conn.execute(statement.on_conflict_do_update(
+            index_elements=[SingleFlightResult.key],
+            set_={"result": statement.excluded.result, "expires_at": statement.excluded.expires_at}
+        ))
+        await conn.execute(delete(SingleFlightResult).where(SingleFlightResult.expires_at <= now))
+        await conn.commit()
+    
+    async def run(self, key: str, fn: Callable[[], Awaitable]):
+        """Run `fn` under the advisory lock for `key`, reusing a stored result if there is one"""
+        lock_id = advisory_lock_id(key)
+        async with self.bind.connect() as conn:
+            await conn.execute(text("SELECT pg_advisory_lock(:id)"), {"id": lock_id})
+            await conn.commit()
+            try:
+                stored = await self._load(conn, key)
+                if stored is not None:
+                    self.reused += 1
+                    return stored
+                
+                self.calls += 1
+                result = await fn()
+                await self._store(conn, key, result)
+                return result
+            finally:
+                try:
+                    await conn.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": lock_id})
+                    await conn.commit()
+                except Exception:
+                    # Closing the connection is the only other way to release the lock
+                    await conn.invalidate()
+
+
+class SingleFlight:
+    """
+    Share one in-flight call among concurrent callers with the same key.
+    
+    The first caller for a key starts the call; callers arriving while it
+    runs await the same task and get a copy of its result (or its
+    exception). Nothing is cached once the call finishes.
+    
+    The call runs in its own task, so a caller that disconnects doesn't
+    cancel it for the others.
+    """
+    
+    def __init__(self, name: str, coordinator: Optional[AdvisoryLockCoordinator] = None):
+        self.name = name
+        self.coordinator = coordinator
+        self._calls = {}
+        self.executions = 0
+        self.shared = 0
+    
+    async def _execute(self, key: str, fn: Callable[[], Awaitable]):
+        if self.coordinator:
+            return await self.coordinator.run(f"{self.name}:{key}", fn)
+        return await fn()
+    
+    def _finish(self, key: str, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            # Mark the exception as retrieved even if every caller went away
+            task.exception()
+    
+    async def do(self, key: str, fn: Callable[[], Awaitable]):
+        """
+        Run `fn` for `key`, or join the call already in flight.
+        
+        Args:
+            key: Coalescing key (e.g. the PAN)
+            fn: Zero-argument coroutine function making the actual call
+        
+        Returns:
+            A copy of the call's result
+        """
+        task = self._calls.get(key)
+        if task is None:
+            self.executions += 1
+            task = asyncio.ensure_future(self._execute(key, fn))
+            self._calls[key] = task
+            task.add_done_callback(lambda finished: self._finish(key, finished))
+        else:
+            self.shared += 1
+        
+        result = await asyncio.shield(task)
+        return copy.deepcopy(result)
+    
+    def stats(self) -> dict:
+        requests = self.executions + self.shared
+        stats = {
+            "in_flight": len(self._calls),
+            "executions": self.executions,
+            "shared": self.shared,
+            "coalesce_rate": round(self.shared / requests, 4) if requests else 0.0
+        }
+        if self.coordinator:
+            stats["advisory_calls"] = self.coordinator.calls
+            stats["advisory_reused"] = self.coordinator.reused
+        return stats
+
+
+# One SingleFlight per provider (exposed for metrics)
+single_flights = {}
+
+
+def get_single_flight(name: str) -> SingleFlight:
+    """
+    Get the SingleFlight for a provider, creating it on first use.
+    
+    With SINGLE_FLIGHT_MODE=advisory calls are also coalesced across
+    workers, which needs a PostgreSQL database.
+    """
+    if name not in single_flights:
+        coordinator = None
+        if settings.SINGLE_FLIGHT_MODE == "advisory":
+            if async_engine.dialect.name != "postgresql":
+                raise ValueError("SINGLE_FLIGHT_MODE=advisory requires a PostgreSQL database")
+            coordinator = AdvisoryLockCoordinator()
+        single_flights[name] = SingleFlight(name, coordinator)
+    return single_flights[name]
+
+
+class SingleFlightKYCService(AsyncKYCService):
+    """Coalesce concurrent KYC calls for the same applicant name and PAN"""
+    
+    def __init__(self, service: AsyncKYCService, flight: SingleFlight = None):
+        self.service = service
+        self.flight = flight or get_single_flight("kyc")
+    
+    async def perform_kyc(self, name: str, pan: str = None) -> dict:
+        key = f"{normalize_pan(pan)}:{(name or '').strip().lower()}"
+        return await self.flight.do(key, lambda: self.service.perform_kyc(name=name, pan=pan))
+    
+    def get_kyc_status(self, result: dict):
+        return self.service.get_kyc_status(result)
+
+
+class SingleFlightCreditBureauService(AsyncCreditBureauService):
+    """
+    Coalesce concurrent bureau checks for the same PAN.
+    
+    Forced refreshes are coalesced separately, so they never join a call
+    that may be answered from cache.
+    """
+    
+    def __init__(self, service: AsyncCreditBureauService, flight: SingleFlight = None):
+        self.service = service
+        self.flight = flight or get_single_flight("credit")
+    
+    async def check_credit(self, pan: str, force_refresh: bool = False) -> dict:
+        key = f"{normalize_pan(pan)}:{'refresh' if force_refresh else 'any'}"
+        return await self.flight.do(
+            key,
+            lambda: self.service.check_credit(pan, force_refresh=force_refresh)
+        )
+    
+    def is_approved(self, result: dict) -> bool:
+        return self.service.is_approved(result)
+    
+    def get_rejection_reasons(self, result: dict) -> list:
+        return self.service.get_rejection_reasons(result)
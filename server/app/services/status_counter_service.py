@@ -0,0 +1,142 @@
+import random
+from sqlalchemy import select, func, delete, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.enums import ApplicationStatus
+from app.models.loan_application import LoanApplication
+from app.models.status_counter import ApplicationStatusCounter
+
+
+# Number of rows each status counter is spread across
+COUNTER_SHARDS = 8
+
+
+def _status_value(status) -> str:
+    return status.value if isinstance(status, ApplicationStatus) else status
+
+
+async def record_status_change(db: AsyncSession, from_status, to_status, count: int = 1) -> None:
+    """
+    Adjust the status counters for a transition (from_status=None for a new application).
+    
+    Runs inside the caller's transaction, so the counters commit (or roll back)
+    together with the status change itself.
+    
+    Args:
+        db: The session carrying the status change
+        from_status: Previous status, or None for a newly created application
+        to_status: New status
+        count: Number of applications making this transition (bulk updates)
+    """
+    from_value = _status_value(from_status) if from_status else None
+    to_value = _status_value(to_status)
+    
+    if from_value == to_value or count <= 0:
+        return
+    
+    deltas = [(to_value, random.randrange(COUNTER_SHARDS), count)]
+    if from_value:
+        deltas.append((from_value, random.randrange(COUNTER_SHARDS), -count))
+    
+    # Lock rows in a fixed order so concurrent transitions can't deadlock
+    for status, shard, amount in sorted(deltas):
+        await _increment(db, status, shard, amount)
+
+
+async def _increment(db: AsyncSession, status: str, shard: int, amount: int) -> None:
+    insert = pg_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+    stmt = insert(ApplicationStatusCounter).values(status=status, shard=shard, count=amount)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ApplicationStatusCounter.status, ApplicationStatusCounter.shard],
+        set_={"count": ApplicationStatusCounter.count + amount}
+    )
+    await db.execute(stmt)
+
+
+async def get_status_counts(db: AsyncSession) -> dict:
+    """
+    Read per-status application counts from the counter table.
+    
+    Returns:
+        Dictionary of status value -> count (every ApplicationStatus present)
+    """
+    result = await db.execute(
+        select(ApplicationStatusCounter.status, func.sum(ApplicationStatusCounter.count))
+        .group_by(ApplicationStatusCounter.status)
+    )
+    counts = {status.value: 0 for status in ApplicationStatus}
+    for status, count in result.all():
+        counts[status] = int(count or 0)
+    return counts
+
+
+async def reconcile_status_counters(db: AsyncSession) -> dict:
+    """
+    Rebuild the counters from a GROUP BY over loan_applications and report drift.
+    
+    On PostgreSQL the counter table is locked for the duration so in-flight
+    transitions finish first and new ones wait; the caller must commit.
+    
+    Returns:
+        Dictionary with per-status counter/actual/drift and the total absolute drift
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        await db.execute(text("LOCK TABLE application_status_counters IN EXCLUSIVE MODE"))
+    
+    counters = await get_status_counts(db)
+    
+    result = await db.execute(
+        select(LoanApplication.status, func.count()).group_by(LoanApplication.status)
+    )
+    actual = {status.value: 0 for status in ApplicationStatus}
+    for status, count in result.all():
+        actual[status] = count
+    
+    report = {}
+    for status in sorted(set(counters) | set(actual)):
+        report[status] = {
+            "counter": counters.get(status, 0),
+            "actual": actual.get(status, 0),
+            "drift": counters.get(status, 0) - actual.get(status, 0)
+        }
+    
+    await db.execute(delete(ApplicationStatusCounter))
+    db.add_all([
+        ApplicationStatusCounter(status=status, shard=0, count=count)
+        for status, count in actual.items()
+    ])
+    await db.flush()
+    
+    return {
+        "statuses": report,
+        "total_drift": sum(abs(row["drift"]) for row in report.values())
+    }
+
+
+async def seed_status_counters(db: AsyncSession) -> bool:
+    """
+    Build the counters from loan_applications when the counter table is empty,
+    i.e. on the first start against a database that predates it. Otherwise
+    get_status_counts would report 0 (and counts going negative as existing
+    applications move on) until someone reconciled by hand.
+    
+    The emptiness check is repeated under the reconcile lock on PostgreSQL,
+    so workers starting together seed only once; the caller must commit.
+    
+    Returns:
+        Whether the counters were seeded
+    """
+    if await _has_counters(db):
+        return False
+    if db.get_bind().dialect.name == "postgresql":
+        await db.execute(text("LOCK TABLE application_status_counters IN EXCLUSIVE MODE"))
+        if await _has_counters(db):
+            return False
+    await reconcile_status_counters(db)
+    return True
+
+
+async def _has_counters(db: AsyncSession) -> bool:
+    return await db.scalar(select(ApplicationStatusCounter.status).limit(1)) is not None
@@ -0,0 +1,205 @@
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+import numpy as np
+from sqlalchemy import extract, func, literal_column, select
+from sqlalchemy.dialects.postgresql import array
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.enums import ApplicationStatus
+from app.models.status_event import ApplicationStatusEvent
+from app.utils.exceptions import ValidationException
+
+
+# Percentiles reported for time-in-state
+PERCENTILES = (0.5, 0.95, 0.99)
+
+# States an application waits in (terminal states are never left)
+WAITING_STATUSES = [
+    ApplicationStatus.DRAFT.value,
+    ApplicationStatus.KYC_PENDING.value,
+    ApplicationStatus.KYC_COMPLETED.value,
+    ApplicationStatus.CREDIT_CHECK_PENDING.value,
+    ApplicationStatus.CREDIT_CHECK_COMPLETED.value
+]
+
+
+def _utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def analytics_window(since: Optional[datetime], until: Optional[datetime]) -> tuple:
+    """
+    Resolve the [since, until) window of an analytics query.
+    
+    Defaults to the last STATUS_ANALYTICS_DEFAULT_HOURS; naive datetimes
+    are taken as UTC. Windows longer than STATUS_ANALYTICS_MAX_HOURS are
+    rejected so a single request can't scan the whole log.
+    
+    Returns:
+        (since, until) as aware UTC datetimes
+    """
+    until = _utc(until) if until else datetime.now(timezone.utc)
+    since = _utc(since) if since else until - timedelta(hours=settings.STATUS_ANALYTICS_DEFAULT_HOURS)
+    if since >= until:
+        raise ValidationException("'since' must be before 'until'")
+    if until - since > timedelta(hours=settings.STATUS_ANALYTICS_MAX_HOURS):
+        raise ValidationException(f"The window can't be longer than {settings.STATUS_ANALYTICS_MAX_HOURS} hours")
+    return since, until
+
+
+def _status_values(statuses: Optional[list], default: list) -> list:
+    if not statuses:
+        return default
+    return [status.value if isinstance(status, ApplicationStatus) else status for status in statuses]
+
+
+def _is_postgresql(db: AsyncSession) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def _summary(status: str, count: int, mean: float, longest: float, percentiles: list) -> dict:
+    summary = {"status": status, "count": count, "mean_seconds": round(mean, 3)}
+    for fraction, value in zip(PERCENTILES, percentiles):
+        summary[f"p{round(fraction * 100)}_seconds"] = round(value, 3)
+    summary["max_seconds"] = round(longest, 3)
+    return summary
+
+
+async def time_in_state(db: AsyncSession, since: datetime, until: datetime, statuses: Optional[list] = None) -> list:
+    """
+    Time spent in each state by the applications that left it in [since, until).
+    
+    Each log row that leaves a state carries when that state was entered,
+    so this is one range scan of (from_status, occurred_at, entered_at)
+    per state - answered from the index alone. On PostgreSQL the
+    percentiles are computed by the database with percentile_cont; on other
+    databases the durations are fetched and summarised here.
+    
+    Args:
+        db: Async session (a read replica is fine)
+        since: Start of the window (inclusive)
+        until: End of the window (exclusive)
+        statuses: States to report (default: every non-terminal state)
+    
+    Returns:
+        One summary per state that was left in the window, in workflow order
+    """
+    E = ApplicationStatusEvent
+    statuses = _status_values(statuses, WAITING_STATUSES)
+    window = (
+        E.from_status.in_(statuses),
+        E.occurred_at >= since,
+        E.occurred_at < until,
+        E.entered_at.isnot(None)
+    )
+    
+    summaries = {}
+    if _is_postgresql(db):
+        seconds = extract("epoch", E.occurred_at - E.entered_at)
+        result = await db.execute(
+            select(
+                E.from_status,
+                func.count(),
+                func.avg(seconds),
+                func.max(seconds),
+                func.percentile_cont(array(PERCENTILES)).within_group(seconds)
+            )
+            .where(*window)
+            .group_by(E.from_status)
+        )
+        for status, count, mean, longest, percentiles in result.all():
+            summaries[status] = _summary(status, count, float(mean), float(longest), [float(value) for value in percentiles])
+    else:
+        result = await db.execute(select(E.from_status, E.occurred_at, E.entered_at).where(*window))
+        durations = {}
+        for status, occurred_at, entered_at in result.all():
+            durations.setdefault(status, []).append((occurred_at - entered_at).total_seconds())
+        for status, values in durations.items():
+            values = np.asarray(values)
+            summaries[status] = _summary(
+                status, len(values), float(values.mean()), float(values.max()),
+                [float(value) for value in np.quantile(values, PERCENTILES)]
+            )
+    
+    return [summaries[status] for status in statuses if status in summaries]
+
+
+async def throughput(db: AsyncSession, since: datetime, until: datetime, statuses: Optional[list] = None) -> dict:
+    """
+    Transitions into each state per hour (UTC) in [since, until).
+    
+    One range scan of (occurred_at, to_status), grouped by hour in the
+    database. Hours without any transition are left out.
+    
+    Args:
+        db: Async session (a read replica is fine)
+        since: Start of the window (inclusive)
+        until: End of the window (exclusive)
+        statuses: Target states to count (default: all)
+    
+    Returns:
+        Dictionary with per-hour counts and the totals for the window
+    """
+    E = ApplicationStatusEvent
+    # Literals rather than bound parameters, so GROUP BY matches the select list
+    if _is_postgresql(db):
+        hour = func.date_trunc(literal_column("'hour'"), func.timezone(literal_column("'UTC'"), E.occurred_at))
+    else:
+        hour = func.strftime(literal_column("'%Y-%m-%dT%H:00:00'"), E.occurred_at)
+    
+    stmt = (
+        select(hour.label("hour"), E.to_status, func.count())
+        .where(E.occurred_at >= since, E.occurred_at < until)
+        .group_by(hour, E.to_status)
+        .order_by(hour)
+    )
+    if statuses:
+        stmt = stmt.where(E.to_status.in_(_status_values(statuses, [])))
+    result = await db.execute(stmt)
+    
+    hours = {}
+    totals = {}
+    for bucket, status, count in result.all():
+        if isinstance(bucket, datetime):
+            bucket = bucket.replace(tzinfo=None).isoformat()
+        entry = hours.setdefault(bucket, {"hour": f"{bucket}+00:00", "total": 0, "counts": {}})
+        entry["counts"][status] = count
+        entry["total"] += count
+        totals[status] = totals.get(status, 0) + count
+    
+    return {
+        "since": since.isoformat(),
+        "until": until.isoformat(),
+        "hours": list(hours.values()),
+        "totals": totals
+    }
+
+
+async def status_history(db: AsyncSession, application_id: int) -> list:
+    """
+    An application's logged transitions, oldest first.
+    
+    Args:
+        db: Async session
+        application_id: The application
+    
+    Returns:
+        List of transitions with the time spent in the state they left
+    """
+    E = ApplicationStatusEvent
+    result = await db.execute(
+        select(E.from_status, E.to_status, E.occurred_at, E.entered_at)
+        .where(E.application_id == application_id)
+        .order_by(E.occurred_at, E.id)
+    )
+    return [
+        {
+            "from_status": row.from_status,
+            "to_status": row.to_status,
+            "occurred_at": row.occurred_at.isoformat(),
+            "seconds_in_previous": (row.occurred_at - row.entered_at).total_seconds() if row.entered_at else None
+        }
+        for row in result.all()
+    ]
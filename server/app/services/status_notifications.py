@@ -0,0 +1,130 @@
+import json
+import time
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy import event, func, insert, select, text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.status_event import ApplicationStatusEvent
+
+
+# Session.info key holding the transitions of the open transaction
+PENDING_EVENTS_KEY = "pending_status_events"
+
+# Called with each committed batch of events when there is no LISTEN/NOTIFY
+_local_listeners = []
+
+
+def add_local_listener(callback) -> None:
+    _local_listeners.append(callback)
+
+
+def remove_local_listener(callback) -> None:
+    if callback in _local_listeners:
+        _local_listeners.remove(callback)
+
+
+def new_event_id() -> str:
+    """Event ID: milliseconds since the epoch plus a random suffix"""
+    return f"{int(time.time() * 1000)}-{uuid.uuid4().hex[:8]}"
+
+
+def _value(status) -> str:
+    return status.value if hasattr(status, "value") else status
+
+
+def queue_status_events(db, transitions: list) -> None:
+    """
+    Buffer status transitions until the transaction commits.
+    
+    At commit they are appended to application_status_events in one
+    batched INSERT, in the same transaction as the status change. On
+    PostgreSQL they are also sent with pg_notify inside the transaction, so
+    listeners only ever see committed transitions; elsewhere they are handed
+    to the in-process listeners after the commit. A rollback drops them.
+    
+    Args:
+        db: The session (sync or async) running the transaction
+        transitions: (application ID, from status, to status) tuples
+    """
+    if not transitions:
+        return
+    at = datetime.now(timezone.utc).isoformat()
+    db.info.setdefault(PENDING_EVENTS_KEY, []).extend(
+        {
+            "id": new_event_id(),
+            "application_id": application_id,
+            "from": _value(from_status) if from_status else None,
+            "to": _value(to_status),
+            "at": at
+        }
+        for application_id, from_status, to_status in transitions
+    )
+
+
+def _is_postgresql(session: Session) -> bool:
+    return session.get_bind().dialect.name == "postgresql"
+
+
+def _announced(events: list) -> list:
+    """Events for the streams: creations are only logged, nobody can be following a new application yet"""
+    return [item for item in events if item["from"] is not None]
+
+
+def _write_status_log(session: Session, events: list) -> None:
+    """Append the transaction's events to the status log, with when each from_status was entered"""
+    entered = {}
+    previous = {item["application_id"] for item in events if item["from"] is not None}
+    if previous:
+        # One probe of (application_id, occurred_at) per application
+        result = session.execute(
+            select(ApplicationStatusEvent.application_id, func.max(ApplicationStatusEvent.occurred_at))
+            .where(ApplicationStatusEvent.application_id.in_(previous))
+            .group_by(ApplicationStatusEvent.application_id)
+        )
+        entered = dict(result.all())
+    
+    rows = []
+    for item in events:
+        occurred_at = datetime.fromisoformat(item["at"])
+        rows.append({
+            "application_id": item["application_id"],
+            "from_status": item["from"],
+            "to_status": item["to"],
+            "occurred_at": occurred_at,
+            "entered_at": entered.get(item["application_id"]) if item["from"] is not None else None
+        })
+        entered[item["application_id"]] = occurred_at
+    session.execute(insert(ApplicationStatusEvent), rows)
+
+
+@event.listens_for(Session, "before_commit")
+def _flush_before_commit(session: Session) -> None:
+    events = session.info.get(PENDING_EVENTS_KEY)
+    if not events:
+        return
+    _write_status_log(session, events)
+    payloads = [json.dumps(item) for item in _announced(events)]
+    if not payloads or not _is_postgresql(session):
+        return
+    # NOTIFY is transactional: delivered on commit, discarded on rollback
+    session.execute(
+        text("SELECT pg_notify(:channel, payload) FROM unnest(CAST(:payloads AS text[])) AS payload"),
+        {"channel": settings.SSE_NOTIFY_CHANNEL, "payloads": payloads}
+    )
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_after_commit(session: Session) -> None:
+    events = _announced(session.info.pop(PENDING_EVENTS_KEY, None) or [])
+    if not events or _is_postgresql(session):
+        return
+    for callback in list(_local_listeners):
+        callback(events)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session) -> None:
+    session.info.pop(PENDING_EVENTS_KEY, None)
@@ -0,0 +1,178 @@
+import json
+
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.enums import ApplicationStatus, KYCStatus
+from app.models.credit import CreditResult, EligibilityResult
+from app.models.kyc import KYCResult
+from app.services.credit_bureau_service import get_async_credit_bureau_service
+from app.services.eligibility_service import calculate_eligibility
+from app.services.kyc_service import get_async_kyc_service
+from app.services.workflow_service import change_status
+
+
+async def write_results(db: AsyncSession, model, rows: list) -> None:
+    """
+    Insert CreditResult / EligibilityResult rows (one per application).
+    
+    An application can already have a row only if a portfolio re-evaluation
+    superseded it (KYC now failed and the application went through KYC
+    again); that row is overwritten by the new result.
+    
+    Args:
+        db: The async session (not committed)
+        model: CreditResult or EligibilityResult
+        rows: Column values, the same keys in every row
+    """
+    insert = pg_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+    stmt = insert(model)
+    replaced = {key: stmt.excluded[key] for key in rows[0] if key != "loan_application_id"}
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[model.loan_application_id],
+        set_={**replaced, "created_at": func.now(), "updated_at": None, "superseded_at": None}
+    )
+    await db.execute(stmt, rows)
+
+
+async def complete_kyc(db: AsyncSession, application) -> dict:
+    """
+    Call the KYC provider for an application in KYC_PENDING and record the outcome.
+    
+    Used by POST /loan/{id}/kyc and by the job queue worker. The caller
+    commits; on ProviderUnavailableException or ProviderRejectedException
+    nothing has been written and the application is still in KYC_PENDING.
+    
+    Args:
+        db: The async session the application is attached to
+        application: The LoanApplication (status KYC_PENDING)
+    
+    Returns:
+        Dictionary in the KYCPerformResponse shape
+    """
+    kyc_service = get_async_kyc_service()
+    kyc_result = await kyc_service.perform_kyc(
+        name=application.full_name,
+        pan=application.pan
+    )
+    
+    # Determine KYC status
+    kyc_passed = kyc_service.is_passed(kyc_result)
+    kyc_status = KYCStatus.PASSED if kyc_passed else KYCStatus.FAILED
+    
+    # Store KYC result
+    db_kyc = KYCResult(
+        loan_application_id=application.id,
+        name_match_score=kyc_result["nameMatchScore"],
+        status=kyc_status.value,
+        pan_verified=kyc_result.get("panVerified", "NO"),
+        address_verified=kyc_result.get("addressVerified", "NO"),
+        raw_response=json.dumps(kyc_result)
+    )
+    db.add(db_kyc)
+    
+    # Update application status based on KYC result
+    if kyc_passed:
+        await change_status(db, application, ApplicationStatus.KYC_COMPLETED)
+        message = "KYC verification passed. You can proceed to credit check."
+    else:
+        await change_status(db, application, ApplicationStatus.NOT_ELIGIBLE)
+        message = f"KYC verification failed. Name match score: {kyc_result['nameMatchScore']}. Minimum required: 80."
+    
+    return {
+        "application_id": application.id,
+        "name_match_score": kyc_result["nameMatchScore"],
+        "kyc_status": kyc_status.value,
+        "application_status": application.status,
+        "message": message
+    }
+
+
+async def complete_credit_check(db: AsyncSession, application, force_refresh: bool = False) -> dict:
+    """
+    Call the credit bureau for an application in CREDIT_CHECK_PENDING, record
+    the outcome and calculate eligibility when approved.
+    
+    Used by POST /loan/{id}/credit-check and by the job queue worker. The
+    caller commits; on ProviderUnavailableException or
+    ProviderRejectedException nothing has been written and the application
+    is still in CREDIT_CHECK_PENDING.
+    
+    Args:
+        db: The async session the application is attached to
+        application: The LoanApplication (status CREDIT_CHECK_PENDING)
+        force_refresh: Bypass the bureau response cache
+    
+    Returns:
+        Dictionary in the CreditCheckResponse shape
+    """
+    credit_service = get_async_credit_bureau_service()
+    credit_result = await credit_service.check_credit(
+        pan=application.pan,
+        force_refresh=force_refresh
+    )
+    
+    # Determine if approved
+    is_approved = credit_service.is_approved(credit_result)
+    rejection_reasons = credit_service.get_rejection_reasons(credit_result) if not is_approved else []
+    
+    # Store credit result
+    await write_results(db, CreditResult, [{
+        "loan_application_id": application.id,
+        "credit_score": credit_result["credit_score"],
+        "active_loans": credit_result["active_loans"],
+        "credit_utilization": credit_result.get("credit_utilization"),
+        "payment_history_score": credit_result.get("payment_history_score"),
+        "is_approved": is_approved,
+        "rejection_reason": "; ".join(rejection_reasons) if rejection_reasons else None,
+        "raw_response": json.dumps(credit_result)
+    }])
+    
+    # Update application status based on credit check result
+    if is_approved:
+        await change_status(db, application, ApplicationStatus.CREDIT_CHECK_COMPLETED)
+        message = "Credit check passed. Calculating eligibility..."
+        
+        # Automatically calculate eligibility
+        eligibility = calculate_eligibility(
+            monthly_income=application.monthly_income,
+            employment_type=application.employment_type,
+            loan_amount=application.loan_amount,
+            credit_score=credit_result["credit_score"]
+        )
+        
+        # Store eligibility result
+        await write_results(db, EligibilityResult, [{
+            "loan_application_id": application.id,
+            "max_emi": eligibility["max_emi"],
+            "interest_rate": eligibility["interest_rate"],
+            "tenure_months": eligibility["tenure_months"],
+            "eligible_amount": eligibility["eligible_amount"],
+            "is_eligible": eligibility["is_eligible"],
+            "rejection_reasons": eligibility["rejection_reasons"],
+            "score_band": eligibility["score_band"],
+            "pricing_version": eligibility["pricing_version"]
+        }])
+        
+        # Update final status
+        if eligibility["is_eligible"]:
+            await change_status(db, application, ApplicationStatus.ELIGIBLE)
+            message = f"Congratulations! You are eligible for a loan up to ₹{eligibility['eligible_amount']:,.2f}"
+        else:
+            await change_status(db, application, ApplicationStatus.NOT_ELIGIBLE)
+            message = f"Not eligible: {eligibility['rejection_reasons']}"
+    else:
+        await change_status(db, application, ApplicationStatus.NOT_ELIGIBLE)
+        message = f"Credit check failed: {'; '.join(rejection_reasons)}"
+    
+    return {
+        "application_id": application.id,
+        "credit_score": credit_result["credit_score"],
+        "active_loans": credit_result["active_loans"],
+        "is_approved": is_approved,
+        "rejection_reason": "; ".join(rejection_reasons) if rejection_reasons else None,
+        "application_status": application.status,
+        "message": message
+    }
@@ -1,16 +1,35 @@
+from collections import Counter
+
+from sqlalchemy import case, update
+from sqlalchemy.orm.attributes import set_committed_value
+
 from app.core.enums import ApplicationStatus
-from app.utils.exceptions import InvalidWorkflowException
+from app.models.loan_application import LoanApplication
+from app.utils.exceptions import InvalidWorkflowException, StatusConflictException
+from app.services.status_counter_service import record_status_change
+from app.services.status_notifications import queue_status_events
 
 
-# Define valid state transitions
+# Define valid state transitions. The *_PENDING states can go back to where
+# the step started: a failed provider call hands the claimed step back so it
+# can be retried.
 VALID_TRANSITIONS = {
     ApplicationStatus.DRAFT: [ApplicationStatus.KYC_PENDING],
-    ApplicationStatus.KYC_PENDING: [ApplicationStatus.KYC_COMPLETED, ApplicationStatus.NOT_ELIGIBLE],
+    ApplicationStatus.KYC_PENDING: [
+        ApplicationStatus.KYC_COMPLETED,
+        ApplicationStatus.NOT_ELIGIBLE,
+        ApplicationStatus.DRAFT  # hand-back after a failed KYC call
+    ],
     ApplicationStatus.KYC_COMPLETED: [ApplicationStatus.CREDIT_CHECK_PENDING],
-    ApplicationStatus.CREDIT_CHECK_PENDING: [ApplicationStatus.CREDIT_CHECK_COMPLETED, ApplicationStatus.NOT_ELIGIBLE],
+    ApplicationStatus.CREDIT_CHECK_PENDING: [
+        ApplicationStatus.CREDIT_CHECK_COMPLETED,
+        ApplicationStatus.NOT_ELIGIBLE,
+        ApplicationStatus.KYC_COMPLETED  # hand-back after a failed bureau call
+    ],
     ApplicationStatus.CREDIT_CHECK_COMPLETED: [ApplicationStatus.ELIGIBLE, ApplicationStatus.NOT_ELIGIBLE],
     ApplicationStatus.ELIGIBLE: [],  # Terminal state
-    ApplicationStatus.NOT_ELIGIBLE: [],  # Terminal state
+    # Terminal state, except that a failed KYC can be retried (POST /kyc/{id}/retry)
+    ApplicationStatus.NOT_ELIGIBLE: [ApplicationStatus.KYC_PENDING],
 }
 
 
@@ -159,3 +178,155 @@ def is_terminal_state(status: str | ApplicationStatus) -> bool:
         status = ApplicationStatus(status)
     
     return status in [ApplicationStatus.ELIGIBLE, ApplicationStatus.NOT_ELIGIBLE]
+
+
+async def record_created(db, application_ids: list) -> None:
+    """
+    Count and log newly created applications (status DRAFT).
+    
+    The applications must already be flushed so they have IDs. The caller
+    is responsible for committing.
+    
+    Args:
+        db: The async session the applications were inserted in
+        application_ids: IDs of the new applications
+    """
+    if not application_ids:
+        return
+    
+    await record_status_change(db, None, ApplicationStatus.DRAFT, count=len(application_ids))
+    queue_status_events(db, [(application_id, None, ApplicationStatus.DRAFT) for application_id in application_ids])
+
+
+async def change_status(db, application, target: str | ApplicationStatus) -> None:
+    """
+    Set an application's status and keep the status counters in step.
+    
+    The transition must be in VALID_TRANSITIONS. The change is a
+    conditional UPDATE on the status the application was loaded with, so of
+    two concurrent requests making the same transition only one succeeds;
+    the other gets StatusConflictException (409) and nothing is counted
+    twice. Endpoints that call a provider use this to claim the step (e.g.
+    DRAFT -> KYC_PENDING) before making the call.
+    
+    The counter update runs in the same transaction as the status change,
+    and when it commits the transition is appended to the status log and
+    announced to event streams; the caller is responsible for committing.
+    
+    Args:
+        db: The async session the application is attached to
+        application: The LoanApplication to update
+        target: The new application status
+    
+    Raises:
+        InvalidWorkflowException: if the transition is not allowed
+        StatusConflictException: if another request changed the status first
+    """
+    if isinstance(target, str):
+        target = ApplicationStatus(target)
+    
+    current = application.status
+    if current == target.value:
+        return
+    validate_transition(current, target)
+    
+    result = await db.execute(
+        update(LoanApplication)
+        .where(LoanApplication.id == application.id, LoanApplication.status == current)
+        .values(status=target.value)
+        .returning(LoanApplication.updated_at)
+        .execution_options(synchronize_session=False)
+    )
+    row = result.first()
+    if row is None:
+        raise StatusConflictException(
+            f"Application {application.id} is no longer in status '{current}'; it was changed by another request"
+        )
+    
+    await record_status_change(db, current, target)
+    queue_status_events(db, [(application.id, current, target)])
+    # Already written: keep the instance in step without another UPDATE at flush
+    set_committed_value(application, "status", target.value)
+    set_committed_value(application, "updated_at", row.updated_at)
+
+
+async def release_claim(db, application, claimed: ApplicationStatus, previous: ApplicationStatus) -> bool:
+    """
+    Hand a claimed step back after it failed, so it can be retried.
+    
+    Rolls back whatever the step had written, then moves the application
+    from `claimed` back to `previous` and commits. An application that is
+    no longer in `claimed` (another request moved it on) is left alone.
+    
+    Args:
+        db: The async session the application is attached to
+        application: The LoanApplication whose step failed
+        claimed: The status the step was claimed with (e.g. KYC_PENDING)
+        previous: The status the step started from (e.g. DRAFT)
+    
+    Returns:
+        Whether the application was handed back
+    """
+    await db.rollback()
+    # The rollback expired the instance; reading it now would be an implicit load
+    await db.refresh(application)
+    if application.status != claimed.value:
+        return False
+    
+    try:
+        await change_status(db, application, previous)
+        await db.commit()
+    except StatusConflictException:
+        await db.rollback()
+        return False
+    return True
+
+
+async def change_status_many(db, from_status: str | ApplicationStatus, targets: dict) -> list:
+    """
+    Move many applications out of `from_status` in one UPDATE.
+    
+    Only rows still in `from_status` are changed, so the update doubles as
+    an atomic claim against concurrent single-application calls. Targets
+    are not checked against VALID_TRANSITIONS: besides the workflow steps
+    and hand-backs, portfolio re-evaluation uses this to re-score terminal
+    decisions (ELIGIBLE <-> NOT_ELIGIBLE), which is outside the customer
+    workflow the table describes. The status counters are adjusted once per target status, and the
+    transitions are logged in one batch at commit. The caller is
+    responsible for committing.
+    
+    Args:
+        db: The async session to run the update in
+        from_status: The status the applications must currently be in
+        targets: Mapping of application ID -> new status
+        
+    Returns:
+        IDs of the applications that were actually updated
+    """
+    if not targets:
+        return []
+    
+    if isinstance(from_status, str):
+        from_status = ApplicationStatus(from_status)
+    
+    values = {
+        application_id: target.value if isinstance(target, ApplicationStatus) else target
+        for application_id, target in targets.items()
+    }
+    result = await db.execute(
+        update(LoanApplication)
+        .where(
+            LoanApplication.id.in_(list(values)),
+            LoanApplication.status == from_status.value
+        )
+        .values(status=case(values, value=LoanApplication.id))
+        .returning(LoanApplication.id, LoanApplication.status)
+        .execution_options(synchronize_session=False)
+    )
+    rows = result.all()
+    
+    for target, count in Counter(row.status for row in rows).items():
+        await record_status_change(db, from_status, target, count=count)
+    queue_status_events(db, [(row.id, from_status, row.status) for row in rows if row.status != from_status.value])
+    
+    return [row.id for row in rows]
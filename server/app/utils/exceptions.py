@@ -15,6 +15,13 @@ class InvalidWorkflowException(LOSException):
         super().__init__(message, status_code=400)
 
 
+class StatusConflictException(InvalidWorkflowException):
+    """Exception raised when a concurrent request changed the application's status first"""
+    def __init__(self, message: str):
+        super().__init__(message)
+        self.status_code = 409
+
+
 class ValidationException(LOSException):
     """Exception raised when validation fails"""
     def __init__(self, message: str):
@@ -27,6 +34,12 @@ class NotFoundException(LOSException):
         super().__init__(message, status_code=404)
 
 
+class ConflictException(LOSException):
+    """Exception raised when a request conflicts with work already in progress"""
+    def __init__(self, message: str):
+        super().__init__(message, status_code=409)
+
+
 class KYCFailedException(LOSException):
     """Exception raised when KYC verification fails"""
     def __init__(self, message: str):
@@ -45,6 +58,20 @@ class EligibilityException(LOSException):
         super().__init__(message, status_code=400)
 
 
+class ProviderUnavailableException(LOSException):
+    """Exception raised when an external provider (KYC, credit bureau) can't be reached"""
+    def __init__(self, message: str, retry_after: int = None):
+        self.retry_after = retry_after
+        super().__init__(message, status_code=503)
+
+
+class ProviderRejectedException(LOSException):
+    """Exception raised when a provider refuses a request (4xx); retrying won't help"""
+    def __init__(self, message: str, provider_status: int = None):
+        self.provider_status = provider_status
+        super().__init__(message, status_code=422)
+
+
 class AuthenticationException(LOSException):
     """Exception raised for authentication errors"""
     def __init__(self, message: str = "Could not validate credentials"):
@@ -80,3 +107,11 @@ def raise_forbidden(detail: str = "Not enough permissions"):
 
 def raise_validation_error(detail: str):
     raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=detail)
+
+
+def raise_service_unavailable(detail: str, retry_after: int = 1):
+    raise HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=detail,
+        headers={"Retry-After": str(retry_after)},
+    )
@@ -0,0 +1,36 @@
+import hashlib
+from fastapi import Request, Response, status
+from fastapi.responses import JSONResponse
+
+
+def make_etag(*parts) -> str:
+    """
+    Build a strong ETag from the given parts.
+    """
+    digest = hashlib.sha256(":".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """
+    Check the request's If-None-Match header against an ETag.
+    Uses weak comparison, as RFC 9110 specifies for If-None-Match.
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = [value.strip() for value in header.split(",")]
+    return any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+
+def conditional_json_response(request: Request, content, etag: str, cache_control: str) -> Response:
+    """
+    Return 304 Not Modified if the client already has this representation,
+    otherwise the JSON body, with ETag and Cache-Control headers either way.
+    """
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return JSONResponse(content=content, headers=headers)
@@ -0,0 +1,26 @@
+import base64
+import json
+from datetime import datetime
+
+from app.utils.exceptions import raise_bad_request
+
+
+def encode_cursor(created_at: datetime, record_id: int) -> str:
+    """
+    Encode a (created_at, id) keyset position as an opaque cursor string.
+    """
+    payload = json.dumps({"created_at": created_at.isoformat(), "id": record_id})
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple:
+    """
+    Decode an opaque cursor back into (created_at, id).
+    Raises 400 Bad Request if the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(payload["created_at"]), int(payload["id"])
+    except (ValueError, KeyError, TypeError):
+        raise_bad_request("Invalid pagination cursor")
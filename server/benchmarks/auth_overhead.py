@@ -0,0 +1,87 @@
+"""
+Per-request authentication overhead microbenchmark.
+
+Calls get_current_user directly (no HTTP) against a throwaway SQLite
+database and compares:
+
+    uncached  - JWT verification + users lookup on every call (previous behaviour)
+    cached    - principal cache hit
+
+SQLite keeps the lookup in-process, so the uncached figure understates the
+cost of a real PostgreSQL round trip.
+
+Usage:
+    python -m benchmarks.auth_overhead --iterations 5000
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+_db_file = os.path.join(tempfile.mkdtemp(prefix="los-bench-"), "auth.db")
+os.environ.setdefault("APP_NAME", "Mini-LOS-bench")
+os.environ.setdefault("APP_VERSION", "bench")
+os.environ.setdefault("DEBUG", "False")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_db_file}")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "60")
+
+import app  # noqa: E402,F401  (registers all models on Base.metadata)
+from app.core.database import AsyncSessionLocal, SessionLocal, create_tables, dispose_engines  # noqa: E402
+from app.core.security import create_access_token, get_current_user, principal_cache  # noqa: E402
+from app.models.user import User  # noqa: E402
+
+EMAIL = "bench@example.com"
+
+
+def setup_user():
+    create_tables()
+    db = SessionLocal()
+    try:
+        if not db.query(User).filter(User.email == EMAIL).first():
+            db.add(User(email=EMAIL, full_name="Bench", hashed_password="x"))
+            db.commit()
+    finally:
+        db.close()
+
+
+async def measure(token: str, iterations: int, cached: bool) -> float:
+    """Return mean microseconds per get_current_user call"""
+    async with AsyncSessionLocal() as db:
+        await get_current_user(token, db)  # warm-up
+        start = time.perf_counter()
+        for _ in range(iterations):
+            if not cached:
+                principal_cache.entries.clear()
+            await get_current_user(token, db)
+        elapsed = time.perf_counter() - start
+    return elapsed / iterations * 1_000_000
+
+
+async def run(iterations: int):
+    token = create_access_token({"sub": EMAIL})
+    try:
+        uncached = await measure(token, iterations, cached=False)
+        cached = await measure(token, iterations, cached=True)
+    finally:
+        await dispose_engines()
+
+    print(f"uncached (decode + SELECT): {uncached:10.1f} us/request")
+    print(f"cached (principal hit):     {cached:10.1f} us/request")
+    if cached:
+        print(f"speedup:                    {uncached / cached:10.1f}x")
+    print(f"cache stats: {principal_cache.stats()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Auth overhead microbenchmark")
+    parser.add_argument("--iterations", type=int, default=5000)
+    args = parser.parse_args()
+    setup_user()
+    asyncio.run(run(args.iterations))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Offer grid server-time microbenchmark.
+
+Times get_offer_grid (compute + JSON encoding) for a tenure × amount grid,
+with a different income on every call (cache miss) and with the same
+income repeated (cache hit), and reports the median and p99 per grid.
+
+Usage:
+    python -m benchmarks.offer_grid --iterations 5000 --tenures 10 --amounts 10
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+_db_file = os.path.join(tempfile.mkdtemp(prefix="los-bench-"), "offers.db")
+os.environ.setdefault("APP_NAME", "Mini-LOS-bench")
+os.environ.setdefault("APP_VERSION", "bench")
+os.environ.setdefault("DEBUG", "False")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_db_file}")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "60")
+
+from app.services.offer_service import get_offer_grid, offer_cache  # noqa: E402
+
+
+def measure(iterations: int, tenures: list, amount_steps: int, cached: bool) -> list:
+    """Return microseconds per grid"""
+    timings = []
+    get_offer_grid(80_000, "SALARIED", 720, tenures, None, amount_steps)  # warm-up
+    for index in range(iterations):
+        income = 80_000 if cached else 80_000 + index
+        start = time.perf_counter()
+        get_offer_grid(income, "SALARIED", 720, tenures, None, amount_steps)
+        timings.append((time.perf_counter() - start) * 1_000_000)
+    return timings
+
+
+def report(label: str, timings: list) -> None:
+    timings = sorted(timings)
+    p99 = timings[min(int(len(timings) * 0.99), len(timings) - 1)]
+    print(f"{label:<8} p50 {statistics.median(timings):8.1f} us   p99 {p99:8.1f} us")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offer grid microbenchmark")
+    parser.add_argument("--iterations", type=int, default=5000)
+    parser.add_argument("--tenures", type=int, default=10, help="number of tenures (12-month steps)")
+    parser.add_argument("--amounts", type=int, default=10, help="number of amounts")
+    args = parser.parse_args()
+
+    tenures = [12 * (index + 1) for index in range(args.tenures)]
+    print(f"grid: {args.tenures} tenures x {args.amounts} amounts = {args.tenures * args.amounts} cells")
+    report("miss", measure(args.iterations, tenures, args.amounts, cached=False))
+    report("hit", measure(args.iterations, tenures, args.amounts, cached=True))
+    print(f"cache stats: {offer_cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
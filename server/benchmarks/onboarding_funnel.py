@@ -0,0 +1,205 @@
+"""
+Onboarding funnel load test.
+
+Drives the applicant journey against a running server with N concurrent
+clients and reports requests/sec and latency percentiles per step:
+
+    create loan -> KYC -> credit check -> track status
+
+Users are registered and logged in during a setup phase that is not timed,
+so the numbers reflect the loan/KYC/credit request path only.
+
+Usage:
+    python -m benchmarks.onboarding_funnel --base-url http://localhost:8000 \\
+        --clients 500 --label before --output before.json
+    python -m benchmarks.onboarding_funnel --compare before.json after.json
+"""
+import argparse
+import asyncio
+import json
+import random
+import string
+import time
+import uuid
+from collections import defaultdict
+
+import httpx
+
+API_PREFIX = "/api/v1"
+FUNNEL_STEPS = ["create", "kyc", "credit_check", "track"]
+
+
+def percentile(samples: list, pct: float) -> float:
+    """Nearest-rank percentile of a list of latencies (seconds)"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(int(round(pct / 100 * len(ordered))) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+def random_pan() -> str:
+    """Generate a syntactically valid PAN (ABCDE1234F)"""
+    letters = string.ascii_uppercase
+    return (
+        "".join(random.choices(letters, k=5))
+        + "".join(random.choices(string.digits, k=4))
+        + random.choice(letters)
+    )
+
+
+async def setup_user(client: httpx.AsyncClient, run_id: str, index: int) -> str:
+    """Register a throwaway user and return its bearer token"""
+    email = f"bench-{run_id}-{index}@example.com"
+    password = "Bench@12345"
+    await client.post(f"{API_PREFIX}/auth/register", json={
+        "email": email,
+        "full_name": f"Bench User {index}",
+        "password": password
+    })
+    response = await client.post(
+        f"{API_PREFIX}/auth/login",
+        data={"username": email, "password": password}
+    )
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def run_funnel(client: httpx.AsyncClient, token: str, latencies: dict, errors: dict):
+    """Run a single applicant through the funnel, recording per-step latency"""
+    headers = {"Authorization": f"Bearer {token}"}
+
+    async def timed(step: str, method: str, url: str, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, url, headers=headers, **kwargs)
+        except httpx.HTTPError:
+            errors[step] += 1
+            return None
+        latencies[step].append(time.perf_counter() - start)
+        if response.status_code >= 400:
+            errors[step] += 1
+            return None
+        return response.json()
+
+    created = await timed("create", "POST", f"{API_PREFIX}/loan/create", json={
+        "full_name": "Bench Applicant",
+        "mobile": "9876543210",
+        "pan": random_pan(),
+        "dob": "1990-01-01",
+        "employment_type": "SALARIED",
+        "monthly_income": 80000,
+        "loan_amount": 500000
+    })
+    if not created:
+        return
+
+    application_id = created["id"]
+    kyc = await timed("kyc", "POST", f"{API_PREFIX}/loan/{application_id}/kyc")
+    if kyc and kyc["application_status"] == "KYC_COMPLETED":
+        await timed("credit_check", "POST", f"{API_PREFIX}/loan/{application_id}/credit-check")
+    await timed("track", "GET", f"{API_PREFIX}/loan/{application_id}")
+
+
+async def run_benchmark(base_url: str, clients: int, rounds: int, setup_concurrency: int) -> dict:
+    """Run `rounds` funnels for each of `clients` concurrent applicants"""
+    run_id = uuid.uuid4().hex[:8]
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    timeout = httpx.Timeout(60.0)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=timeout) as client:
+        # Untimed setup: one user per client (each user may hold up to 5 applications)
+        semaphore = asyncio.Semaphore(setup_concurrency)
+
+        async def bounded_setup(index: int) -> str:
+            async with semaphore:
+                return await setup_user(client, run_id, index)
+
+        tokens = await asyncio.gather(*(bounded_setup(i) for i in range(clients)))
+
+        latencies = defaultdict(list)
+        errors = defaultdict(int)
+
+        async def applicant(token: str):
+            for _ in range(rounds):
+                await run_funnel(client, token, latencies, errors)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(applicant(token) for token in tokens))
+        elapsed = time.perf_counter() - start
+
+    total_requests = sum(len(samples) for samples in latencies.values())
+    all_samples = [s for samples in latencies.values() for s in samples]
+
+    return {
+        "clients": clients,
+        "rounds": rounds,
+        "elapsed_seconds": round(elapsed, 3),
+        "requests": total_requests,
+        "requests_per_second": round(total_requests / elapsed, 2) if elapsed > 0 else 0,
+        "p50_ms": round(percentile(all_samples, 50) * 1000, 2),
+        "p99_ms": round(percentile(all_samples, 99) * 1000, 2),
+        "steps": {
+            step: {
+                "requests": len(latencies[step]),
+                "errors": errors[step],
+                "p50_ms": round(percentile(latencies[step], 50) * 1000, 2),
+                "p95_ms": round(percentile(latencies[step], 95) * 1000, 2),
+                "p99_ms": round(percentile(latencies[step], 99) * 1000, 2)
+            }
+            for step in FUNNEL_STEPS
+        }
+    }
+
+
+def print_report(label: str, report: dict):
+    print(f"== {label}: {report['clients']} clients x {report['rounds']} rounds")
+    print(f"   {report['requests']} requests in {report['elapsed_seconds']}s "
+          f"-> {report['requests_per_second']} req/s, "
+          f"p50 {report['p50_ms']} ms, p99 {report['p99_ms']} ms")
+    for step, stats in report["steps"].items():
+        print(f"   {step:<13} n={stats['requests']:<6} err={stats['errors']:<4} "
+              f"p50={stats['p50_ms']:>8} ms  p95={stats['p95_ms']:>8} ms  p99={stats['p99_ms']:>8} ms")
+
+
+def print_comparison(before: dict, after: dict):
+    print_report("before", before)
+    print_report("after", after)
+    if before["requests_per_second"]:
+        speedup = after["requests_per_second"] / before["requests_per_second"]
+        print(f"== throughput x{speedup:.2f}, p99 {before['p99_ms']} ms -> {after['p99_ms']} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mini-LOS onboarding funnel benchmark")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=1, help="Funnels per client (max 5 per user)")
+    parser.add_argument("--setup-concurrency", type=int, default=20)
+    parser.add_argument("--label", default="run")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"),
+                        help="Compare two saved JSON reports instead of running")
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0]) as f:
+            before = json.load(f)
+        with open(args.compare[1]) as f:
+            after = json.load(f)
+        print_comparison(before, after)
+        return
+
+    report = asyncio.run(run_benchmark(
+        args.base_url, args.clients, min(args.rounds, 5), args.setup_concurrency
+    ))
+    report["label"] = args.label
+    print_report(args.label, report)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+# Local stand-ins for external providers
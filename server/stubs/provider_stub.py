@@ -0,0 +1,117 @@
+"""
+Local stub of the external KYC and credit bureau providers.
+
+Serves the HTTP contract expected by HttpKYCService / HttpCreditBureauService,
+backed by the mock implementations, with optional latency and failure
+injection for exercising timeouts, retries and pooling.
+
+Besides the random failures set by the environment, exact responses can be
+scripted with PUT /faults: each provider call takes the next fault (status
+code, delay, Retry-After, raw body) from the queue, and answers normally once it is
+empty. The tests drive the stub this way.
+
+Usage:
+    STUB_LATENCY_MS=1500 STUB_FAILURE_RATE=0.1 \\
+        uvicorn stubs.provider_stub:app --port 9000
+
+    # then run the API with
+    KYC_PROVIDER=http KYC_PROVIDER_URL=http://localhost:9000
+    CREDIT_BUREAU_PROVIDER=http CREDIT_BUREAU_URL=http://localhost:9000
+"""
+import asyncio
+import os
+import random
+from collections import deque
+from typing import List, Optional
+
+from fastapi import FastAPI, HTTPException, Response
+from pydantic import BaseModel
+
+from app.services.kyc_service import MockKYCService
+from app.services.credit_bureau_service import MockCibilService
+
+LATENCY_MS = float(os.getenv("STUB_LATENCY_MS", "0"))
+JITTER_MS = float(os.getenv("STUB_JITTER_MS", "0"))
+FAILURE_RATE = float(os.getenv("STUB_FAILURE_RATE", "0"))
+
+app = FastAPI(title="Provider stub")
+
+kyc_service = MockKYCService()
+credit_service = MockCibilService()
+calls = {"kyc": 0, "credit": 0, "failures": 0}
+faults = deque()
+
+
+class KYCRequest(BaseModel):
+    name: str
+    pan: Optional[str] = None
+
+
+class CreditRequest(BaseModel):
+    pan: str
+
+
+class Fault(BaseModel):
+    status_code: int = 200  # 200 = answer normally (after delay_ms)
+    delay_ms: float = 0
+    retry_after: Optional[int] = None
+    body: Optional[str] = None  # answer 200 with this raw body (malformed responses)
+
+
+async def simulate_provider() -> Optional[Response]:
+    """
+    Apply the next scripted fault, or the configured latency and random 503s.
+    Returns the response to send instead of the normal answer, if any.
+    """
+    if faults:
+        fault = faults.popleft()
+        if fault.delay_ms:
+            await asyncio.sleep(fault.delay_ms / 1000)
+        if fault.status_code != 200:
+            calls["failures"] += 1
+            headers = {"Retry-After": str(fault.retry_after)} if fault.retry_after is not None else None
+            raise HTTPException(status_code=fault.status_code, detail="Scripted stub fault", headers=headers)
+        if fault.body is not None:
+            return Response(content=fault.body, media_type="text/html")
+        return None
+
+    delay = LATENCY_MS + random.uniform(0, JITTER_MS)
+    if delay:
+        await asyncio.sleep(delay / 1000)
+    if FAILURE_RATE and random.random() < FAILURE_RATE:
+        calls["failures"] += 1
+        raise HTTPException(status_code=503, detail="Stub provider failure")
+    return None
+
+
+@app.post("/kyc")
+async def kyc(request: KYCRequest):
+    calls["kyc"] += 1
+    scripted = await simulate_provider()
+    if scripted is not None:
+        return scripted
+    return kyc_service.perform_kyc(name=request.name, pan=request.pan)
+
+
+@app.post("/credit")
+async def credit(request: CreditRequest):
+    calls["credit"] += 1
+    scripted = await simulate_provider()
+    if scripted is not None:
+        return scripted
+    return credit_service.check_credit(pan=request.pan)
+
+
+@app.get("/stats")
+def stats():
+    return calls
+
+
+@app.put("/faults")
+def script_faults(items: List[Fault]):
+    """Replace the fault queue and reset the call counters"""
+    faults.clear()
+    faults.extend(items)
+    for name in calls:
+        calls[name] = 0
+    return {"queued": len(faults)}
@@ -0,0 +1,93 @@
+"""
+Test configuration: a throwaway SQLite database, mock providers and
+ORM_RELATIONSHIP_LAZY=raise, so an accidental lazy load (N+1) fails the test.
+
+Settings are read once at import time, so the environment is set before
+anything from `app` is imported.
+"""
+import asyncio
+import datetime
+import os
+import tempfile
+
+_database_dir = tempfile.mkdtemp(prefix="mini-los-tests-")
+
+for name, value in {
+    "APP_NAME": "Mini-LOS",
+    "APP_VERSION": "test",
+    "DEBUG": "False",
+    "DATABASE_URL": f"sqlite:///{_database_dir}/test.db",
+    "DATABASE_REPLICA_URLS": "",
+    "SECRET_KEY": "test-secret-key",
+    "ALGORITHM": "HS256",
+    "ACCESS_TOKEN_EXPIRE_MINUTES": "60",
+    "BCRYPT_ROUNDS": "4",
+    "KYC_PROVIDER": "mock",
+    "CREDIT_BUREAU_PROVIDER": "mock",
+    "JOB_WORKERS": "0",
+    "ORM_RELATIONSHIP_LAZY": "raise",
+}.items():
+    os.environ[name] = value
+
+import pytest
+
+import app  # noqa: F401  (registers every model on Base.metadata)
+from app.core.database import AsyncSessionLocal, Base, async_engine, engine
+from app.core.enums import ApplicationStatus
+from app.models.loan_application import LoanApplication
+from app.services.status_counter_service import record_status_change
+
+
+@pytest.fixture(autouse=True)
+def database():
+    """Fresh tables for every test"""
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    yield
+
+
+@pytest.fixture
+def run():
+    """
+    Run a coroutine to completion.
+    
+    The async engine's pooled connections belong to the loop that opened
+    them, so they are closed before that loop goes away.
+    """
+    def runner(coro):
+        async def main():
+            try:
+                return await coro
+            finally:
+                await async_engine.dispose()
+        return asyncio.run(main())
+    return runner
+
+
+async def _create_application(status: ApplicationStatus = ApplicationStatus.DRAFT, **fields) -> int:
+    values = {
+        "full_name": "Rahul Sharma",
+        "mobile": "9876543210",
+        "pan": "ABCDE1234F",
+        "dob": datetime.date(1990, 1, 15),
+        "employment_type": "SALARIED",
+        "monthly_income": 80000.0,
+        "loan_amount": 500000.0,
+        "loan_purpose": "Home renovation",
+        **fields,
+        "status": status.value
+    }
+    async with AsyncSessionLocal() as db:
+        application = LoanApplication(**values)
+        db.add(application)
+        await db.flush()
+        # Counted as created straight into `status`, so the counters stay consistent
+        await record_status_change(db, None, status)
+        await db.commit()
+        return application.id
+
+
+@pytest.fixture
+def create_application():
+    """Async factory: insert an application in the given status and return its ID"""
+    return _create_application
@@ -0,0 +1,139 @@
+"""
+Batch KYC / credit checks keep working after a rollback: a failed chunk must
+neither break the chunks after it nor the cleanup of the unprocessed ones.
+"""
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.enums import ApplicationStatus
+from app.models.credit import CreditResult
+from app.models.loan_application import LoanApplication
+from app.services import credit_batch_service, kyc_batch_service
+from app.services.credit_bureau_service import MockCibilService, SyncCreditBureauAdapter
+from app.services.kyc_service import MockKYCService, SyncKYCServiceAdapter
+
+
+class BatchFailure(Exception):
+    pass
+
+
+def fail_once(monkeypatch, module, name: str, exc: Exception, call: int = 1) -> None:
+    """
+    Make the `call`-th call of module.name raise exc after it has run (so its
+    transaction has started and the rollback expires the session)
+    """
+    original = getattr(module, name)
+    calls = []
+
+    async def wrapper(*args, **kwargs):
+        calls.append(None)
+        result = await original(*args, **kwargs)
+        if len(calls) == call:
+            raise exc
+        return result
+
+    monkeypatch.setattr(module, name, wrapper)
+
+
+async def _statuses(application_ids: list) -> list:
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(LoanApplication.id, LoanApplication.status).where(LoanApplication.id.in_(application_ids))
+        )
+        statuses = dict(result.all())
+    return [statuses[application_id] for application_id in application_ids]
+
+
+def test_credit_chunk_after_a_fallback_still_persists(run, create_application, monkeypatch):
+    monkeypatch.setattr(settings, "CREDIT_BATCH_CHUNK_SIZE", 1)
+    # The first chunk's bulk write fails; its one-by-one fallback succeeds
+    fail_once(monkeypatch, credit_batch_service, "_write_records", SQLAlchemyError("bulk insert failed"))
+
+    async def scenario():
+        application_ids = [await create_application(ApplicationStatus.KYC_COMPLETED) for _ in range(3)]
+        async with AsyncSessionLocal() as db:
+            items = await credit_batch_service.run_credit_batch(
+                db, SyncCreditBureauAdapter(MockCibilService()), application_ids
+            )
+            stored = await db.scalar(select(func.count()).select_from(CreditResult))
+        return items, stored, await _statuses(application_ids)
+
+    items, stored, statuses = run(scenario())
+
+    assert [item["outcome"] for item in items] == statuses
+    assert ApplicationStatus.CREDIT_CHECK_PENDING.value not in statuses
+    assert stored == 3
+
+
+def test_credit_failure_releases_the_unprocessed_applications(run, create_application, monkeypatch):
+    monkeypatch.setattr(settings, "CREDIT_BATCH_CHUNK_SIZE", 1)
+    # The second chunk's bulk write breaks with something other than a database error
+    fail_once(monkeypatch, credit_batch_service, "_write_records", BatchFailure(), call=2)
+
+    async def scenario():
+        application_ids = [await create_application(ApplicationStatus.KYC_COMPLETED) for _ in range(3)]
+        async with AsyncSessionLocal() as db:
+            with pytest.raises(BatchFailure):
+                await credit_batch_service.run_credit_batch(
+                    db, SyncCreditBureauAdapter(MockCibilService()), application_ids
+                )
+        return await _statuses(application_ids)
+
+    statuses = run(scenario())
+
+    assert statuses[0] != ApplicationStatus.CREDIT_CHECK_PENDING.value
+    assert statuses[1:] == [ApplicationStatus.KYC_COMPLETED.value] * 2
+
+
+def test_kyc_failure_releases_the_unprocessed_applications(run, create_application, monkeypatch):
+    monkeypatch.setattr(settings, "KYC_BATCH_CHUNK_SIZE", 1)
+    # Call 1 is the claim, call 2 the first chunk: the second chunk's write breaks
+    fail_once(monkeypatch, kyc_batch_service, "change_status_many", BatchFailure(), call=3)
+
+    async def scenario():
+        application_ids = [await create_application() for _ in range(3)]
+        async with AsyncSessionLocal() as db:
+            with pytest.raises(BatchFailure):
+                await kyc_batch_service.run_kyc_batch(
+                    db, SyncKYCServiceAdapter(MockKYCService()), application_ids
+                )
+        return await _statuses(application_ids)
+
+    statuses = run(scenario())
+
+    assert statuses[0] != ApplicationStatus.KYC_PENDING.value
+    assert statuses[1:] == [ApplicationStatus.DRAFT.value] * 2
+
+
+class PartlyBrokenKYCService(SyncKYCServiceAdapter):
+    """Mock KYC, except that applicants named "Broken" get an answer without a score"""
+
+    def __init__(self):
+        super().__init__(MockKYCService())
+
+    async def perform_kyc(self, name: str, pan: str = None) -> dict:
+        if name == "Broken":
+            return {"panVerified": "YES"}
+        return await super().perform_kyc(name=name, pan=pan)
+
+
+def test_kyc_malformed_answer_only_fails_its_application(run, create_application):
+    async def scenario():
+        application_ids = [
+            await create_application(),
+            await create_application(full_name="Broken"),
+            await create_application()
+        ]
+        async with AsyncSessionLocal() as db:
+            items = await kyc_batch_service.run_kyc_batch(db, PartlyBrokenKYCService(), application_ids)
+        return items, await _statuses(application_ids)
+
+    items, statuses = run(scenario())
+
+    assert items[1]["outcome"] == "PROVIDER_ERROR"
+    assert statuses[1] == ApplicationStatus.DRAFT.value
+    assert [items[0]["outcome"], items[2]["outcome"]] == [statuses[0], statuses[2]]
+    assert ApplicationStatus.KYC_PENDING.value not in statuses
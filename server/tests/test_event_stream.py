@@ -0,0 +1,84 @@
+"""
+SSE stream: the snapshot is read from the primary after subscribing, and an
+event sent in the Last-Event-ID replay is not sent again from the queue.
+"""
+import asyncio
+
+from sqlalchemy import update
+
+from app.core.database import AsyncSessionLocal
+from app.core.enums import ApplicationStatus
+from app.models.loan_application import LoanApplication
+from app.services.application_service import application_cache
+from app.services.event_hub import status_event_hub, stream_application_events
+
+
+def _event(event_id: str, application_id: int, from_status: ApplicationStatus, to_status: ApplicationStatus) -> dict:
+    return {
+        "id": event_id,
+        "application_id": application_id,
+        "from": from_status.value,
+        "to": to_status.value,
+        "at": "2024-01-01T00:00:00+00:00"
+    }
+
+
+async def _publish(*events: dict) -> None:
+    """
+    Hand events to the hub and let the dispatcher fan them out (transitions
+    that carry no results, so dispatching needs no database round trip)
+    """
+    status_event_hub._receive(list(events))
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+def test_snapshot_is_read_from_the_primary_not_the_cache(run, create_application):
+    async def scenario():
+        application_id = await create_application()
+        async with AsyncSessionLocal() as db:
+            await application_cache.get(db, application_id)
+            await db.execute(
+                update(LoanApplication)
+                .where(LoanApplication.id == application_id)
+                .values(status=ApplicationStatus.KYC_PENDING.value)
+            )
+            await db.commit()
+
+        stream = stream_application_events(application_id)
+        try:
+            await stream.__anext__()
+            return await stream.__anext__()
+        finally:
+            await stream.aclose()
+            application_cache.invalidate(application_id)
+
+    snapshot = run(scenario())
+
+    assert snapshot.startswith("event: snapshot")
+    assert '"status":"KYC_PENDING"' in snapshot
+
+
+def test_replayed_events_are_not_sent_twice(run, create_application):
+    async def scenario():
+        await status_event_hub.start()
+        application_id = await create_application()
+        stream = stream_application_events(application_id, last_event_id="1-first")
+        try:
+            await _publish(_event("1-first", application_id, ApplicationStatus.DRAFT, ApplicationStatus.KYC_PENDING))
+            # The first chunk is sent once the stream has subscribed
+            await stream.__anext__()
+            # Committed after subscribing but before the replay is read: buffered and queued
+            await _publish(_event("2-second", application_id, ApplicationStatus.KYC_PENDING, ApplicationStatus.DRAFT))
+            replayed = await stream.__anext__()
+            await _publish(_event("3-third", application_id, ApplicationStatus.DRAFT, ApplicationStatus.KYC_PENDING))
+            following = await stream.__anext__()
+        finally:
+            await stream.aclose()
+            await status_event_hub.stop()
+        return replayed, following
+
+    replayed, following = run(scenario())
+
+    assert "id: 2-second" in replayed
+    assert "id: 3-third" in following
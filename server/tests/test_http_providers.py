@@ -0,0 +1,187 @@
+"""
+HttpKYCService / HttpCreditBureauService against the provider stub, served
+by uvicorn on a local port. Each test scripts the stub's responses with
+PUT /faults.
+"""
+import asyncio
+import socket
+import threading
+import time
+
+import httpx
+import pytest
+import uvicorn
+
+from app.services.circuit_breaker import CircuitBreaker
+from app.services.credit_bureau_service import HttpCreditBureauService
+from app.services.http_client import ProviderHttpClient
+from app.services.kyc_service import HttpKYCService
+from app.utils.exceptions import ProviderRejectedException, ProviderUnavailableException
+from stubs.provider_stub import app as stub_app
+
+MAX_RETRIES = 2
+
+
+@pytest.fixture(scope="module")
+def stub_url():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    server = uvicorn.Server(uvicorn.Config(stub_app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10
+    while not server.started:
+        if time.monotonic() > deadline:
+            raise RuntimeError("provider stub did not start")
+        time.sleep(0.01)
+
+    yield f"http://127.0.0.1:{port}"
+
+    server.should_exit = True
+    thread.join(timeout=5)
+
+
+def script(stub_url: str, *faults: dict) -> None:
+    httpx.put(f"{stub_url}/faults", json=list(faults)).raise_for_status()
+
+
+def stub_calls(stub_url: str) -> dict:
+    return httpx.get(f"{stub_url}/stats").json()
+
+
+def call(service_call):
+    """Run one provider call on a fresh client (own pool, breakers and event loop)"""
+    async def main():
+        client = ProviderHttpClient(
+            max_connections=10,
+            max_keepalive=5,
+            timeout=0.3,
+            max_retries=MAX_RETRIES,
+            backoff_base=0.01,
+            backoff_max=1.5
+        )
+        try:
+            return await service_call(client), client
+        finally:
+            await client.shutdown()
+    return asyncio.run(main())
+
+
+def kyc(stub_url: str):
+    return lambda client: HttpKYCService(stub_url, client).perform_kyc(name="Rahul Sharma", pan="ABCDE1234F")
+
+
+def credit(stub_url: str):
+    return lambda client: HttpCreditBureauService(stub_url, client).check_credit("ABCDE1234F")
+
+
+def test_kyc_success(stub_url):
+    script(stub_url)
+
+    result, _ = call(kyc(stub_url))
+
+    assert 0 <= result["nameMatchScore"] <= 100
+    assert result["status"] in ("PASSED", "FAILED")
+    assert stub_calls(stub_url)["kyc"] == 1
+
+
+def test_credit_success(stub_url):
+    script(stub_url)
+
+    result, _ = call(credit(stub_url))
+
+    assert result["pan"] == "ABCDE1234F"
+    assert "credit_score" in result and "active_loans" in result
+    assert stub_calls(stub_url)["credit"] == 1
+
+
+def test_timeout_is_retried_then_reported_unavailable(stub_url):
+    script(stub_url, *[{"delay_ms": 1000}] * (MAX_RETRIES + 1))
+
+    with pytest.raises(ProviderUnavailableException) as error:
+        call(kyc(stub_url))
+
+    assert "Timeout" in error.value.message
+    assert stub_calls(stub_url)["kyc"] == MAX_RETRIES + 1
+
+
+def test_5xx_is_retried(stub_url):
+    script(stub_url, {"status_code": 503}, {"status_code": 502})
+
+    result, client = call(credit(stub_url))
+
+    assert "credit_score" in result
+    assert stub_calls(stub_url)["credit"] == 3
+    assert client.breakers["Credit bureau"].failures == 0
+
+
+def test_429_waits_for_retry_after(stub_url):
+    script(stub_url, {"status_code": 429, "retry_after": 1})
+
+    start = time.monotonic()
+    result, _ = call(kyc(stub_url))
+
+    assert time.monotonic() - start >= 1.0
+    assert "nameMatchScore" in result
+    assert stub_calls(stub_url)["kyc"] == 2
+
+
+def test_retry_after_beyond_backoff_limit_fails_fast(stub_url):
+    script(stub_url, {"status_code": 429, "retry_after": 30})
+
+    with pytest.raises(ProviderUnavailableException) as error:
+        call(kyc(stub_url))
+
+    assert error.value.retry_after == 30
+    assert stub_calls(stub_url)["kyc"] == 1
+
+
+@pytest.mark.parametrize("body", ["<html>Bad Gateway</html>", '{"nameMatchScore": 9', "[]"])
+def test_malformed_body_is_reported_unavailable(stub_url, body):
+    script(stub_url, {"body": body})
+
+    with pytest.raises(ProviderUnavailableException):
+        call(kyc(stub_url))
+
+
+def test_missing_required_keys_are_reported_unavailable(stub_url):
+    script(stub_url, {"body": '{"status": "PASSED"}'}, {"body": '{"credit_score": 700}'})
+
+    with pytest.raises(ProviderUnavailableException) as kyc_error:
+        call(kyc(stub_url))
+    with pytest.raises(ProviderUnavailableException) as credit_error:
+        call(credit(stub_url))
+
+    assert "nameMatchScore" in kyc_error.value.message
+    assert "active_loans" in credit_error.value.message
+
+
+@pytest.mark.parametrize("status_code", [400, 404, 422])
+def test_4xx_is_not_retried(stub_url, status_code):
+    script(stub_url, {"status_code": status_code})
+
+    with pytest.raises(ProviderRejectedException) as error:
+        call(credit(stub_url))
+
+    assert error.value.provider_status == status_code
+    assert error.value.status_code == 422
+    assert stub_calls(stub_url)["credit"] == 1
+
+
+def test_4xx_does_not_trip_the_circuit_breaker(stub_url):
+    rejections = 15
+    script(stub_url, *[{"status_code": 400}] * rejections)
+
+    async def reject_repeatedly(client):
+        service = HttpKYCService(stub_url, client)
+        for _ in range(rejections):
+            with pytest.raises(ProviderRejectedException):
+                await service.perform_kyc(name="Rahul Sharma", pan="ABCDE1234F")
+
+    _, client = call(reject_repeatedly)
+
+    breaker = client.breakers["KYC"]
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.calls == 0
@@ -0,0 +1,45 @@
+"""
+Offer grid cells against the scalar eligibility rules: a cell is affordable
+only if its EMI fits, its amount is within the tenure's cap and the tenure is
+allowed for the applicant's band.
+"""
+import pytest
+
+from app.services.eligibility_service import calculate_eligibility
+from app.services.offer_service import compute_offer_grid
+
+
+@pytest.mark.parametrize("credit_score", [None, 580, 620, 680, 720, 780])
+@pytest.mark.parametrize("employment_type", ["SALARIED", "SELF_EMPLOYED"])
+def test_cells_follow_the_eligibility_rules(credit_score, employment_type):
+    grid = compute_offer_grid(80000, employment_type, credit_score, amounts=[50000, 500000, 1500000, 5000000])
+
+    for row, amount in enumerate(grid["amounts"]):
+        for column, tenure in enumerate(grid["tenures"]):
+            expected = (
+                grid["tenure_allowed"][column]
+                and grid["emi"][row][column] <= grid["max_emi"]
+                and amount <= grid["eligible_amounts"][column]
+            )
+            assert grid["affordable"][row][column] == expected, (amount, tenure)
+
+
+def test_disallowed_tenures_are_never_affordable():
+    # POOR band, salaried: only 12 and 24 months are offered
+    grid = compute_offer_grid(80000, "SALARIED", 620, amounts=[100000])
+
+    assert grid["score_band"] == "POOR"
+    assert grid["tenure_allowed"] == [tenure in (12, 24) for tenure in grid["tenures"]]
+    # 100000 over 36+ months fits the EMI and the cap, but the band does not offer it
+    assert all(100000 <= cap for cap in grid["eligible_amounts"])
+    assert grid["affordable"][0] == grid["tenure_allowed"]
+
+
+def test_default_tenure_matches_calculate_eligibility():
+    for credit_score in (None, 620, 720, 780):
+        grid = compute_offer_grid(80000, "SALARIED", credit_score)
+        eligibility = calculate_eligibility(80000, "SALARIED", credit_score=credit_score)
+
+        column = grid["tenures"].index(eligibility["tenure_months"])
+        assert grid["tenure_allowed"][column]
+        assert grid["eligible_amounts"][column] == eligibility["eligible_amount"]
@@ -0,0 +1,51 @@
+import time
+
+from app.core.security import PrincipalCache
+from app.schemas.user import Principal
+
+
+def _principal(email: str = "user@example.com") -> Principal:
+    return Principal(id=1, email=email, is_active=True, is_admin=False)
+
+
+def test_invalidate_user_makes_cached_tokens_miss():
+    cache = PrincipalCache(maxsize=10, ttl=60.0)
+    principal = _principal()
+    cache.put("token", {"sub": principal.email}, principal, cache.epoch(principal.email))
+    assert cache.get("token")[1] == principal
+
+    cache.invalidate_user(principal.email)
+
+    assert cache.get("token") is None
+
+
+def test_lookup_racing_an_invalidation_is_not_stored():
+    cache = PrincipalCache(maxsize=10, ttl=60.0)
+    principal = _principal()
+    epoch = cache.epoch(principal.email)
+    cache.invalidate_user(principal.email)
+
+    cache.put("token", {"sub": principal.email}, principal, epoch)
+
+    assert cache.get("token") is None
+
+
+def test_epochs_are_bounded():
+    cache = PrincipalCache(maxsize=3, ttl=60.0)
+    for index in range(10):
+        cache.invalidate_user(f"user{index}@example.com")
+
+    assert len(cache._epochs) == 3
+
+
+def test_epochs_outlive_the_entries_they_invalidate():
+    cache = PrincipalCache(maxsize=10, ttl=0.05)
+    principal = _principal()
+    cache.put("token", {"sub": principal.email}, principal, cache.epoch(principal.email))
+    cache.invalidate_user(principal.email)
+
+    time.sleep(0.06)
+
+    # The epoch has expired, but so has every entry cached before the bump
+    assert cache.epoch(principal.email) == 0
+    assert cache.get("token") is None
@@ -0,0 +1,109 @@
+"""
+Portfolio re-evaluation never deletes results: an application that now fails
+KYC keeps its credit and eligibility rows, marked superseded, and a new credit
+check after a KYC retry replaces them.
+"""
+from sqlalchemy import func, select, update
+
+from app.core.database import AsyncSessionLocal
+from app.core.enums import ApplicationStatus, KYCStatus
+from app.models.credit import CreditResult, EligibilityResult
+from app.models.kyc import KYCResult
+from app.models.loan_application import LoanApplication
+from app.services import reevaluation_service, verification_service
+
+
+async def _decided_application(create_application) -> int:
+    """An ELIGIBLE application whose KYC score (70) is below the current threshold"""
+    application_id = await create_application(ApplicationStatus.ELIGIBLE)
+    async with AsyncSessionLocal() as db:
+        db.add_all([
+            KYCResult(loan_application_id=application_id, name_match_score=70, status=KYCStatus.PASSED.value),
+            CreditResult(loan_application_id=application_id, credit_score=760, active_loans=1, is_approved=True),
+            EligibilityResult(
+                loan_application_id=application_id,
+                max_emi=40000,
+                interest_rate=11.5,
+                tenure_months=60,
+                eligible_amount=1800000,
+                is_eligible=True
+            )
+        ])
+        await db.commit()
+    return application_id
+
+
+async def _results(application_id: int) -> tuple:
+    async with AsyncSessionLocal() as db:
+        status = await db.scalar(select(LoanApplication.status).where(LoanApplication.id == application_id))
+        credit = (await db.execute(
+            select(CreditResult.is_approved, CreditResult.superseded_at)
+            .where(CreditResult.loan_application_id == application_id)
+        )).all()
+        eligibility = (await db.execute(
+            select(EligibilityResult.is_eligible, EligibilityResult.superseded_at)
+            .where(EligibilityResult.loan_application_id == application_id)
+        )).all()
+    return status, credit, eligibility
+
+
+async def _reevaluate(dry_run: bool = False) -> dict:
+    async with AsyncSessionLocal() as db:
+        run_id = (await reevaluation_service.start_run(db, dry_run=dry_run)).id
+    return await reevaluation_service.run_reevaluation(run_id, workers=0)
+
+
+def test_kyc_failure_supersedes_the_results(run, create_application):
+    async def scenario():
+        application_id = await _decided_application(create_application)
+        await _reevaluate()
+        first = await _results(application_id)
+        # Scored again: already superseded, nothing left to change
+        second = await _reevaluate()
+        return first, second
+
+    (status, credit, eligibility), second = run(scenario())
+
+    assert status == ApplicationStatus.NOT_ELIGIBLE.value
+    assert len(credit) == 1 and credit[0].is_approved and credit[0].superseded_at is not None
+    assert len(eligibility) == 1 and eligibility[0].is_eligible and eligibility[0].superseded_at is not None
+    assert second["changed"] == 0
+
+
+def test_dry_run_changes_nothing(run, create_application):
+    async def scenario():
+        application_id = await _decided_application(create_application)
+        snapshot = await _reevaluate(dry_run=True)
+        return snapshot, await _results(application_id)
+
+    snapshot, (status, credit, eligibility) = run(scenario())
+
+    assert snapshot["report"]["fields"]["is_eligible"] == 1
+    assert status == ApplicationStatus.ELIGIBLE.value
+    assert [row.superseded_at for row in credit + eligibility] == [None, None]
+
+
+def test_credit_check_after_a_kyc_retry_replaces_superseded_results(run, create_application):
+    async def scenario():
+        application_id = await _decided_application(create_application)
+        await _reevaluate()
+        async with AsyncSessionLocal() as db:
+            # KYC retried and passed: the application is back at the credit check
+            await db.execute(
+                update(LoanApplication)
+                .where(LoanApplication.id == application_id)
+                .values(status=ApplicationStatus.CREDIT_CHECK_PENDING.value)
+            )
+            application = await db.get(LoanApplication, application_id)
+            await verification_service.complete_credit_check(db, application)
+            await db.commit()
+            stored = await db.scalar(select(func.count()).select_from(CreditResult))
+        return stored, await _results(application_id)
+
+    stored, (status, credit, eligibility) = run(scenario())
+
+    assert stored == 1
+    assert status in (ApplicationStatus.ELIGIBLE.value, ApplicationStatus.NOT_ELIGIBLE.value)
+    assert credit[0].superseded_at is None
+    # A rejected credit check leaves the old eligibility result superseded
+    assert (eligibility[0].superseded_at is None) == credit[0].is_approved
@@ -0,0 +1,77 @@
+"""
+N+1 guard: with ORM_RELATIONSHIP_LAZY=raise (set in conftest) any lazy load
+of a LoanApplication relationship raises, so the read paths must eager-load
+everything they serialize.
+"""
+import pytest
+from sqlalchemy.exc import InvalidRequestError
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.enums import ApplicationStatus, KYCStatus
+from app.models.credit import CreditResult, EligibilityResult
+from app.models.kyc import KYCResult
+from app.models.loan_application import LoanApplication
+from app.services.application_service import build_snapshot, load_application_with_results
+
+
+async def _add_results(application_id: int) -> None:
+    async with AsyncSessionLocal() as db:
+        db.add_all([
+            KYCResult(loan_application_id=application_id, name_match_score=92.0, status=KYCStatus.PASSED.value),
+            CreditResult(loan_application_id=application_id, credit_score=760, active_loans=1, is_approved=True),
+            EligibilityResult(
+                loan_application_id=application_id, max_emi=30000.0, interest_rate=10.5,
+                tenure_months=60, eligible_amount=500000.0, is_eligible=True
+            )
+        ])
+        await db.commit()
+
+
+def test_lazy_loading_raises_in_tests():
+    assert settings.ORM_RELATIONSHIP_LAZY == "raise"
+
+
+def test_lazy_load_of_results_is_an_error(run, create_application):
+    async def scenario():
+        application_id = await create_application(ApplicationStatus.ELIGIBLE)
+        await _add_results(application_id)
+        async with AsyncSessionLocal() as db:
+            application = await db.get(LoanApplication, application_id)
+            with pytest.raises(InvalidRequestError):
+                application.kyc_result
+
+    run(scenario())
+
+
+def test_snapshot_needs_no_lazy_loads(run, create_application):
+    async def scenario():
+        application_id = await create_application(ApplicationStatus.ELIGIBLE)
+        await _add_results(application_id)
+        async with AsyncSessionLocal() as db:
+            application = await load_application_with_results(db, application_id)
+            return build_snapshot(application)
+
+    snapshot = run(scenario())
+
+    resources = snapshot["resources"]
+    assert resources["application"]["status"] == ApplicationStatus.ELIGIBLE.value
+    assert resources["kyc"]["name_match_score"] == 92.0
+    assert resources["credit"]["credit_score"] == 760
+    assert resources["eligibility"]["eligible_amount"] == 500000.0
+    # Final decisions can still change (re-evaluation), so they are revalidated too
+    assert snapshot["cache_control"] == "private, no-cache"
+
+
+def test_snapshot_without_results(run, create_application):
+    async def scenario():
+        application_id = await create_application()
+        async with AsyncSessionLocal() as db:
+            application = await load_application_with_results(db, application_id)
+            return build_snapshot(application)
+
+    resources = run(scenario())["resources"]
+
+    assert resources["kyc"] is None
+    assert resources["credit"] is None
+    assert resources["eligibility"] is None
@@ -0,0 +1,58 @@
+from sqlalchemy import update
+
+from app.core.database import READ_FROM_REPLICA, READ_YOUR_WRITES, AsyncSessionLocal
+from app.core.enums import ApplicationStatus
+from app.models.loan_application import LoanApplication
+from app.services.application_service import ApplicationResponseCache
+
+
+def _cache() -> ApplicationResponseCache:
+    return ApplicationResponseCache(maxsize=100, ttl=60.0)
+
+
+async def _read(cache: ApplicationResponseCache, application_id: int, **flags) -> str:
+    async with AsyncSessionLocal() as db:
+        db.info.update(flags)
+        snapshot = await cache.get(db, application_id)
+    return snapshot["resources"]["application"]["status"]
+
+
+async def _set_status_behind_cache(application_id: int, status: ApplicationStatus) -> None:
+    async with AsyncSessionLocal() as db:
+        await db.execute(update(LoanApplication).where(LoanApplication.id == application_id).values(status=status.value))
+        await db.commit()
+
+
+def test_primary_reads_fill_the_cache(run, create_application):
+    async def scenario():
+        cache = _cache()
+        application_id = await create_application()
+        first = await _read(cache, application_id)
+        await _set_status_behind_cache(application_id, ApplicationStatus.KYC_PENDING)
+        return first, await _read(cache, application_id)
+
+    assert run(scenario()) == ("DRAFT", "DRAFT")
+
+
+def test_replica_reads_do_not_fill_the_cache(run, create_application):
+    async def scenario():
+        cache = _cache()
+        application_id = await create_application()
+        first = await _read(cache, application_id, **{READ_FROM_REPLICA: True})
+        await _set_status_behind_cache(application_id, ApplicationStatus.KYC_PENDING)
+        return first, await _read(cache, application_id)
+
+    assert run(scenario()) == ("DRAFT", "KYC_PENDING")
+
+
+def test_read_your_writes_skips_cached_entries(run, create_application):
+    async def scenario():
+        cache = _cache()
+        application_id = await create_application()
+        await _read(cache, application_id)
+        await _set_status_behind_cache(application_id, ApplicationStatus.KYC_PENDING)
+        sticky = await _read(cache, application_id, **{READ_YOUR_WRITES: True})
+        # The sticky read came from the primary, so it refreshed the entry
+        return sticky, await _read(cache, application_id)
+
+    assert run(scenario()) == ("KYC_PENDING", "KYC_PENDING")
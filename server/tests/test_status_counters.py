@@ -0,0 +1,45 @@
+import datetime
+
+from sqlalchemy import insert
+
+from app.core.database import AsyncSessionLocal
+from app.core.enums import ApplicationStatus
+from app.models.loan_application import LoanApplication
+from app.services.status_counter_service import get_status_counts, seed_status_counters
+
+
+def test_empty_counter_table_is_seeded_from_the_applications(run, create_application):
+    async def scenario():
+        # Rows that predate the counter table: inserted without counting them
+        template = {
+            "full_name": "Rahul Sharma",
+            "mobile": "9876543210",
+            "pan": "ABCDE1234F",
+            "dob": datetime.date(1990, 1, 15),
+            "employment_type": "SALARIED",
+            "monthly_income": 80000.0,
+            "loan_amount": 500000.0
+        }
+        async with AsyncSessionLocal() as db:
+            await db.execute(insert(LoanApplication), [
+                {**template, "status": ApplicationStatus.DRAFT.value},
+                {**template, "status": ApplicationStatus.ELIGIBLE.value},
+                {**template, "status": ApplicationStatus.ELIGIBLE.value}
+            ])
+            await db.commit()
+
+        async with AsyncSessionLocal() as db:
+            seeded = await seed_status_counters(db)
+            await db.commit()
+        # Seeded counters are kept: the next start leaves them alone
+        await create_application()
+        async with AsyncSessionLocal() as db:
+            seeded_again = await seed_status_counters(db)
+            return seeded, seeded_again, await get_status_counts(db)
+
+    seeded, seeded_again, counts = run(scenario())
+
+    assert seeded is True
+    assert seeded_again is False
+    assert counts[ApplicationStatus.DRAFT.value] == 2
+    assert counts[ApplicationStatus.ELIGIBLE.value] == 2
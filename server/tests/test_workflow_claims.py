@@ -0,0 +1,126 @@
+"""
+Status changes are conditional updates: of two concurrent requests making the
+same transition only one wins, the other gets 409 and nothing is counted twice.
+"""
+import asyncio
+
+import httpx
+import pytest
+
+from app.core.database import AsyncSessionLocal
+from app.core.enums import ApplicationStatus
+from app.models.loan_application import LoanApplication
+from app.services import verification_service
+from app.services.kyc_service import MockKYCService
+from app.services.status_counter_service import get_status_counts
+from app.services.workflow_service import change_status
+from app.utils.exceptions import InvalidWorkflowException, StatusConflictException
+
+
+def test_second_identical_transition_conflicts(run, create_application):
+    async def scenario():
+        application_id = await create_application()
+        async with AsyncSessionLocal() as first, AsyncSessionLocal() as second:
+            winner = await first.get(LoanApplication, application_id)
+            loser = await second.get(LoanApplication, application_id)
+
+            await change_status(first, winner, ApplicationStatus.KYC_PENDING)
+            await first.commit()
+            with pytest.raises(StatusConflictException) as error:
+                await change_status(second, loser, ApplicationStatus.KYC_PENDING)
+            await second.rollback()
+
+        async with AsyncSessionLocal() as db:
+            return error.value.status_code, await get_status_counts(db)
+
+    status_code, counts = run(scenario())
+
+    assert status_code == 409
+    assert counts[ApplicationStatus.DRAFT.value] == 0
+    assert counts[ApplicationStatus.KYC_PENDING.value] == 1
+
+
+class SlowKYCService:
+    """Mock KYC answers, after a delay long enough for requests to overlap"""
+
+    def __init__(self):
+        self.calls = 0
+        self.mock = MockKYCService()
+
+    async def perform_kyc(self, name: str, pan: str = None) -> dict:
+        self.calls += 1
+        await asyncio.sleep(0.2)
+        return self.mock.perform_kyc(name=name, pan=pan)
+
+    def is_passed(self, result: dict) -> bool:
+        return self.mock.is_passed(result)
+
+
+def test_concurrent_kyc_requests_call_the_provider_once(run, create_application, monkeypatch):
+    from app.main import app
+
+    provider = SlowKYCService()
+    monkeypatch.setattr(verification_service, "get_async_kyc_service", lambda: provider)
+
+    async def scenario():
+        application_id = await create_application()
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            responses = await asyncio.gather(*[
+                client.post(f"/api/v1/loan/{application_id}/kyc") for _ in range(2)
+            ])
+        return sorted(response.status_code for response in responses)
+
+    status_codes = run(scenario())
+
+    # The loser either lost the claim (409) or already saw KYC_PENDING (400)
+    assert status_codes[0] == 200
+    assert status_codes[1] in (400, 409)
+    assert provider.calls == 1
+
+
+class BrokenKYCService:
+    """Answers without a nameMatchScore, like a provider that changed its contract"""
+
+    async def perform_kyc(self, name: str, pan: str = None) -> dict:
+        return {"status": "PASSED"}
+
+    def is_passed(self, result: dict) -> bool:
+        return result["nameMatchScore"] >= 80
+
+
+def test_unexpected_error_hands_the_step_back(run, create_application, monkeypatch):
+    from app.main import app
+
+    monkeypatch.setattr(verification_service, "get_async_kyc_service", lambda: BrokenKYCService())
+
+    async def scenario():
+        application_id = await create_application()
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post(f"/api/v1/loan/{application_id}/kyc")
+        async with AsyncSessionLocal() as db:
+            application = await db.get(LoanApplication, application_id)
+            return response.status_code, application.status, await get_status_counts(db)
+
+    status_code, status, counts = run(scenario())
+
+    assert status_code == 500
+    assert status == ApplicationStatus.DRAFT.value
+    assert counts[ApplicationStatus.DRAFT.value] == 1
+    assert counts[ApplicationStatus.KYC_PENDING.value] == 0
+
+
+def test_change_status_enforces_the_transition_table(run, create_application):
+    async def scenario():
+        application_id = await create_application(ApplicationStatus.KYC_PENDING)
+        async with AsyncSessionLocal() as db:
+            application = await db.get(LoanApplication, application_id)
+            with pytest.raises(InvalidWorkflowException):
+                await change_status(db, application, ApplicationStatus.ELIGIBLE)
+            # The hand-back after a failed provider call is an allowed transition
+            await change_status(db, application, ApplicationStatus.DRAFT)
+            await db.commit()
+            return application.status
+
+    assert run(scenario()) == ApplicationStatus.DRAFT.value